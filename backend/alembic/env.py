@@ -1,16 +1,24 @@
+import asyncio
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import inspect, pool, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
+from alembic.script import ScriptDirectory
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from app.core.config import settings
 from app.core.database import Base
 from app.models.user import User
 from app.models.project import Project
+from app.models.service_account import ServiceAccountCredential
+from app.models.deployment_history import DeploymentHistory
+from app.models.deployment import Deployment
+from app.models.failure_signature import FailureSignature
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -32,6 +40,16 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# alembic.ini의 하드코딩된 URL 대신 앱 설정의 DATABASE_URL 사용
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
+# 여러 인스턴스가 동시에 시작해도 마이그레이션은 하나씩 실행 (pg_advisory_lock 키)
+MIGRATION_LOCK_KEY = 7_305_114_201
+
+# create_all로 만들어진(버전 테이블이 없는) DB를 인식하는 기준 테이블
+BASELINE_REVISION = "0001_baseline"
+BASELINE_TABLES = {"users", "projects"}
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -57,26 +75,55 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode.
+def stamp_unversioned_database(connection: Connection) -> None:
+    """create_all로 만든 기존 DB는 0001을 적용된 것으로 기록 (테이블 재생성 방지)"""
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" in tables or not BASELINE_TABLES <= tables:
+        return
+    print(f"Unversioned database with existing tables, stamping {BASELINE_REVISION}")
+    context.get_context().stamp(ScriptDirectory.from_config(config), BASELINE_REVISION)
+    connection.commit()
 
-    In this scenario we need to create an Engine
-    and associate a connection with the context.
 
-    """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
+def do_run_migrations(connection: Connection) -> None:
+    # 세션 단위 잠금이라 아래 트랜잭션 커밋과 무관하게 unlock까지 유지
+    connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    connection.commit()
+    try:
         context.configure(
             connection=connection, target_metadata=target_metadata
         )
+        stamp_unversioned_database(connection)
 
         with context.begin_transaction():
             context.run_migrations()
+    finally:
+        connection.rollback()
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+
+
+async def run_async_migrations() -> None:
+    """asyncpg 엔진으로 연결한 뒤 동기 마이그레이션 실행"""
+    connectable = create_async_engine(
+        config.get_main_option("sqlalchemy.url"),
+        poolclass=pool.NullPool,
+    )
+
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    In this scenario we need to create an Engine
+    and associate a connection with the context.
+
+    """
+    asyncio.run(run_async_migrations())
 
 
 if context.is_offline_mode():
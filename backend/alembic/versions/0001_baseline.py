@@ -0,0 +1,68 @@
+"""baseline schema (users, projects)
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_all로 만들어진 기존 DB는 env.py가 자동으로 0001로 stamp (이 단계는 건너뜀)
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('github_username', sa.String(), nullable=True),
+        sa.Column('github_access_token', sa.Text(), nullable=True),
+        sa.Column('github_connected_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('google_email', sa.String(), nullable=True),
+        sa.Column('google_access_token', sa.Text(), nullable=True),
+        sa.Column('google_refresh_token', sa.Text(), nullable=True),
+        sa.Column('google_connected_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_github_username', 'users', ['github_username'], unique=False)
+
+    op.create_table(
+        'projects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('github_repo', sa.String(), nullable=False),
+        sa.Column('gcp_project_id', sa.String(), nullable=False),
+        sa.Column('service_name', sa.String(), nullable=False),
+        sa.Column('region', sa.String(), nullable=False),
+        sa.Column('deployment_url', sa.String(), nullable=True),
+        sa.Column('workflow_path', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_projects_id', 'projects', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_id', table_name='projects')
+    op.drop_table('projects')
+    op.drop_index('ix_users_github_username', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
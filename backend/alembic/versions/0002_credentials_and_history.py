@@ -0,0 +1,79 @@
+"""service account registry, deployment history, google token expiry
+
+Revision ID: 0002_credentials_and_history
+Revises: 0001_baseline
+Create Date: 2026-10-19 00:00:01.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_credentials_and_history'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 0001로 stamp한 create_all 시절 DB에는 이 테이블들이 이미 있을 수 있음 (없는 것만 생성)
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    user_columns = {column['name'] for column in inspector.get_columns('users')}
+
+    if 'google_token_expires_at' not in user_columns:
+        op.add_column('users', sa.Column('google_token_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    if 'service_account_credentials' not in tables:
+        _create_service_account_credentials()
+    if 'deployment_history' in tables:
+        # create_all 시절 project_id 단일 인덱스 (0003의 복합 인덱스로 대체)
+        op.execute('DROP INDEX IF EXISTS ix_deployment_history_project_id')
+    else:
+        _create_deployment_history()
+
+
+def _create_service_account_credentials() -> None:
+    op.create_table(
+        'service_account_credentials',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('gcp_project_id', sa.String(), nullable=False),
+        sa.Column('github_repo', sa.String(), nullable=False),
+        sa.Column('service_account_email', sa.String(), nullable=False),
+        sa.Column('key_name', sa.String(), nullable=True),
+        sa.Column('encrypted_key', sa.Text(), nullable=True),
+        sa.Column('key_created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('gcp_project_id', 'github_repo', name='uq_service_account_project_repo')
+    )
+    op.create_index('ix_service_account_credentials_id', 'service_account_credentials', ['id'], unique=False)
+
+
+def _create_deployment_history() -> None:
+    op.create_table(
+        'deployment_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('revision_name', sa.String(), nullable=False),
+        sa.Column('container_image', sa.String(), nullable=True),
+        sa.Column('is_healthy', sa.Boolean(), nullable=False),
+        sa.Column('last_served_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id', 'revision_name', name='uq_deployment_history_project_revision')
+    )
+    op.create_index('ix_deployment_history_id', 'deployment_history', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deployment_history_id', table_name='deployment_history')
+    op.drop_table('deployment_history')
+    op.drop_index('ix_service_account_credentials_id', table_name='service_account_credentials')
+    op.drop_table('service_account_credentials')
+    op.drop_column('users', 'google_token_expires_at')
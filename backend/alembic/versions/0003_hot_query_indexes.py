@@ -0,0 +1,38 @@
+"""composite indexes for project listing and rollback lookups
+
+Revision ID: 0003_hot_query_indexes
+Revises: 0002_credentials_and_history
+Create Date: 2026-10-19 00:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_hot_query_indexes'
+down_revision: Union[str, None] = '0002_credentials_and_history'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # /api/projects/me: WHERE user_id = ? ORDER BY created_at DESC
+    op.create_index('ix_projects_user_id_created_at', 'projects', ['user_id', 'created_at'], unique=False)
+    # 같은 배포의 서비스 조회 (프로젝트 단위 롤백)
+    op.create_index('ix_projects_user_repo_gcp', 'projects', ['user_id', 'github_repo', 'gcp_project_id'], unique=False)
+    # 마지막 정상 리비전 조회: WHERE project_id = ? AND is_healthy ORDER BY last_served_at DESC
+    op.create_index(
+        'ix_deployment_history_project_healthy_served',
+        'deployment_history',
+        ['project_id', 'is_healthy', 'last_served_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deployment_history_project_healthy_served', table_name='deployment_history')
+    op.drop_index('ix_projects_user_repo_gcp', table_name='projects')
+    op.drop_index('ix_projects_user_id_created_at', table_name='projects')
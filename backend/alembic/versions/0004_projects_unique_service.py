@@ -0,0 +1,67 @@
+"""unique (user_id, github_repo, service_name) on projects
+
+Revision ID: 0004_projects_unique_service
+Revises: 0003_hot_query_indexes
+Create Date: 2026-10-19 00:00:03.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_projects_unique_service'
+down_revision: Union[str, None] = '0003_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 반복 setup으로 쌓인 중복 프로젝트 정리: 그룹별 가장 최근 행(max id)만 유지
+    op.execute(
+        """
+        CREATE TEMP TABLE project_dedup ON COMMIT DROP AS
+        SELECT p.id AS old_id, k.keep_id
+        FROM projects p
+        JOIN (
+            SELECT user_id, github_repo, service_name, MAX(id) AS keep_id
+            FROM projects
+            GROUP BY user_id, github_repo, service_name
+            HAVING COUNT(*) > 1
+        ) k ON p.user_id = k.user_id
+           AND p.github_repo = k.github_repo
+           AND p.service_name = k.service_name
+        WHERE p.id <> k.keep_id
+        """
+    )
+    # 남길 행에 없는 리비전 기록은 옮기고, 나머지는 CASCADE로 삭제
+    op.execute(
+        """
+        UPDATE deployment_history h
+        SET project_id = d.keep_id
+        FROM project_dedup d
+        WHERE h.project_id = d.old_id
+          AND NOT EXISTS (
+              SELECT 1 FROM deployment_history k
+              WHERE k.project_id = d.keep_id AND k.revision_name = h.revision_name
+          )
+          AND h.id = (
+              SELECT MAX(h2.id) FROM deployment_history h2
+              JOIN project_dedup d2 ON h2.project_id = d2.old_id
+              WHERE d2.keep_id = d.keep_id AND h2.revision_name = h.revision_name
+          )
+        """
+    )
+    op.execute("DELETE FROM projects WHERE id IN (SELECT old_id FROM project_dedup)")
+
+    op.create_unique_constraint(
+        'uq_projects_user_repo_service',
+        'projects',
+        ['user_id', 'github_repo', 'service_name']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_projects_user_repo_service', 'projects', type_='unique')
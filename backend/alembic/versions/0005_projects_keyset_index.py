@@ -0,0 +1,34 @@
+"""include id in the project listing index for keyset pagination
+
+Revision ID: 0005_projects_keyset_index
+Revises: 0004_projects_unique_service
+Create Date: 2026-10-19 00:00:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_projects_keyset_index'
+down_revision: Union[str, None] = '0004_projects_unique_service'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # /api/projects/me: WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+    op.drop_index('ix_projects_user_id_created_at', table_name='projects')
+    op.create_index(
+        'ix_projects_user_id_created_at_id',
+        'projects',
+        ['user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_user_id_created_at_id', table_name='projects')
+    op.create_index('ix_projects_user_id_created_at', 'projects', ['user_id', 'created_at'], unique=False)
@@ -0,0 +1,52 @@
+"""deployments table fed by workflow runs and Cloud Run revisions
+
+Revision ID: 0006_deployments
+Revises: 0005_projects_keyset_index
+Create Date: 2026-10-19 00:00:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_deployments'
+down_revision: Union[str, None] = '0005_projects_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'deployments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.BigInteger(), nullable=False),
+        sa.Column('run_number', sa.Integer(), nullable=True),
+        sa.Column('workflow_name', sa.String(), nullable=True),
+        sa.Column('commit_sha', sa.String(), nullable=True),
+        sa.Column('branch', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('conclusion', sa.String(), nullable=True),
+        sa.Column('html_url', sa.String(), nullable=True),
+        sa.Column('container_image', sa.String(), nullable=True),
+        sa.Column('revision_name', sa.String(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('duration_seconds', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id', 'run_id', name='uq_deployments_project_run')
+    )
+    op.create_index('ix_deployments_id', 'deployments', ['id'], unique=False)
+    op.create_index('ix_deployments_project_started', 'deployments', ['project_id', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deployments_project_started', table_name='deployments')
+    op.drop_index('ix_deployments_id', table_name='deployments')
+    op.drop_table('deployments')
@@ -0,0 +1,40 @@
+"""failure signature index for cached troubleshooting diagnoses
+
+Revision ID: 0007_failure_signatures
+Revises: 0006_deployments
+Create Date: 2026-10-19 00:00:06.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_failure_signatures'
+down_revision: Union[str, None] = '0006_deployments'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'failure_signatures',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('step', sa.String(), nullable=True),
+        sa.Column('error_line', sa.Text(), nullable=True),
+        sa.Column('diagnosis', sa.Text(), nullable=False),
+        sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('fingerprint')
+    )
+    op.create_index('ix_failure_signatures_id', 'failure_signatures', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_failure_signatures_id', table_name='failure_signatures')
+    op.drop_table('failure_signatures')
@@ -0,0 +1,29 @@
+"""store the numeric GitHub account id on users
+
+Revision ID: 0008_users_github_id
+Revises: 0007_failure_signatures
+Create Date: 2026-10-19 00:00:07.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_users_github_id'
+down_revision: Union[str, None] = '0007_failure_signatures'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GitHub 로그인 이름은 바뀔 수 있으므로 변하지 않는 계정 ID로 식별
+    op.add_column('users', sa.Column('github_id', sa.BigInteger(), nullable=True))
+    op.create_index('ix_users_github_id', 'users', ['github_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_github_id', table_name='users')
+    op.drop_column('users', 'github_id')
@@ -0,0 +1,71 @@
+"""scope registered service accounts to the user who created them
+
+Revision ID: 0009_service_account_owner
+Revises: 0008_users_github_id
+Create Date: 2026-10-19 00:00:08.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_service_account_owner'
+down_revision: Union[str, None] = '0008_users_github_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('service_account_credentials', sa.Column('user_id', sa.Integer(), nullable=True))
+
+    # 같은 (GCP 프로젝트, 저장소)를 등록한 사용자가 한 명뿐이면 그 사용자 소유로 기록
+    op.execute("""
+        UPDATE service_account_credentials AS sac
+        SET user_id = owners.user_id
+        FROM (
+            SELECT gcp_project_id, github_repo, MIN(user_id) AS user_id
+            FROM projects
+            GROUP BY gcp_project_id, github_repo
+            HAVING COUNT(DISTINCT user_id) = 1
+        ) AS owners
+        WHERE sac.gcp_project_id = owners.gcp_project_id
+          AND sac.github_repo = owners.github_repo
+    """)
+    # 소유자를 정할 수 없는 공유 키는 보관하지 않음 (다음 CI/CD 설정 시 사용자별로 새로 발급)
+    op.execute("DELETE FROM service_account_credentials WHERE user_id IS NULL")
+
+    op.alter_column('service_account_credentials', 'user_id', nullable=False)
+    op.create_foreign_key(
+        'fk_service_account_credentials_user_id',
+        'service_account_credentials', 'users',
+        ['user_id'], ['id'],
+        ondelete='CASCADE'
+    )
+    op.drop_constraint('uq_service_account_project_repo', 'service_account_credentials', type_='unique')
+    op.create_unique_constraint(
+        'uq_service_account_user_project_repo',
+        'service_account_credentials',
+        ['user_id', 'gcp_project_id', 'github_repo']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_service_account_user_project_repo', 'service_account_credentials', type_='unique')
+    # 사용자별로 나뉜 행은 (프로젝트, 저장소)마다 가장 먼저 등록한 것만 남김
+    op.execute("""
+        DELETE FROM service_account_credentials AS sac
+        USING service_account_credentials AS older
+        WHERE sac.gcp_project_id = older.gcp_project_id
+          AND sac.github_repo = older.github_repo
+          AND sac.id > older.id
+    """)
+    op.create_unique_constraint(
+        'uq_service_account_project_repo',
+        'service_account_credentials',
+        ['gcp_project_id', 'github_repo']
+    )
+    op.drop_constraint('fk_service_account_credentials_user_id', 'service_account_credentials', type_='foreignkey')
+    op.drop_column('service_account_credentials', 'user_id')
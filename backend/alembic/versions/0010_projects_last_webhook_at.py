@@ -0,0 +1,27 @@
+"""record the last workflow_run webhook per project
+
+Revision ID: 0010_projects_last_webhook_at
+Revises: 0009_service_account_owner
+Create Date: 2026-10-19 00:00:09.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_projects_last_webhook_at'
+down_revision: Union[str, None] = '0009_service_account_owner'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 웹훅을 받은 워커와 관계없이 모든 워커가 폴링 생략 여부를 판단하도록 DB에 기록
+    op.add_column('projects', sa.Column('last_webhook_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'last_webhook_at')
@@ -0,0 +1,50 @@
+"""scope learned failure signatures to the user who received the diagnosis
+
+Revision ID: 0011_failure_signatures_user
+Revises: 0010_projects_last_webhook_at
+Create Date: 2026-10-19 00:00:10.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_failure_signatures_user'
+down_revision: Union[str, None] = '0010_projects_last_webhook_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 지금까지 학습한 진단은 누구의 로그에서 나왔는지 알 수 없으므로 버림 (다음 분석 때 사용자별로 다시 학습)
+    op.execute("DELETE FROM failure_signatures")
+    op.add_column('failure_signatures', sa.Column('user_id', sa.Integer(), nullable=False))
+    op.create_foreign_key(
+        'fk_failure_signatures_user_id',
+        'failure_signatures', 'users',
+        ['user_id'], ['id'],
+        ondelete='CASCADE'
+    )
+    op.drop_constraint('failure_signatures_fingerprint_key', 'failure_signatures', type_='unique')
+    op.create_unique_constraint(
+        'uq_failure_signatures_user_fingerprint',
+        'failure_signatures',
+        ['user_id', 'fingerprint']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_failure_signatures_user_fingerprint', 'failure_signatures', type_='unique')
+    # 사용자별로 나뉜 같은 지문은 하나만 남김
+    op.execute("""
+        DELETE FROM failure_signatures AS fs
+        USING failure_signatures AS older
+        WHERE fs.fingerprint = older.fingerprint
+          AND fs.id > older.id
+    """)
+    op.create_unique_constraint('failure_signatures_fingerprint_key', 'failure_signatures', ['fingerprint'])
+    op.drop_constraint('fk_failure_signatures_user_id', 'failure_signatures', type_='foreignkey')
+    op.drop_column('failure_signatures', 'user_id')
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_db, release_connection
 from app.services.user_service import UserService
 from app.api.github import get_user_id_from_token
 import httpx
@@ -30,6 +30,9 @@ async def analyze_repository(
     if not github_token:
         raise HTTPException(status_code=400, detail="GitHub 연결이 필요합니다")
     
+    # GitHub 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+    await release_connection(db)
+    
     analysis = {
         "repo_full_name": repo_full_name,
         "project_type": "unknown",
@@ -234,6 +237,9 @@ async def ai_analyze_and_generate(
     if not github_token:
         raise HTTPException(status_code=400, detail="GitHub 연결이 필요합니다")
     
+    # GitHub/Claude 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+    await release_connection(db)
+    
     # 저장소 구조 및 주요 파일 내용 가져오기
     repo_structure = {}
     repo_files_content = {}
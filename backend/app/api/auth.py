@@ -5,10 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
 from app.core.database import get_db
-from app.services.user_service import UserService
+from app.services.user_service import UserService, token_cache
+from app.services.github_repo_cache import github_repo_cache
+from app.services.principal_cache import Principal, principal_cache
 from app.models.user import User
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
+from app.core.security import hash_password, verify_password, decode_access_token
 import httpx
 import jwt
 from datetime import datetime, timedelta
@@ -16,9 +18,6 @@ from typing import Optional
 
 router = APIRouter()
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -51,18 +50,11 @@ def create_jwt_token(user_id: int) -> str:
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """현재 로그인한 사용자 가져오기"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except (jwt.JWTError, ValueError):
-        raise HTTPException(status_code=401, detail="Invalid token")
+) -> Principal:
+    """현재 로그인한 사용자 가져오기 (JWT 검증 + 단기 캐시된 사용자 정보)"""
+    user_id = decode_access_token(token)
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await principal_cache.get(db, user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -84,7 +76,7 @@ async def register(
         )
     
     # 비밀번호 해시
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     
     # 사용자 생성
     new_user = User(
@@ -121,7 +113,7 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not pwd_context.verify(form_data.password, user.hashed_password):
+    if not user or not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -144,7 +136,7 @@ async def login(
     }
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """현재 사용자 정보"""
     return UserResponse(
         id=current_user.id,
@@ -240,21 +232,19 @@ async def github_callback(
     except:
         raise HTTPException(status_code=400, detail="Invalid user state")
     
-    # 사용자 업데이트
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # GitHub 정보 업데이트 (조회 후 수정 대신 UPDATE 한 번, 토큰/사용자 캐시도 함께 무효화)
+    user = await UserService(db).connect_github(
+        user_id,
+        user_data["id"],
+        user_data.get("login"),
+        access_token
+    )
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # GitHub 정보 업데이트
-    user_service = UserService(db)
-    user.github_username = user_data.get("login")
-    user.github_access_token = user_service.encrypt_token(access_token)
-    user.github_connected_at = datetime.utcnow()
-    
-    await db.commit()
-    await db.refresh(user)
+    # 새 토큰 기준으로 저장소 목록도 다시 조회
+    github_repo_cache.invalidate(user.id)
     
     # 프론트엔드로 리다이렉트
     frontend_url = f"{settings.FRONTEND_URL}/dashboard?from=github&code=success&github_username={user.github_username}"
@@ -326,6 +316,7 @@ async def google_callback(
     token_data = response.json()
     access_token = token_data.get("access_token")
     refresh_token = token_data.get("refresh_token")
+    expires_in = token_data.get("expires_in")
     
     # Google 사용자 정보 가져오기
     async with httpx.AsyncClient() as client:
@@ -361,7 +352,8 @@ async def google_callback(
         user_id=user.id,
         google_email=google_email,
         access_token=access_token,
-        refresh_token=refresh_token
+        refresh_token=refresh_token,
+        expires_in=expires_in
     )
     
     # 프론트엔드로 리다이렉트
@@ -2,12 +2,15 @@ from fastapi import APIRouter, HTTPException, Header, Depends
 from pydantic import BaseModel
 from typing import Dict, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, release_connection
 from app.services.user_service import UserService
 from app.services.github_service import GitHubService
 from app.services.gcp_service import GCPService
+from app.services.service_account_registry import ServiceAccountRegistry
+from app.services.project_service import ProjectService
+from app.services.build_cache import build_cache_lines
 from app.api.github import get_user_id_from_token
-from app.models.project import Project
 import base64
 import hashlib
 import json
@@ -25,6 +28,10 @@ class CICDSetupRequest(BaseModel):
     region: str = "asia-northeast3"
     environment_variables: Dict[str, str] = {}
 
+class RotateKeyRequest(BaseModel):
+    github_repo: str  # owner/repo 형식
+    gcp_project_id: str
+
 class WorkflowTemplate(BaseModel):
     name: str
     content: str
@@ -48,6 +55,9 @@ async def setup_cicd(
     if not github_token or not google_token:
         raise HTTPException(status_code=401, detail="GitHub과 GCP 모두 연결이 필요합니다")
     
+    # 외부 API 호출 동안 DB 커넥션을 잡고 있지 않도록 반환 (마지막 저장 시 다시 획득)
+    await release_connection(db)
+    
     try:
         # GitHub 서비스 초기화
         github_service = GitHubService(github_token)
@@ -59,36 +69,15 @@ async def setup_cicd(
         print("Enabling required GCP APIs...")
         api_results = gcp_service.enable_apis(request.gcp_project_id)
         
-        # 2. GCP 서비스 계정 생성
-        print("Creating GCP service account...")
-        service_account = gcp_service.create_service_account(request.gcp_project_id)
-        service_account_email = service_account['email']
-        
-        # IAM API 동기화를 위해 잠시 대기
-        import time
-        print("Waiting for IAM API to sync...")
-        time.sleep(5)
-        
-        # 3. 권한 부여 (실패해도 계속 진행)
-        print("Granting permissions...")
-        try:
-            gcp_service.grant_permissions(request.gcp_project_id, service_account_email)
-        except Exception as e:
-            print(f"Permission grant failed (continuing anyway): {e}")
-        
-        # 권한 설정 후 추가 대기
-        time.sleep(3)
-        
-        # 4. 서비스 계정 키 생성
-        print("Creating service account key...")
-        service_account_key_base64 = gcp_service.create_service_account_key(
-            request.gcp_project_id, 
-            service_account_email
+        # 2. GCP 서비스 계정 및 키 (등록된 것이 있으면 재사용)
+        print("Resolving GCP service account...")
+        registry = ServiceAccountRegistry(db, gcp_service, user_id)
+        service_account = await registry.get_or_create(
+            request.gcp_project_id,
+            request.github_repo
         )
-        
-        # Base64 디코딩하여 JSON 문자열로 변환
-        import base64
-        service_account_key_json = base64.b64decode(service_account_key_base64).decode('utf-8')
+        service_account_email = service_account['email']
+        service_account_key_json = service_account['key_json']
         
         # 디버깅: JSON 확인
         print(f"Service account key (first 100 chars): {service_account_key_json[:100]}...")
@@ -104,7 +93,7 @@ async def setup_cicd(
         # 디버깅: 받은 환경변수 출력
         print(f"Environment variables received: {request.environment_variables}")
         
-        # 5. GitHub Secrets 설정 (서비스 계정 키만)
+        # 3. GitHub Secrets 설정 (서비스 계정 키만)
         secrets_to_create = {
             "GCP_SA_KEY": service_account_key_json,
         }
@@ -121,7 +110,7 @@ async def setup_cicd(
             secrets_to_create
         )
         
-        # 6. Dockerfile과 Workflow 파일 생성/업데이트 (한 번의 커밋으로)
+        # 4. Dockerfile과 Workflow 파일 생성/업데이트 (한 번의 커밋으로)
         dockerfile_content = generate_dockerfile_template(request.service_name)
         workflow = generate_workflow_template(
             request.service_name,
@@ -147,11 +136,24 @@ async def setup_cicd(
             print(f"Failed to create files: {e}")
             raise  # 에러를 다시 발생시켜 정확한 문제 파악
         
+        # 워크플로우 상태를 폴링 대신 웹훅으로 받도록 등록 (실패해도 계속 진행)
+        webhook_result = None
+        if settings.GITHUB_WEBHOOK_URL and settings.GITHUB_WEBHOOK_SECRET:
+            try:
+                webhook_result = github_service.ensure_webhook(
+                    request.github_repo,
+                    settings.GITHUB_WEBHOOK_URL,
+                    settings.GITHUB_WEBHOOK_SECRET,
+                    ["workflow_run", "workflow_job"]
+                )
+            except Exception as e:
+                print(f"Webhook registration failed (continuing anyway): {e}")
+        
         # 배포 URL 생성 (예상 URL)
         expected_url = f"https://{request.service_name.lower()}-{generate_hash(request.gcp_project_id)[:8]}-{request.region}.a.run.app"
         
-        # Project 레코드 생성 또는 업데이트
-        project = Project(
+        # Project 레코드 생성 또는 업데이트 (같은 저장소/서비스 재설정 시 기존 행 갱신)
+        await ProjectService(db).upsert_project(
             user_id=user_id,
             github_repo=request.github_repo,
             gcp_project_id=request.gcp_project_id,
@@ -161,10 +163,6 @@ async def setup_cicd(
             workflow_path=workflow.path
         )
         
-        db.add(project)
-        await db.commit()
-        await db.refresh(project)
-        
         return {
             "status": "success",
             "message": "CI/CD 설정 완료",
@@ -173,6 +171,7 @@ async def setup_cicd(
                 "apis_enabled": api_results,
                 "secrets_created": secret_results,
                 "files_created": files_created,
+                "webhook": webhook_result,
                 "deployment_info": {
                     "service_name": request.service_name.lower(),
                     "region": request.region,
@@ -191,6 +190,44 @@ async def setup_cicd(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"CI/CD 설정 실패: {str(e)}")
 
+@router.post("/rotate-key")
+async def rotate_service_account_key(
+    request: RotateKeyRequest,
+    user_id: int = Depends(get_user_id_from_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """서비스 계정 키 교체 (새 키 발급 후 이전 키 삭제, GCP_SA_KEY 갱신)"""
+    user_service = UserService(db)
+    tokens = await user_service.get_user_tokens(user_id)
+    
+    github_token = tokens.get("github_token")
+    google_token = tokens.get("google_token")
+    
+    if not github_token or not google_token:
+        raise HTTPException(status_code=401, detail="GitHub과 GCP 모두 연결이 필요합니다")
+    
+    registry = ServiceAccountRegistry(db, GCPService(google_token), user_id)
+    
+    try:
+        rotated = await registry.rotate(request.gcp_project_id, request.github_repo)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="등록된 서비스 계정이 없습니다. CI/CD 설정을 먼저 진행하세요.")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"키 교체 실패: {str(e)}")
+    
+    github_service = GitHubService(github_token)
+    secret_results = github_service.setup_secrets_batch(
+        request.github_repo,
+        {"GCP_SA_KEY": rotated['key_json']}
+    )
+    
+    return {
+        "status": "success",
+        "service_account": rotated['email'],
+        "deleted_keys": len(rotated['deleted_keys']),
+        "secrets_created": secret_results
+    }
+
 async def create_service_account(project_id: str, gcp_token: str) -> str:
     """GCP 서비스 계정 생성"""
     # TODO: 실제 구현
@@ -270,6 +307,12 @@ def generate_workflow_template(
     # Docker 이미지 이름은 소문자여야 함
     service_name_lower = service_name.lower()
     
+    # BuildKit 레이어 캐시 (서비스별 키)
+    image_repository = f"gcr.io/{project_id}/{service_name_lower}"
+    cache_options = "\n".join(
+        f"        {line}" for line in build_cache_lines(image_repository, service_name_lower)
+    )
+    
     workflow_content = f"""name: Deploy to Cloud Run
 
 on:
@@ -308,13 +351,16 @@ jobs:
       run: |
         gcloud auth configure-docker
 
-    - name: Build Docker image
-      run: |
-        docker build -t gcr.io/$PROJECT_ID/$SERVICE_NAME_LOWER:${{{{ github.sha }}}} .
+    - name: Set up Docker Buildx
+      uses: docker/setup-buildx-action@v3
 
-    - name: Push Docker image
-      run: |
-        docker push gcr.io/$PROJECT_ID/$SERVICE_NAME_LOWER:${{{{ github.sha }}}}
+    - name: Build and push Docker image
+      uses: docker/build-push-action@v6
+      with:
+        context: .
+        push: true
+        tags: {image_repository}:${{{{ github.sha }}}}
+{cache_options}
 
     - name: Deploy to Cloud Run
       run: |
@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from sqlalchemy import select, func
+from app.core.config import settings
+from app.core.database import get_db, release_connection
+from app.core.security import decode_access_token
+from app.core.http_client import get_http_client
+from app.models.deployment import Deployment
+from app.models.project import Project
 from app.services.user_service import UserService
-from app.services.github_service import GitHubService
-from app.api.github import get_user_id_from_token
+from app.services.log_store import log_store
+from app.services.deployment_syncer import deployment_syncer
+from app.services.deployment_events import deployment_events
+from app.services.principal_cache import Principal, principal_cache
+from app.api.auth import get_current_user
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, deque
+import asyncio
+import json
+import re
 
 router = APIRouter()
 
+# 잡 목록 한 페이지 (워크플로우당 잡은 보통 몇 개뿐)
+GITHUB_JOBS_PER_PAGE = 100
+
 class WorkflowRun(BaseModel):
     id: int
     name: str
@@ -33,6 +50,120 @@ class DeploymentStatus(BaseModel):
     current_run: Optional[WorkflowRun]
     steps: List[WorkflowStep]
 
+class DeploymentRecord(BaseModel):
+    run_id: int
+    run_number: Optional[int] = None
+    workflow_name: Optional[str] = None
+    commit_sha: Optional[str] = None
+    branch: Optional[str] = None
+    status: Optional[str] = None
+    conclusion: Optional[str] = None
+    html_url: Optional[str] = None
+    container_image: Optional[str] = None
+    revision_name: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration_seconds: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+async def _get_user_project(db: AsyncSession, user_id: int, project_id: int) -> Project:
+    result = await db.execute(
+        select(Project).where(Project.id == project_id, Project.user_id == user_id)
+    )
+    project = result.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+async def _recent_deployments(db: AsyncSession, project_id: int, limit: int, before_run_id: Optional[int] = None) -> List[Deployment]:
+    """DB에 기록된 배포를 최신 실행 순으로 조회"""
+    query = (
+        select(Deployment)
+        .where(Deployment.project_id == project_id)
+        .order_by(Deployment.run_id.desc())
+        .limit(limit)
+    )
+    if before_run_id:
+        query = query.where(Deployment.run_id < before_run_id)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+def _github_headers(github_token: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
+def _workflow_run(run: Dict) -> WorkflowRun:
+    return WorkflowRun(
+        id=run["id"],
+        name=run.get("name") or "",
+        status=run.get("status") or "",
+        conclusion=run.get("conclusion"),
+        created_at=run["created_at"],
+        updated_at=run["updated_at"],
+        html_url=run["html_url"],
+        run_number=run["run_number"]
+    )
+
+# 완료된 실행은 바뀌지 않으므로 (실행, 단계)를 영구 캐시 (LRU로 개수만 제한)
+# 사용자별로 키를 나눠, 자기 토큰으로 한 번 조회한 실행만 캐시에서 제공
+_completed_runs: "OrderedDict[Tuple[int, str, int], Tuple[WorkflowRun, List[WorkflowStep]]]" = OrderedDict()
+
+def _get_completed_run(user_id: int, repo_full_name: str, run_id: int):
+    key = (user_id, repo_full_name.lower(), run_id)
+    entry = _completed_runs.get(key)
+    if entry is not None:
+        _completed_runs.move_to_end(key)
+    return entry
+
+def _set_completed_run(user_id: int, repo_full_name: str, run_id: int, run: WorkflowRun, steps: List[WorkflowStep]):
+    _completed_runs[(user_id, repo_full_name.lower(), run_id)] = (run, steps)
+    while len(_completed_runs) > settings.COMPLETED_RUN_CACHE_SIZE:
+        _completed_runs.popitem(last=False)
+
+async def _fetch_run_with_steps(user_id: int, repo_full_name: str, run_id: int, github_token: str) -> Tuple[WorkflowRun, List[WorkflowStep]]:
+    """실행을 ID로 직접 조회하고, 잡과 단계는 한 번의 호출로 조회"""
+    cached = _get_completed_run(user_id, repo_full_name, run_id)
+    if cached is not None:
+        return cached
+    
+    client = get_http_client()
+    base_url = f"https://api.github.com/repos/{repo_full_name}/actions/runs/{run_id}"
+    run_response, jobs_response = await asyncio.gather(
+        client.get(base_url, headers=_github_headers(github_token)),
+        client.get(
+            f"{base_url}/jobs",
+            headers=_github_headers(github_token),
+            params={"per_page": GITHUB_JOBS_PER_PAGE}
+        )
+    )
+    if run_response.status_code == 404:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    run_response.raise_for_status()
+    jobs_response.raise_for_status()
+    
+    run = run_response.json()
+    steps = [
+        WorkflowStep(
+            name=step["name"],
+            status=step["status"],
+            conclusion=step.get("conclusion"),
+            number=step["number"],
+            started_at=step.get("started_at"),
+            completed_at=step.get("completed_at")
+        )
+        for job in jobs_response.json().get("jobs", [])
+        for step in job.get("steps", [])
+    ]
+    workflow_run = _workflow_run(run)
+    
+    if run.get("status") == "completed":
+        _set_completed_run(user_id, repo_full_name, run_id, workflow_run, steps)
+    return workflow_run, steps
+
 @router.get("/status/{owner}/{repo}")
 async def get_deployment_status(
     owner: str,
@@ -41,76 +172,72 @@ async def get_deployment_status(
     authorization: str = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """GitHub Actions workflow 실행 상태 조회"""
+    """GitHub Actions workflow 실행 상태 조회
+    
+    최근 실행 목록은 등록된 프로젝트면 DB, 아니면 GitHub 한 페이지로 조회하고,
+    run_id가 주어지면 해당 실행과 단계만 직접 조회한다 (업스트림 호출 수 고정).
+    """
     try:
         # JWT 토큰에서 사용자 ID 추출
         if not authorization or not authorization.startswith("Bearer "):
             raise HTTPException(status_code=401, detail="Authorization header missing")
         
-        token = authorization.split(" ")[1]
-        user_id = await get_user_id_from_token(token)
+        user_id = decode_access_token(authorization.split(" ")[1])
         
-        # 사용자 서비스 초기화
-        user_service = UserService(db)
-        user = await user_service.get_user_by_id(user_id)
+        user = await principal_cache.get(db, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         # GitHub 토큰 복호화
-        github_token = await user_service.decrypt_token(user.github_token)
-        github_service = GitHubService(github_token)
+        tokens = await UserService(db).get_user_tokens(user_id)
+        github_token = tokens.get("github_token")
+        if not github_token:
+            raise HTTPException(status_code=400, detail="GitHub not connected")
         
-        # GitHub API를 통해 workflow runs 조회
         repo_full_name = f"{owner}/{repo}"
-        repo_obj = github_service.get_repo(repo_full_name)
         
-        # 최근 workflow runs 가져오기
+        # 등록된 프로젝트면 최근 workflow runs는 DB 기록에서 조회 (오래됐으면 백그라운드 동기화)
+        result = await db.execute(
+            select(Project.id).where(
+                Project.user_id == user_id,
+                func.lower(Project.github_repo) == repo_full_name.lower()
+            ).order_by(Project.created_at.desc()).limit(1)
+        )
+        project_id = result.scalar()
+        
         workflow_runs = []
-        runs = repo_obj.get_workflow_runs(actor=user.github_username)
+        if project_id:
+            deployment_syncer.refresh_if_stale(project_id)
+            for deployment in await _recent_deployments(db, project_id, 10):
+                workflow_runs.append(WorkflowRun(
+                    id=deployment.run_id,
+                    name=deployment.workflow_name or "",
+                    status=deployment.status or "",
+                    conclusion=deployment.conclusion,
+                    created_at=deployment.started_at or deployment.created_at,
+                    updated_at=deployment.completed_at or deployment.started_at or deployment.created_at,
+                    html_url=deployment.html_url or "",
+                    run_number=deployment.run_number or 0
+                ))
         
-        for run in runs[:10]:  # 최근 10개만
-            workflow_runs.append(WorkflowRun(
-                id=run.id,
-                name=run.name,
-                status=run.status,
-                conclusion=run.conclusion,
-                created_at=run.created_at,
-                updated_at=run.updated_at,
-                html_url=run.html_url,
-                run_number=run.run_number
-            ))
+        # GitHub 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+        await release_connection(db)
+        
+        if not project_id:
+            # 최근 10개만 한 페이지로 조회
+            response = await get_http_client().get(
+                f"https://api.github.com/repos/{repo_full_name}/actions/runs",
+                headers=_github_headers(github_token),
+                params={"actor": user.github_username, "per_page": 10} if user.github_username else {"per_page": 10}
+            )
+            response.raise_for_status()
+            workflow_runs = [_workflow_run(run) for run in response.json().get("workflow_runs", [])]
         
         # 특정 run의 상세 정보 조회
         current_run = None
         steps = []
-        
         if run_id:
-            for run in runs:
-                if run.id == run_id:
-                    current_run = WorkflowRun(
-                        id=run.id,
-                        name=run.name,
-                        status=run.status,
-                        conclusion=run.conclusion,
-                        created_at=run.created_at,
-                        updated_at=run.updated_at,
-                        html_url=run.html_url,
-                        run_number=run.run_number
-                    )
-                    
-                    # Jobs와 steps 조회
-                    jobs = run.jobs()
-                    for job in jobs:
-                        for step in job.steps:
-                            steps.append(WorkflowStep(
-                                name=step.name,
-                                status=step.status,
-                                conclusion=step.conclusion,
-                                number=step.number,
-                                started_at=step.started_at,
-                                completed_at=step.completed_at
-                            ))
-                    break
+            current_run, steps = await _fetch_run_with_steps(user_id, repo_full_name, run_id, github_token)
         
         return DeploymentStatus(
             workflow_runs=workflow_runs,
@@ -118,9 +245,170 @@ async def get_deployment_status(
             steps=steps
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get deployment status: {str(e)}")
 
+@router.get("/events/{owner}/{repo}")
+async def stream_deployment_events(
+    owner: str,
+    repo: str,
+    token: str = Query(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """워크플로우 실행/잡 상태 변경을 SSE로 전송 (GitHub 웹훅 기반, 폴링 대체)
+    
+    EventSource는 헤더를 보낼 수 없으므로 JWT를 token 쿼리로 받는다.
+    """
+    user_id = decode_access_token(token)
+    repo_full_name = f"{owner}/{repo}"
+    
+    result = await db.execute(
+        select(Project.id).where(
+            Project.user_id == user_id,
+            func.lower(Project.github_repo) == repo_full_name.lower()
+        ).limit(1)
+    )
+    if result.scalar() is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    # 스트림이 열려 있는 동안 DB 커넥션을 잡고 있지 않도록 반환
+    await release_connection(db)
+    
+    queue = deployment_events.subscribe(repo_full_name)
+    
+    async def generate():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=settings.DEPLOYMENT_EVENTS_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # 프록시가 유휴 연결을 끊지 않도록 주석 라인 전송
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            deployment_events.unsubscribe(repo_full_name, queue)
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/history/{project_id}", response_model=List[DeploymentRecord])
+async def get_deployment_history(
+    project_id: int,
+    limit: int = Query(settings.DEPLOYMENT_PAGE_SIZE, ge=1, le=100),
+    before_run_id: Optional[int] = None,
+    refresh: bool = False,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """프로젝트 배포 기록 조회 (DB 기준, refresh면 업스트림과 먼저 동기화)"""
+    await _get_user_project(db, current_user.id, project_id)
+    
+    if refresh:
+        await deployment_syncer.sync_project(project_id)
+    else:
+        deployment_syncer.refresh_if_stale(project_id)
+    
+    deployments = await _recent_deployments(db, project_id, limit, before_run_id)
+    return [DeploymentRecord.model_validate(d) for d in deployments]
+
+@router.get("/analytics/{project_id}")
+async def get_deployment_analytics(
+    project_id: int,
+    days: int = Query(30, ge=1, le=365),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """기간 내 배포 횟수, 성공률, 평균 소요 시간 (DB 집계)"""
+    await _get_user_project(db, current_user.id, project_id)
+    deployment_syncer.refresh_if_stale(project_id)
+    
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    result = await db.execute(
+        select(
+            func.count(Deployment.id),
+            func.count(Deployment.id).filter(Deployment.conclusion == "success"),
+            func.count(Deployment.id).filter(Deployment.conclusion == "failure"),
+            func.avg(Deployment.duration_seconds).filter(Deployment.conclusion == "success"),
+            func.max(Deployment.started_at)
+        ).where(
+            Deployment.project_id == project_id,
+            Deployment.started_at >= since
+        )
+    )
+    total, succeeded, failed, avg_duration, last_deployed_at = result.one()
+    completed = succeeded + failed
+    
+    return {
+        "project_id": project_id,
+        "days": days,
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "success_rate": round(succeeded / completed, 3) if completed else None,
+        "avg_duration_seconds": round(float(avg_duration), 1) if avg_duration is not None else None,
+        "last_deployed_at": last_deployed_at
+    }
+
+async def _authorize_github(db: AsyncSession, authorization: str, repo_full_name: str) -> Tuple[str, bool]:
+    """GitHub 토큰과 등록된 프로젝트 저장소 여부 반환 (디스크 캐시는 등록된 저장소만 사용)"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Authorization header missing")
+    user_id = decode_access_token(authorization.split(" ")[1])
+    
+    tokens = await UserService(db).get_user_tokens(user_id)
+    github_token = tokens.get("github_token")
+    if not github_token:
+        raise HTTPException(status_code=400, detail="GitHub not connected")
+    
+    result = await db.execute(
+        select(Project.id).where(
+            Project.user_id == user_id,
+            func.lower(Project.github_repo) == repo_full_name.lower()
+        ).limit(1)
+    )
+    registered = result.scalar() is not None
+    await release_connection(db)
+    return github_token, registered
+
+def _range_start(range_header: Optional[str]) -> int:
+    """'bytes=N-' 형식의 이어받기 요청만 지원"""
+    if not range_header:
+        return 0
+    match = re.fullmatch(r"bytes=(\d+)-", range_header.strip())
+    if not match:
+        raise HTTPException(status_code=416, detail="Only 'bytes=N-' ranges are supported")
+    return int(match.group(1))
+
+async def _skip_bytes(chunks: AsyncIterator[bytes], count: int) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        if count >= len(chunk):
+            count -= len(chunk)
+            continue
+        yield chunk[count:]
+        count = 0
+
+async def _tail_lines(chunks: AsyncIterator[bytes], count: int) -> AsyncIterator[bytes]:
+    """마지막 count줄만 유지하며 스트림을 읽음 (메모리는 줄 수에 비례)"""
+    lines = deque(maxlen=count)
+    partial = b""
+    async for chunk in chunks:
+        parts = (partial + chunk).split(b"\n")
+        partial = parts.pop()
+        lines.extend(parts)
+    if partial:
+        lines.append(partial)
+    for line in lines:
+        yield line + b"\n"
+
 @router.get("/logs/{owner}/{repo}/{run_id}")
 async def get_deployment_logs(
     owner: str,
@@ -129,49 +417,141 @@ async def get_deployment_logs(
     authorization: str = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """특정 workflow run의 로그 조회"""
-    try:
-        # JWT 토큰에서 사용자 ID 추출
-        if not authorization or not authorization.startswith("Bearer "):
-            raise HTTPException(status_code=401, detail="Authorization header missing")
-        
-        token = authorization.split(" ")[1]
-        user_id = await get_user_id_from_token(token)
-        
-        # 사용자 서비스 초기화
-        user_service = UserService(db)
-        user = await user_service.get_user_by_id(user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # GitHub 토큰 복호화
-        github_token = await user_service.decrypt_token(user.github_token)
-        github_service = GitHubService(github_token)
-        
-        # 로그 가져오기 (PyGithub가 직접 지원하지 않으므로 raw API 사용)
-        import requests
-        headers = {
-            "Authorization": f"token {github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        # Jobs 가져오기
-        jobs_url = f"https://api.github.com/repos/{owner}/{repo}/actions/runs/{run_id}/jobs"
-        jobs_response = requests.get(jobs_url, headers=headers)
-        jobs_data = jobs_response.json()
-        
-        logs = []
-        for job in jobs_data.get("jobs", []):
-            # 각 job의 로그 URL
-            logs_url = job.get("logs_url")
-            if logs_url:
-                log_response = requests.get(logs_url, headers=headers)
-                logs.append({
-                    "job_name": job.get("name"),
-                    "logs": log_response.text
-                })
-        
-        return {"logs": logs}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get logs: {str(e)}")
\ No newline at end of file
+    """특정 workflow run의 잡 목록과 잡별 로그 스트리밍 경로 조회
+    
+    로그 본문은 /logs/{owner}/{repo}/jobs/{job_id}에서 스트리밍으로 받는다.
+    """
+    repo_full_name = f"{owner}/{repo}"
+    github_token, _ = await _authorize_github(db, authorization, repo_full_name)
+    
+    response = await get_http_client().get(
+        f"https://api.github.com/repos/{repo_full_name}/actions/runs/{run_id}/jobs",
+        headers=_github_headers(github_token),
+        params={"per_page": GITHUB_JOBS_PER_PAGE}
+    )
+    if response.status_code == 404:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"GitHub API error: {response.status_code}")
+    
+    return {
+        "jobs": [
+            {
+                "id": job["id"],
+                "name": job.get("name"),
+                "status": job.get("status"),
+                "conclusion": job.get("conclusion"),
+                "logs_url": f"/api/deployment/logs/{repo_full_name}/jobs/{job['id']}"
+            }
+            for job in response.json().get("jobs", [])
+        ]
+    }
+
+@router.get("/logs/{owner}/{repo}/jobs/{job_id}")
+async def stream_job_logs(
+    owner: str,
+    repo: str,
+    job_id: int,
+    tail: Optional[int] = Query(None, ge=1, le=settings.WORKFLOW_LOG_MAX_TAIL_LINES),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """잡 로그를 청크 단위로 스트리밍 (요청당 메모리 일정)
+    
+    - tail=N: 마지막 N줄만 반환 (Range는 무시)
+    - Range: bytes=N-: N바이트부터 이어받기 (206)
+    - 완료된 잡 로그는 처음 전체를 받을 때 gzip으로 디스크에 저장하고 이후에는 디스크에서 제공
+    - 디스크 캐시도 호출자의 GitHub 토큰으로 잡 조회가 성공한 경우에만 제공
+    """
+    repo_full_name = f"{owner}/{repo}"
+    github_token, registered = await _authorize_github(db, authorization, repo_full_name)
+    start = 0 if tail else _range_start(range_header)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "no-cache"}
+    media_type = "text/plain; charset=utf-8"
+    
+    # 호출자 토큰으로 잡 조회 (저장소 접근 권한 확인 겸 완료 여부 확인)
+    client = get_http_client()
+    job_response = await client.get(
+        f"https://api.github.com/repos/{repo_full_name}/actions/jobs/{job_id}",
+        headers=_github_headers(github_token)
+    )
+    if job_response.status_code == 404:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"GitHub API error: {job_response.status_code}")
+    
+    # 디스크 캐시
+    cached_size = log_store.cached_size(repo_full_name, job_id) if registered else None
+    if cached_size is not None:
+        if start > cached_size:
+            raise HTTPException(status_code=416, detail="Range not satisfiable")
+        body = log_store.iter_cached(repo_full_name, job_id, start)
+        if tail:
+            return StreamingResponse(_tail_lines(body, tail), media_type=media_type, headers=headers)
+        if start:
+            headers["Content-Range"] = f"bytes {start}-{cached_size - 1}/{cached_size}"
+            return StreamingResponse(body, status_code=206, media_type=media_type, headers=headers)
+        headers["Content-Length"] = str(cached_size)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+    
+    # 업스트림: 로그 다운로드 URL(리다이렉트)을 스트림으로 열기
+    cacheable = registered and start == 0 and job_response.json().get("status") == "completed"
+    
+    request_headers = _github_headers(github_token)
+    if start:
+        request_headers["Range"] = f"bytes={start}-"
+    upstream = await client.send(
+        client.build_request(
+            "GET",
+            f"https://api.github.com/repos/{repo_full_name}/actions/jobs/{job_id}/logs",
+            headers=request_headers
+        ),
+        stream=True,
+        follow_redirects=True
+    )
+    if upstream.status_code == 416:
+        await upstream.aclose()
+        raise HTTPException(status_code=416, detail="Range not satisfiable")
+    if upstream.status_code not in (200, 206):
+        await upstream.aclose()
+        raise HTTPException(status_code=502, detail=f"GitHub log download error: {upstream.status_code}")
+    
+    async def upstream_chunks() -> AsyncIterator[bytes]:
+        writer = log_store.open_writer(repo_full_name, job_id) if cacheable else None
+        try:
+            async for chunk in upstream.aiter_bytes(settings.WORKFLOW_LOG_CHUNK_SIZE):
+                if writer:
+                    await asyncio.to_thread(writer.write, chunk)
+                yield chunk
+            if writer:
+                await asyncio.to_thread(writer.commit)
+                writer = None
+                await asyncio.to_thread(log_store.sweep)
+        finally:
+            await upstream.aclose()
+            if writer:
+                # 클라이언트가 중간에 끊으면 불완전한 캐시는 버림
+                writer.discard()
+    
+    body = upstream_chunks()
+    if tail:
+        return StreamingResponse(_tail_lines(body, tail), media_type=media_type, headers=headers)
+    if not start:
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+    
+    if upstream.status_code == 206:
+        if upstream.headers.get("content-range"):
+            headers["Content-Range"] = upstream.headers["content-range"]
+    else:
+        # 업스트림이 Range를 무시하면 앞부분을 건너뛰며 전달
+        # (content-encoding이 있으면 content-length가 압축 크기이므로 사용하지 않음)
+        total = None if upstream.headers.get("content-encoding") else upstream.headers.get("content-length")
+        if total:
+            total = int(total)
+            if start >= total:
+                await upstream.aclose()
+                raise HTTPException(status_code=416, detail="Range not satisfiable")
+            headers["Content-Range"] = f"bytes {start}-{total - 1}/{total}"
+        body = _skip_bytes(body, start)
+    return StreamingResponse(body, status_code=206, media_type=media_type, headers=headers)
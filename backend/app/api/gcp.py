@@ -1,13 +1,22 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
-from app.services.user_service import UserService
+from app.core.http_client import get_http_client
+from app.services.user_service import UserService, refresh_google_token_single_flight
 from app.api.github import get_user_id_from_token
+from typing import AsyncIterator, Dict, List
+import asyncio
 import httpx
 import json
+import time
 
 router = APIRouter()
 
+# Resource Manager 페이지 크기 (최대 1000)
+GCP_PROJECTS_PAGE_SIZE = 500
+
 @router.get("/test-connection")
 async def test_gcp_connection(
     user_id: int = Depends(get_user_id_from_token),
@@ -62,12 +71,104 @@ async def test_gcp_connection(
             "has_refresh_token": bool(google_refresh_token)
         }
 
+class GCPTokenExpired(Exception):
+    """Google 토큰 만료 (갱신 실패)"""
+
+# 사용자별 프로젝트 목록 캐시와 진행 중인 전체 조회 (동시 요청은 한 번의 조회를 공유)
+_projects_cache: Dict[int, Dict] = {}
+_projects_inflight: Dict[int, asyncio.Task] = {}
+
+def _simplify_project(proj: Dict) -> Dict:
+    """필요한 정보만 추출"""
+    return {
+        "projectId": proj["projectId"],
+        "name": proj.get("name", proj["projectId"]),
+        "projectNumber": proj.get("projectNumber", ""),
+        "lifecycleState": proj.get("lifecycleState", "ACTIVE")
+    }
+
+async def iter_gcp_project_pages(user_id: int, google_token: str) -> AsyncIterator[List[Dict]]:
+    """Resource Manager 프로젝트 목록을 nextPageToken을 따라 페이지 단위로 스트리밍
+
+    요청 세션이 끝난 뒤(단일 실행 태스크, 스트리밍 응답)에도 실행되므로 요청 세션을 받지 않고,
+    토큰 갱신은 자체 세션을 여는 single-flight 갱신을 사용한다.
+    """
+    client = get_http_client()
+    page_token = None
+    refreshed = False
+    
+    while True:
+        params = {
+            "filter": "lifecycleState:ACTIVE",
+            "pageSize": GCP_PROJECTS_PAGE_SIZE
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        
+        response = await client.get(
+            "https://cloudresourcemanager.googleapis.com/v1/projects",
+            headers={
+                "Authorization": f"Bearer {google_token}",
+                "Accept": "application/json"
+            },
+            params=params
+        )
+        
+        if response.status_code == 401 and not refreshed:
+            print(f"GCP API Error: Unauthorized - Attempting to refresh token")
+            # 토큰 갱신 시도
+            new_token = await refresh_google_token_single_flight(user_id)
+            if not new_token:
+                raise GCPTokenExpired()
+            google_token = new_token
+            refreshed = True
+            print("Token refreshed, retrying API call...")
+            continue
+        
+        if response.status_code != 200:
+            raise Exception(f"GCP API Error: {response.status_code} - {response.text}")
+        
+        data = response.json()
+        yield [_simplify_project(proj) for proj in data.get("projects", [])]
+        
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+
+async def _load_all_projects(user_id: int, google_token: str) -> List[Dict]:
+    """모든 페이지를 읽어 캐시에 저장"""
+    projects = []
+    async for page in iter_gcp_project_pages(user_id, google_token):
+        projects.extend(page)
+    
+    print(f"Found {len(projects)} GCP projects")
+    _projects_cache[user_id] = {
+        "projects": projects,
+        "expires_at": time.monotonic() + settings.GCP_PROJECTS_CACHE_TTL_SECONDS
+    }
+    return projects
+
+async def get_cached_projects(user_id: int, google_token: str, refresh: bool = False) -> List[Dict]:
+    """캐시된 프로젝트 목록 반환, 만료되었거나 refresh면 전체 조회 (사용자별 단일 실행)"""
+    cached = _projects_cache.get(user_id)
+    if cached and not refresh and cached["expires_at"] > time.monotonic():
+        return cached["projects"]
+    
+    task = _projects_inflight.get(user_id)
+    if task is None:
+        task = asyncio.create_task(_load_all_projects(user_id, google_token))
+        _projects_inflight[user_id] = task
+        task.add_done_callback(lambda _: _projects_inflight.pop(user_id, None))
+    
+    return await asyncio.shield(task)
+
 @router.get("/projects")
 async def get_projects(
+    refresh: bool = False,
     user_id: int = Depends(get_user_id_from_token),
     db: AsyncSession = Depends(get_db)
 ):
-    """사용자의 실제 GCP 프로젝트 목록 가져오기"""
+    """사용자의 실제 GCP 프로젝트 목록 가져오기 (전체 페이지, 사용자별 캐시)"""
     
     # DB에서 사용자의 Google 토큰 가져오기
     user_service = UserService(db)
@@ -85,93 +186,81 @@ async def get_projects(
             }
         ]
     
-    # 토큰 갱신을 위한 재시도 카운터
-    retry_count = 0
+    try:
+        projects = await get_cached_projects(user_id, google_token, refresh)
+    except GCPTokenExpired:
+        # 토큰 갱신 실패
+        raise HTTPException(
+            status_code=401, 
+            detail="Google 토큰이 만료되었습니다. 다시 연결해주세요."
+        )
+    except Exception as e:
+        print(f"Error fetching GCP projects: {e}")
+        print(f"Error type: {type(e)}")
+        # 에러 시 Mock 데이터
+        return [
+            {
+                "projectId": "my-project-2024",
+                "name": "My Project 2024",
+                "projectNumber": "123456789",
+                "lifecycleState": "ACTIVE"
+            },
+            {
+                "projectId": "test-cicd-project",
+                "name": "Test CI/CD Project",
+                "projectNumber": "987654321",
+                "lifecycleState": "ACTIVE"
+            }
+        ]
+    
+    # 프로젝트가 없으면 도움말 메시지와 함께 반환
+    if not projects:
+        return [{
+            "projectId": "no-projects-found",
+            "name": "프로젝트가 없습니다. GCP Console에서 프로젝트를 먼저 생성해주세요.",
+            "projectNumber": "",
+            "lifecycleState": "ACTIVE"
+        }]
+    
+    return projects
+
+@router.get("/projects/stream")
+async def stream_projects(
+    user_id: int = Depends(get_user_id_from_token),
+    db: AsyncSession = Depends(get_db)
+):
+    """GCP 프로젝트 목록을 페이지가 도착하는 대로 NDJSON으로 전송"""
+    user_service = UserService(db)
+    tokens = await user_service.get_user_tokens(user_id)
+    
+    google_token = tokens.get("google_token")
+    if not google_token:
+        raise HTTPException(status_code=400, detail="Google Cloud 연결이 필요합니다")
+    
+    cached = _projects_cache.get(user_id)
     
-    while retry_count < 2:
+    async def generate():
+        # 캐시가 유효하면 한 번에 전송
+        if cached and cached["expires_at"] > time.monotonic():
+            yield json.dumps(cached["projects"]) + "\n"
+            return
+        
+        projects = []
         try:
-            # Google Cloud Resource Manager API 호출
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://cloudresourcemanager.googleapis.com/v1/projects",
-                    headers={
-                        "Authorization": f"Bearer {google_token}",
-                        "Accept": "application/json"
-                    },
-                    params={
-                        "filter": "lifecycleState:ACTIVE"
-                    }
-                )
-            
-            print(f"GCP API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                projects = data.get("projects", [])
-                
-                print(f"Found {len(projects)} GCP projects")
-                
-                # 프로젝트가 없으면 도움말 메시지와 함께 반환
-                if not projects:
-                    return [{
-                        "projectId": "no-projects-found",
-                        "name": "프로젝트가 없습니다. GCP Console에서 프로젝트를 먼저 생성해주세요.",
-                        "projectNumber": "",
-                        "lifecycleState": "ACTIVE"
-                    }]
-                
-                # 필요한 정보만 추출
-                return [
-                    {
-                        "projectId": proj["projectId"],
-                        "name": proj.get("name", proj["projectId"]),
-                        "projectNumber": proj.get("projectNumber", ""),
-                        "lifecycleState": proj.get("lifecycleState", "ACTIVE")
-                    }
-                    for proj in projects
-                ]
-            elif response.status_code == 401 and retry_count == 0:
-                print(f"GCP API Error: Unauthorized - Attempting to refresh token")
-                # 토큰 갱신 시도
-                new_token = await user_service.refresh_google_token(user_id)
-                if new_token:
-                    google_token = new_token
-                    retry_count += 1
-                    print("Token refreshed, retrying API call...")
-                    continue
-                else:
-                    # 토큰 갱신 실패
-                    raise HTTPException(
-                        status_code=401, 
-                        detail="Google 토큰이 만료되었습니다. 다시 연결해주세요."
-                    )
-            else:
-                print(f"GCP API Error: {response.status_code} - {response.text}")
-                error_data = response.json() if response.text else {}
-                print(f"Error details: {error_data}")
-                break
-                
-        except HTTPException:
-            raise
+            async for page in iter_gcp_project_pages(user_id, google_token):
+                projects.extend(page)
+                yield json.dumps(page) + "\n"
+        except GCPTokenExpired:
+            yield json.dumps({"error": "Google 토큰이 만료되었습니다. 다시 연결해주세요."}) + "\n"
+            return
         except Exception as e:
-            print(f"Error fetching GCP projects: {e}")
-            print(f"Error type: {type(e)}")
-            break
+            yield json.dumps({"error": str(e)}) + "\n"
+            return
         
-        retry_count += 1
-    
-    # 에러 시 Mock 데이터
-    return [
-        {
-            "projectId": "my-project-2024",
-            "name": "My Project 2024",
-            "projectNumber": "123456789",
-            "lifecycleState": "ACTIVE"
-        },
-        {
-            "projectId": "test-cicd-project",
-            "name": "Test CI/CD Project",
-            "projectNumber": "987654321",
-            "lifecycleState": "ACTIVE"
+        # 전체 조회가 끝나면 캐시에 저장
+        _projects_cache[user_id] = {
+            "projects": projects,
+            "expires_at": time.monotonic() + settings.GCP_PROJECTS_CACHE_TTL_SECONDS
         }
-    ]
\ No newline at end of file
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
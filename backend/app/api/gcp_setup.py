@@ -4,6 +4,7 @@ from app.core.database import get_db
 from app.services.user_service import UserService
 from app.services.gcp_service import GCPService
 from app.services.github_service import GitHubService
+from app.services.service_account_registry import ServiceAccountRegistry
 from app.api.github import get_user_id_from_token
 from typing import Dict
 import json
@@ -20,7 +21,6 @@ async def create_service_account_for_cicd(
     """CI/CD를 위한 GCP 서비스 계정 생성 및 GitHub Secret 설정"""
     project_id = data.get("gcp_project_id")
     repo_full_name = data.get("repo_full_name")
-    service_name = data.get("service_name", "github-actions")
     
     if not project_id or not repo_full_name:
         raise HTTPException(status_code=400, detail="Project ID and repository name required")
@@ -45,25 +45,14 @@ async def create_service_account_for_cicd(
         print("Enabling required APIs...")
         api_results = gcp_service.enable_apis(project_id)
         
-        # 2. 서비스 계정 생성
-        print(f"Creating service account for project {project_id}...")
-        account_id = f"{service_name}-sa"
-        service_account = gcp_service.create_service_account(project_id, account_id)
+        # 2. 서비스 계정 및 키 (등록된 것이 있으면 재사용, 권한 부여 포함)
+        print(f"Resolving service account for project {project_id}...")
+        registry = ServiceAccountRegistry(db, gcp_service, user_id)
+        service_account = await registry.get_or_create(project_id, repo_full_name)
         service_account_email = service_account['email']
+        key_json_str = service_account['key_json']
         
-        # 3. 권한 부여
-        print(f"Granting permissions to {service_account_email}...")
-        gcp_service.grant_permissions(project_id, service_account_email)
-        
-        # 4. 서비스 계정 키 생성
-        print("Creating service account key...")
-        key_data_base64 = gcp_service.create_service_account_key(project_id, service_account_email)
-        
-        # 5. Base64 디코딩하여 JSON 형식 확인
-        key_json_str = base64.b64decode(key_data_base64).decode('utf-8')
-        key_json = json.loads(key_json_str)
-        
-        # 6. GitHub Secret에 저장
+        # 3. GitHub Secret에 저장
         print("Setting up GitHub secrets...")
         secrets_to_create = {
             "GCP_SA_KEY": key_json_str,  # JSON 문자열로 저장
@@ -1,32 +1,36 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.services.user_service import UserService
 from app.models.user import User
+from app.services.github_repo_cache import github_repo_cache
+from app.core.security import decode_access_token
+from typing import Optional
 import httpx
 import jwt
 from app.core.config import settings
 
 router = APIRouter()
 
+# 타입어헤드 검색 기본 결과 수
+TYPEAHEAD_DEFAULT_LIMIT = 20
+
 def get_user_id_from_token(authorization: str = Header(None)) -> int:
     """JWT 토큰에서 사용자 ID 추출"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="인증 필요")
     
-    token = authorization.replace("Bearer ", "")
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return int(payload.get("sub"))
-    except:
-        raise HTTPException(status_code=401, detail="유효하지 않은 토큰")
+    return decode_access_token(authorization.replace("Bearer ", ""))
 
 @router.get("/repos")
 async def get_repositories(
+    q: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    refresh: bool = False,
     user_id: int = Depends(get_user_id_from_token),
     db: AsyncSession = Depends(get_db)
 ):
-    """사용자의 GitHub repository 목록 가져오기"""
+    """사용자의 GitHub repository 목록 가져오기 (전체 페이지, 사용자별 캐시, q로 검색)"""
     # DB에서 사용자의 GitHub 토큰 가져오기
     user_service = UserService(db)
     tokens = await user_service.get_user_tokens(user_id)
@@ -35,41 +39,16 @@ async def get_repositories(
     if not github_token:
         raise HTTPException(status_code=400, detail="GitHub 연결이 필요합니다")
     
-    # GitHub API 호출
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.github.com/user/repos",
-            headers={
-                "Authorization": f"token {github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            },
-            params={
-                "sort": "updated",
-                "per_page": 30
-            }
-        )
-    
-    if response.status_code != 200:
+    try:
+        index = await github_repo_cache.get_index(user_id, github_token, refresh)
+    except Exception as e:
+        print(f"Failed to fetch repositories: {e}")
         raise HTTPException(status_code=400, detail="Repository 목록 가져오기 실패")
     
-    repos = response.json()
-    
-    # 필요한 정보만 추출
-    simplified_repos = [
-        {
-            "id": repo["id"],
-            "name": repo["name"],
-            "full_name": repo["full_name"],
-            "private": repo["private"],
-            "default_branch": repo["default_branch"],
-            "updated_at": repo["updated_at"],
-            "language": repo["language"],
-            "description": repo["description"]
-        }
-        for repo in repos
-    ]
+    if q:
+        return index.search(q, limit or TYPEAHEAD_DEFAULT_LIMIT)
     
-    return simplified_repos
+    return index.repos[:limit] if limit else index.repos
 
 @router.post("/repos/{repo_full_name}/enable-actions")
 async def enable_github_actions(repo_full_name: str, authorization: str = Header(None)):
@@ -1,59 +1,112 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.database import get_db
+from sqlalchemy import select, tuple_
+from app.core.database import get_db, release_connection
 from app.models.project import Project
-from app.models.user import User
 from app.api.auth import get_current_user
-from typing import List
+from app.services.principal_cache import Principal
+from app.core.config import settings
+from app.services.gcp_service import GCPService
+from app.services.user_service import UserService
+from app.services.revision_index import revision_index
+from app.core.http_client import get_http_client
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from pydantic import BaseModel
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import base64
 
 router = APIRouter()
 
+# Cloud Run 조회(동기 클라이언트) 전용 스레드 풀
+# 타임아웃은 대기만 취소하고 스레드는 끝까지 실행되므로, 느린 업스트림이 쌓여도 스레드 수는 여기서 제한됨
+_dashboard_executor = ThreadPoolExecutor(
+    max_workers=settings.DASHBOARD_THREAD_WORKERS,
+    thread_name_prefix="dashboard-upstream"
+)
+
+def shutdown_dashboard_executor():
+    _dashboard_executor.shutdown(wait=False, cancel_futures=True)
+
 class ProjectResponse(BaseModel):
     id: int
     github_repo: str
     gcp_project_id: str
     service_name: str
     region: str
-    deployment_url: str
-    workflow_path: str
+    deployment_url: Optional[str] = None
+    workflow_path: Optional[str] = None
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
+
+class ProjectPageResponse(BaseModel):
+    projects: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+
+# 목록 응답에 필요한 컬럼만 조회 (ORM 객체 생성 없이)
+PROJECT_LIST_COLUMNS = (
+    Project.id,
+    Project.github_repo,
+    Project.gcp_project_id,
+    Project.service_name,
+    Project.region,
+    Project.deployment_url,
+    Project.workflow_path,
+    Project.created_at,
+    Project.updated_at
+)
+
+def encode_project_cursor(created_at: datetime, project_id: int) -> str:
+    """마지막 행의 (created_at, id)를 불투명한 커서 문자열로 변환"""
+    raw = f"{created_at.isoformat()}|{project_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_project_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, project_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(project_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@router.get("/me", response_model=List[ProjectResponse])
+@router.get("/me", response_model=ProjectPageResponse)
 async def get_my_projects(
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(settings.PROJECT_PAGE_SIZE, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """로그인한 사용자의 프로젝트 목록 조회"""
-    result = await db.execute(
-        select(Project)
+    """로그인한 사용자의 프로젝트 목록 조회 (최신순, (created_at, id) 커서 페이지네이션)"""
+    query = (
+        select(*PROJECT_LIST_COLUMNS)
         .where(Project.user_id == current_user.id)
-        .order_by(Project.created_at.desc())
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(limit + 1)
     )
-    projects = result.scalars().all()
+    if cursor:
+        created_at, project_id = decode_project_cursor(cursor)
+        query = query.where(tuple_(Project.created_at, Project.id) < (created_at, project_id))
     
-    return [
-        ProjectResponse(
-            id=project.id,
-            github_repo=project.github_repo,
-            gcp_project_id=project.gcp_project_id,
-            service_name=project.service_name,
-            region=project.region,
-            deployment_url=project.deployment_url,
-            workflow_path=project.workflow_path,
-            created_at=project.created_at,
-            updated_at=project.updated_at
-        )
-        for project in projects
-    ]
+    result = await db.execute(query)
+    rows = result.mappings().all()
+    
+    # 한 행 더 조회해서 다음 페이지 존재 여부 확인
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_project_cursor(last["created_at"], last["id"])
+    
+    return ProjectPageResponse(
+        projects=[ProjectResponse(**row) for row in rows],
+        next_cursor=next_cursor
+    )
 
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """프로젝트 삭제"""
@@ -69,4 +122,147 @@ async def delete_project(
     await db.delete(project)
     await db.commit()
     
-    return {"message": "Project deleted successfully"}
\ No newline at end of file
+    return {"message": "Project deleted successfully"}
+
+# 업스트림별 마지막 성공 결과 (타임아웃 시 stale로 반환, 가장 오래 쓰지 않은 항목부터 제거)
+_dashboard_last_results: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+
+def _remember_result(key: Tuple[str, int], data: Any):
+    _dashboard_last_results[key] = data
+    _dashboard_last_results.move_to_end(key)
+    while len(_dashboard_last_results) > settings.DASHBOARD_LAST_RESULTS_MAX:
+        _dashboard_last_results.popitem(last=False)
+
+async def _fetch_with_fallback(
+    upstream: str,
+    project_id: int,
+    semaphore: asyncio.Semaphore,
+    fetch: Callable[[], Awaitable[Any]]
+) -> Dict:
+    """세마포어와 타임아웃을 적용해 조회하고, 실패하면 마지막 결과를 stale로 반환
+    
+    타임아웃은 세마포어 대기까지 포함하므로 대시보드 응답은 DASHBOARD_UPSTREAM_TIMEOUT을 넘지 않는다.
+    """
+    key = (upstream, project_id)
+    
+    async def guarded():
+        async with semaphore:
+            return await fetch()
+    
+    try:
+        data = await asyncio.wait_for(guarded(), timeout=settings.DASHBOARD_UPSTREAM_TIMEOUT)
+        _remember_result(key, data)
+        return {"data": data, "stale": False, "error": None}
+    except asyncio.TimeoutError:
+        error = f"{upstream} timed out"
+    except Exception as e:
+        error = str(e)
+    print(f"Dashboard upstream {upstream} failed for project {project_id}: {error}")
+    return {"data": _dashboard_last_results.get(key), "stale": True, "error": error}
+
+async def _not_connected(provider: str) -> Dict:
+    """연결되지 않은 업스트림 결과"""
+    return {"data": None, "stale": False, "error": f"{provider} not connected"}
+
+@router.get("/dashboard")
+async def get_dashboard(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """모든 프로젝트의 리비전과 워크플로우 상태를 한 번에 조회
+    
+    프로젝트별 Cloud Run / GitHub Actions 조회를 동시에 실행하며,
+    느린 업스트림은 마지막 결과를 stale로 표시해 반환한다.
+    """
+    result = await db.execute(
+        select(Project)
+        .where(Project.user_id == current_user.id)
+        .order_by(Project.created_at.desc())
+    )
+    projects = result.scalars().all()
+    
+    user_service = UserService(db)
+    tokens = await user_service.get_user_tokens(current_user.id)
+    github_token = tokens.get("github_token")
+    google_token = tokens.get("google_token")
+    
+    # 업스트림 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+    await release_connection(db)
+    
+    gcp_service = GCPService(google_token) if google_token else None
+    semaphore = asyncio.Semaphore(settings.DASHBOARD_MAX_CONCURRENCY)
+    
+    client = get_http_client()
+    
+    def fetch_revisions(project: Project):
+        async def fetch():
+            loop = asyncio.get_running_loop()
+            page = await loop.run_in_executor(
+                _dashboard_executor,
+                revision_index.get_page,
+                gcp_service,
+                project.gcp_project_id,
+                project.region,
+                project.service_name.lower(),
+                settings.DASHBOARD_REVISION_LIMIT
+            )
+            return [
+                {
+                    "name": rev["name"],
+                    "created_at": rev["metadata"].get("creationTimestamp", ""),
+                    "is_active": rev.get("is_active", False),
+                    "traffic_percent": rev.get("traffic_percent", 0)
+                }
+                for rev in page["revisions"]
+            ]
+        return fetch
+    
+    def fetch_latest_run(project: Project):
+        async def fetch():
+            response = await client.get(
+                f"https://api.github.com/repos/{project.github_repo}/actions/runs",
+                headers={
+                    "Authorization": f"token {github_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                },
+                params={"per_page": 1}
+            )
+            response.raise_for_status()
+            runs = response.json().get("workflow_runs", [])
+            if not runs:
+                return None
+            run = runs[0]
+            return {
+                "id": run["id"],
+                "name": run.get("name"),
+                "status": run.get("status"),
+                "conclusion": run.get("conclusion"),
+                "html_url": run.get("html_url"),
+                "updated_at": run.get("updated_at")
+            }
+        return fetch
+    
+    async def load_project(project: Project) -> Dict:
+        revisions, workflow = await asyncio.gather(
+            _fetch_with_fallback("cloud_run", project.id, semaphore, fetch_revisions(project))
+            if gcp_service else _not_connected("Google Cloud"),
+            _fetch_with_fallback("github_actions", project.id, semaphore, fetch_latest_run(project))
+            if github_token else _not_connected("GitHub")
+        )
+        return {
+            "id": project.id,
+            "github_repo": project.github_repo,
+            "gcp_project_id": project.gcp_project_id,
+            "service_name": project.service_name,
+            "region": project.region,
+            "deployment_url": project.deployment_url,
+            "revisions": revisions,
+            "latest_workflow_run": workflow
+        }
+    
+    dashboard = await asyncio.gather(*[load_project(project) for project in projects])
+    
+    return {
+        "projects": dashboard,
+        "stale": any(p["revisions"]["stale"] or p["latest_workflow_run"]["stale"] for p in dashboard)
+    }
\ No newline at end of file
@@ -1,21 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, release_connection
 from app.models.project import Project
-from app.models.user import User
+from app.models.deployment import Deployment
 from app.api.auth import get_current_user
+from app.services.principal_cache import Principal
 from app.services.github_service import GitHubService
 from app.services.gcp_service import GCPService
 from app.services.user_service import UserService
+from app.services.revision_index import revision_index
+from app.services.deployment_history_service import DeploymentHistoryService
+from app.services.side_effects import side_effects
+from app.services.deployment_syncer import deployment_syncer
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional, Set
 import re
+import asyncio
+import copy
+import time
 
 router = APIRouter()
 
 class RollbackRequest(BaseModel):
-    project_id: int
+    project_id: Optional[int] = None  # 경로의 project_id가 우선
     target_version: Optional[str] = None  # 특정 버전으로 롤백, 없으면 이전 버전
 
 class RollbackResponse(BaseModel):
@@ -24,14 +33,79 @@ class RollbackResponse(BaseModel):
     previous_version: str
     current_version: str
     rollback_url: Optional[str] = None
+    latency_ms: Optional[float] = None  # 요청 수신부터 트래픽 전환 완료까지
+
+def previous_revision(revisions: List[Dict], current_revision_name: Optional[str], unhealthy: Set[str]) -> Optional[str]:
+    """현재 리비전보다 먼저 만들어진 리비전 중 비정상 표시되지 않은 가장 최신 리비전
+    
+    이전 롤백에서 비정상으로 표시된 리비전이나 현재보다 새 리비전으로는 되돌리지 않는다.
+    """
+    created_at = {r['name']: r['metadata'].get('creationTimestamp', '') for r in revisions}
+    current_created_at = created_at.get(current_revision_name)
+    candidates = [
+        r for r in revisions
+        if r['name'] != current_revision_name
+        and r['name'] not in unhealthy
+        and (current_created_at is None or created_at[r['name']] < current_created_at)
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda r: created_at[r['name']])['name']
+
+async def resolve_rollback_target(
+    gcp_service: GCPService,
+    history_service: DeploymentHistoryService,
+    project: Project,
+    current_revision_name: Optional[str],
+    target_version: Optional[str] = None
+) -> str:
+    """롤백 대상 리비전 결정: 명시한 버전 > 마지막 정상 리비전 > 최신 리비전 목록"""
+    service_name = project.service_name.lower()
+    
+    if target_version:
+        target_revision_name = target_version
+    else:
+        last_known_good = await history_service.get_last_known_good(
+            project.id,
+            exclude_revision=current_revision_name
+        )
+        unhealthy = set() if last_known_good else await history_service.get_unhealthy_revisions(project.id)
+        await release_connection(history_service.db)
+        if last_known_good:
+            target_revision_name = last_known_good.revision_name
+        else:
+            # 기록이 없는 경우에만 리비전 목록에서 현재 리비전보다 먼저 만들어진 가장 최신 리비전 선택
+            revision_index.invalidate(project.gcp_project_id, project.region, service_name)
+            revisions = await asyncio.to_thread(
+                gcp_service.get_service_revisions,
+                project.gcp_project_id,
+                project.region,
+                service_name
+            )
+            target_revision_name = previous_revision(revisions, current_revision_name, unhealthy)
+            if not target_revision_name:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"No previous revision available for rollback: {service_name}"
+                )
+    
+    if target_revision_name == current_revision_name:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{target_revision_name} is already serving"
+        )
+    
+    return target_revision_name
 
 @router.post("/rollback/{project_id}", response_model=RollbackResponse)
 async def rollback_deployment(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Optional[RollbackRequest] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """배포를 이전 버전으로 롤백"""
+    """배포를 마지막 정상 버전(또는 target_version)으로 롤백"""
+    started_at = time.perf_counter()
     
     # 프로젝트 조회
     result = await db.execute(
@@ -55,47 +129,59 @@ async def rollback_deployment(
     if not github_token or not google_token:
         raise HTTPException(status_code=401, detail="GitHub and GCP tokens required")
     
+    # Cloud Run 호출 동안 DB 커넥션을 잡고 있지 않도록 반환 (기록 갱신 시 다시 획득)
+    await release_connection(db)
+    
     try:
-        # GitHub 서비스 초기화
+        # GitHub 서비스 초기화 (이슈 생성은 백그라운드에서 수행)
         github_service = GitHubService(github_token)
         
         # GCP 서비스 초기화
         gcp_service = GCPService(google_token)
+        history_service = DeploymentHistoryService(db)
         
-        # 1. 현재 Cloud Run 서비스의 리비전 목록 가져오기
+        # 1. 현재 트래픽을 받고 있는 리비전 확인 (서비스 조회 한 번, 리비전 목록 조회 없음)
         service_name = project.service_name.lower()
-        revisions = gcp_service.get_service_revisions(
-            project.gcp_project_id,
-            project.region,
-            service_name
-        )
-        
-        if len(revisions) < 2:
-            raise HTTPException(
-                status_code=400,
-                detail="No previous revision available for rollback"
-            )
+        service = await asyncio.to_thread(gcp_service.get_service, project.gcp_project_id, project.region, service_name)
+        current_revision_name = gcp_service.get_serving_revision(service)
         
-        # 2. 현재 활성 리비전과 이전 리비전 확인
-        current_revision = revisions[0]  # 가장 최신
-        previous_revision = revisions[1]  # 이전 버전
+        # 2. 롤백 대상 결정: 명시한 버전 > 마지막 정상 리비전 > 최신 리비전 목록
+        target_revision_name = await resolve_rollback_target(
+            gcp_service,
+            history_service,
+            project,
+            current_revision_name,
+            request.target_version if request else None
+        )
         
-        # 3. Cloud Run 트래픽을 이전 리비전으로 전환
-        rollback_result = gcp_service.update_traffic(
+        # 3. Cloud Run 트래픽을 대상 리비전으로 전환 (update_traffic 한 번)
+        rollback_result = await asyncio.to_thread(
+            gcp_service.update_traffic,
             project.gcp_project_id,
             project.region,
             service_name,
-            {previous_revision['name']: 100}  # 100% 트래픽을 이전 버전으로
+            {target_revision_name: 100},  # 100% 트래픽을 대상 버전으로
+            service=service
         )
         
-        # 4. GitHub에 롤백 이벤트 기록 (이슈 생성)
+        # 4. 배포 기록 갱신: 롤백된 리비전은 비정상, 대상 리비전은 정상
+        if current_revision_name:
+            await history_service.mark_unhealthy(project.id, current_revision_name, commit=False)
+        await history_service.record_revision(project.id, target_revision_name, is_healthy=True, commit=False)
+        await db.commit()
+        
+        # Cloud Run 트래픽 전환이 확인된 시점까지의 지연 시간
+        latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        print(f"Rollback {service_name} -> {target_revision_name} completed in {latency_ms}ms")
+        
+        # 5. GitHub에 롤백 이벤트 기록 (이슈 생성) - 응답을 막지 않도록 백그라운드에서 재시도 (같은 제목이 열려 있으면 생략)
         issue_body = f"""
 ## 🔄 Rollback Performed
 
 **Service:** {service_name}
 **Region:** {project.region}
-**Previous Version:** {current_revision['name']}
-**Rolled back to:** {previous_revision['name']}
+**Previous Version:** {current_revision_name}
+**Rolled back to:** {target_revision_name}
 **Performed by:** {current_user.email}
 
 ### Reason
@@ -107,32 +193,240 @@ Production issue detected. Rolled back to stable version.
 3. Create a new deployment with the fix
 """
         
-        try:
-            github_service.create_issue(
-                project.github_repo,
-                title=f"[Rollback] {service_name} rolled back to {previous_revision['name']}",
-                body=issue_body,
-                labels=["rollback", "production"]
-            )
-        except Exception as e:
-            # 이슈 생성 실패해도 롤백은 성공한 것으로 처리
-            print(f"Failed to create GitHub issue: {e}")
+        side_effects.dispatch(
+            "rollback-issue",
+            github_service.ensure_issue,
+            project.github_repo,
+            title=f"[Rollback] {service_name} rolled back to {target_revision_name}",
+            body=issue_body,
+            labels=["rollback", "production"]
+        )
         
         return RollbackResponse(
             success=True,
-            message=f"Successfully rolled back to {previous_revision['name']}",
-            previous_version=previous_revision['name'],
-            current_version=current_revision['name'],
-            rollback_url=rollback_result.get('url')
+            message=f"Successfully rolled back to {target_revision_name}",
+            previous_version=target_revision_name,
+            current_version=current_revision_name or "",
+            rollback_url=rollback_result.get('url'),
+            latency_ms=latency_ms
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rollback failed: {str(e)}")
 
+class ServiceRollbackResult(BaseModel):
+    project_id: int
+    service_name: str
+    previous_version: Optional[str] = None  # 롤백 대상 리비전
+    current_version: Optional[str] = None  # 롤백 전 서빙 중이던 리비전
+    success: bool
+    reverted: bool = False
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+class ProjectRollbackResponse(BaseModel):
+    success: bool
+    message: str
+    services: List[ServiceRollbackResult]
+    latency_ms: float
+
+@router.post("/rollback-project/{project_id}", response_model=ProjectRollbackResponse)
+async def rollback_project(
+    project_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """같은 저장소/GCP 프로젝트로 배포된 모든 Cloud Run 서비스를 함께 롤백
+    
+    모든 서비스의 트래픽을 동시에 전환하고, 하나라도 실패하면 이미 전환된 서비스를 원래대로 되돌린다.
+    """
+    started_at = time.perf_counter()
+    
+    result = await db.execute(
+        select(Project).where(
+            Project.id == project_id,
+            Project.user_id == current_user.id
+        )
+    )
+    project = result.scalar_one_or_none()
+    
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    # 같은 배포에 속한 서비스들 (프론트엔드 + 백엔드 등)
+    result = await db.execute(
+        select(Project).where(
+            Project.user_id == current_user.id,
+            Project.github_repo == project.github_repo,
+            Project.gcp_project_id == project.gcp_project_id
+        )
+    )
+    projects = {}
+    for p in result.scalars().all():
+        key = (p.region, p.service_name.lower())
+        projects.setdefault(key, p)
+    projects = list(projects.values())
+    
+    user_service = UserService(db)
+    tokens = await user_service.get_user_tokens(current_user.id)
+    
+    github_token = tokens.get("github_token")
+    google_token = tokens.get("google_token")
+    
+    if not github_token or not google_token:
+        raise HTTPException(status_code=401, detail="GitHub and GCP tokens required")
+    
+    # Cloud Run 호출 동안 DB 커넥션을 잡고 있지 않도록 반환 (기록 갱신 시 다시 획득)
+    await release_connection(db)
+    
+    gcp_service = GCPService(google_token)
+    history_service = DeploymentHistoryService(db)
+    
+    try:
+        # 1. 모든 서비스의 현재 상태를 동시에 조회
+        services = await asyncio.gather(*[
+            asyncio.to_thread(gcp_service.get_service, p.gcp_project_id, p.region, p.service_name.lower())
+            for p in projects
+        ])
+        
+        # 2. 대상 리비전 결정 (하나라도 결정할 수 없으면 아무것도 바꾸지 않음)
+        plans = []
+        for p, service in zip(projects, services):
+            current_revision_name = gcp_service.get_serving_revision(service)
+            target_revision_name = await resolve_rollback_target(
+                gcp_service, history_service, p, current_revision_name
+            )
+            # 되돌릴 때는 spec.traffic을 그대로 복원 (latestRevision, tag 유지)
+            # switch의 update_traffic이 service를 수정하므로 복사해 둠
+            original_traffic = copy.deepcopy(service.get('spec', {}).get('traffic', []))
+            plans.append({
+                'project': p,
+                'service': service,
+                'current': current_revision_name,
+                'target': target_revision_name,
+                'original_traffic': original_traffic
+            })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rollback failed: {str(e)}")
+    
+    async def switch(plan: Dict) -> ServiceRollbackResult:
+        p = plan['project']
+        switch_started_at = time.perf_counter()
+        try:
+            await asyncio.to_thread(
+                gcp_service.update_traffic,
+                p.gcp_project_id,
+                p.region,
+                p.service_name.lower(),
+                {plan['target']: 100},
+                service=plan['service']
+            )
+            success, error = True, None
+        except Exception as e:
+            success, error = False, str(e)
+        return ServiceRollbackResult(
+            project_id=p.id,
+            service_name=p.service_name.lower(),
+            previous_version=plan['target'],
+            current_version=plan['current'],
+            success=success,
+            latency_ms=round((time.perf_counter() - switch_started_at) * 1000, 1),
+            error=error
+        )
+    
+    async def revert(plan: Dict, service_result: ServiceRollbackResult):
+        p = plan['project']
+        try:
+            # 원래 서비스 정보는 이미 변경되었으므로 새로 조회해서 되돌림
+            await asyncio.to_thread(
+                gcp_service.restore_traffic,
+                p.gcp_project_id,
+                p.region,
+                p.service_name.lower(),
+                plan['original_traffic']
+            )
+            service_result.reverted = True
+        except Exception as e:
+            service_result.error = f"Revert failed: {e}"
+    
+    # 3. 모든 서비스 트래픽 동시 전환
+    service_results = await asyncio.gather(*[switch(plan) for plan in plans])
+    all_succeeded = all(r.success for r in service_results)
+    
+    if not all_succeeded:
+        # 4. 일부 실패 시 전환된 서비스 되돌리기
+        await asyncio.gather(*[
+            revert(plan, r)
+            for plan, r in zip(plans, service_results)
+            if r.success and plan['original_traffic']
+        ])
+    else:
+        # 5. 배포 기록 갱신
+        for plan in plans:
+            if plan['current']:
+                await history_service.mark_unhealthy(plan['project'].id, plan['current'], commit=False)
+            await history_service.record_revision(plan['project'].id, plan['target'], is_healthy=True, commit=False)
+        await db.commit()
+    
+    latency_ms = round((time.perf_counter() - started_at) * 1000, 1)
+    print(f"Project rollback {project.github_repo} ({len(plans)} services) finished in {latency_ms}ms, success={all_succeeded}")
+    
+    if all_succeeded:
+        summary = "\n".join(
+            f"- **{r.service_name}**: {r.current_version} → {r.previous_version}"
+            for r in service_results
+        )
+        side_effects.dispatch(
+            "project-rollback-issue",
+            GitHubService(github_token).ensure_issue,
+            project.github_repo,
+            title=f"[Rollback] {project.github_repo} rolled back ({len(service_results)} services)",
+            body=f"""
+## 🔄 Rollback Performed
+
+**Region:** {project.region}
+**Performed by:** {current_user.email}
+
+### Services
+{summary}
+""",
+            labels=["rollback", "production"]
+        )
+    
+    return ProjectRollbackResponse(
+        success=all_succeeded,
+        message=_project_rollback_message(service_results, all_succeeded),
+        services=service_results,
+        latency_ms=latency_ms
+    )
+
+def _project_rollback_message(service_results: List[ServiceRollbackResult], all_succeeded: bool) -> str:
+    """실제 전환/되돌림 결과로 응답 메시지 작성 (되돌리지 못한 서비스는 이름을 밝힘)"""
+    if all_succeeded:
+        return f"Successfully rolled back {len(service_results)} services"
+    
+    failed = [r.service_name for r in service_results if not r.success]
+    reverted = [r.service_name for r in service_results if r.success and r.reverted]
+    stuck = [r.service_name for r in service_results if r.success and not r.reverted]
+    
+    message = f"Rollback failed for {', '.join(failed)}"
+    if stuck:
+        # 되돌리기 실패(또는 복원할 트래픽 정보 없음) - 새 리비전에 남아 있음
+        message += f"; could not revert {', '.join(stuck)}, still serving the rollback target"
+    if reverted:
+        message += f"; reverted {', '.join(reverted)}"
+    return message
+
 @router.get("/revisions/{project_id}")
 async def get_deployment_revisions(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(settings.REVISION_PAGE_SIZE, ge=1, le=100),
+    continue_token: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """배포된 리비전 목록 조회"""
@@ -157,36 +451,68 @@ async def get_deployment_revisions(
     if not google_token:
         raise HTTPException(status_code=401, detail="GCP token required")
     
+    # Cloud Run 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+    await release_connection(db)
+    
     try:
         # GCP 서비스 초기화
         gcp_service = GCPService(google_token)
         
-        # Cloud Run 서비스의 리비전 목록 가져오기
+        # Cloud Run 서비스의 리비전 한 페이지 가져오기 (TTL 캐시, 캐시 미스 시 동기 호출이므로 스레드에서)
+        # 페이지 안에서만 최신 순으로 정렬됨 (페이지 순서는 Cloud Run API 순서)
         service_name = project.service_name.lower()
-        revisions = gcp_service.get_service_revisions(
+        page = await asyncio.to_thread(
+            revision_index.get_page,
+            gcp_service,
             project.gcp_project_id,
             project.region,
-            service_name
+            service_name,
+            limit,
+            continue_token
         )
+        revisions = page['revisions']
+        
+        # DB에 기록된 배포(커밋, 워크플로우 실행)와 리비전 연결
+        deployments = {}
+        revision_names = [rev['name'] for rev in revisions]
+        if revision_names:
+            result = await db.execute(
+                select(
+                    Deployment.revision_name,
+                    Deployment.commit_sha,
+                    Deployment.run_id,
+                    Deployment.html_url
+                ).where(
+                    Deployment.project_id == project.id,
+                    Deployment.revision_name.in_(revision_names)
+                )
+            )
+            deployments = {row.revision_name: row for row in result}
+        deployment_syncer.refresh_if_stale(project.id)
         
         # 리비전 정보 포맷팅
         formatted_revisions = []
         for rev in revisions:
             # 리비전 이름에서 날짜/시간 추출 시도
             created_at = rev.get('metadata', {}).get('creationTimestamp', '')
+            deployment = deployments.get(rev['name'])
             
             formatted_revisions.append({
                 'name': rev['name'],
                 'created_at': created_at,
                 'is_active': rev.get('is_active', False),
                 'traffic_percent': rev.get('traffic_percent', 0),
-                'container_image': rev.get('spec', {}).get('template', {}).get('spec', {}).get('containers', [{}])[0].get('image', 'unknown')
+                'container_image': rev.get('spec', {}).get('template', {}).get('spec', {}).get('containers', [{}])[0].get('image', 'unknown'),
+                'commit_sha': deployment.commit_sha if deployment else None,
+                'workflow_run_id': deployment.run_id if deployment else None,
+                'workflow_run_url': deployment.html_url if deployment else None
             })
         
         return {
             'project_id': project_id,
             'service_name': service_name,
-            'revisions': formatted_revisions
+            'revisions': formatted_revisions,
+            'continue_token': page['continue']
         }
         
     except Exception as e:
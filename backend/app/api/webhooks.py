@@ -0,0 +1,114 @@
+from fastapi import APIRouter, HTTPException, Header, Request, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update, func
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.project import Project
+from app.services.deployment_events import deployment_events
+from app.services.deployment_syncer import deployment_syncer, deployment_values, upsert_deployments
+from app.services.side_effects import side_effects
+from typing import Dict
+import hashlib
+import hmac
+import json
+
+router = APIRouter()
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """X-Hub-Signature-256 (sha256=HMAC) 검증"""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(settings.GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature[len("sha256="):], expected)
+
+def _run_event(action: str, run: Dict) -> Dict:
+    return {
+        "type": "workflow_run",
+        "action": action,
+        "run": {
+            "id": run["id"],
+            "name": run.get("name"),
+            "status": run.get("status"),
+            "conclusion": run.get("conclusion"),
+            "created_at": run.get("created_at"),
+            "updated_at": run.get("updated_at"),
+            "html_url": run.get("html_url"),
+            "run_number": run.get("run_number")
+        }
+    }
+
+def _job_event(action: str, job: Dict) -> Dict:
+    return {
+        "type": "workflow_job",
+        "action": action,
+        "run_id": job.get("run_id"),
+        "job": {
+            "id": job["id"],
+            "name": job.get("name"),
+            "status": job.get("status"),
+            "conclusion": job.get("conclusion"),
+            "steps": [
+                {
+                    "name": step.get("name"),
+                    "status": step.get("status"),
+                    "conclusion": step.get("conclusion"),
+                    "number": step.get("number"),
+                    "started_at": step.get("started_at"),
+                    "completed_at": step.get("completed_at")
+                }
+                for step in job.get("steps", [])
+            ]
+        }
+    }
+
+@router.post("/github")
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(None),
+    x_hub_signature_256: str = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """GitHub workflow_run / workflow_job 웹훅 수신 → deployments 갱신 및 SSE 구독자에게 전달"""
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+
+    body = await request.body()
+    if not verify_signature(body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    if x_github_event == "ping":
+        return {"ok": True}
+    if x_github_event not in ("workflow_run", "workflow_job"):
+        return {"ok": True, "ignored": x_github_event}
+
+    payload = json.loads(body)
+    repo = payload["repository"]["full_name"]
+    action = payload.get("action")
+
+    if x_github_event == "workflow_run":
+        run = payload["workflow_run"]
+
+        # 같은 저장소를 등록한 모든 프로젝트에 반영 (웹훅 수신 시각은 모든 워커가 보도록 DB에 기록)
+        result = await db.execute(
+            update(Project)
+            .where(func.lower(Project.github_repo) == repo.lower())
+            .values(last_webhook_at=func.now())
+            .returning(Project.id, Project.last_webhook_at)
+            .execution_options(synchronize_session=False)
+        )
+        pushed = result.all()
+        project_ids = [project_id for project_id, _ in pushed]
+        if project_ids:
+            await upsert_deployments(db, [deployment_values(pid, run) for pid in project_ids])
+
+        for project_id, pushed_at in pushed:
+            deployment_syncer.mark_pushed(project_id, pushed_at)
+            # 완료된 실행은 Cloud Run 리비전과 매칭하도록 한 번 동기화
+            if action == "completed":
+                side_effects.dispatch(f"deployment sync {project_id}", deployment_syncer.sync_project, project_id)
+
+        await deployment_events.publish(repo, _run_event(action, run))
+    else:
+        await deployment_events.publish(repo, _job_event(action, payload["workflow_job"]))
+
+    return {"ok": True}
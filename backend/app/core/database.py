@@ -1,25 +1,126 @@
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+import bisect
+import time
 
-# 비동기 엔진 생성
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,  # 개발 중에는 SQL 로그 출력
+    echo=settings.DB_ECHO,  # 기본값 False, 개발 중에만 SQL 로그 출력
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
 )
 
-# 비동기 세션 생성
 AsyncSessionLocal = sessionmaker(
     engine, 
     class_=AsyncSession, 
     expire_on_commit=False
 )
 
-# Base 클래스
 Base = declarative_base()
 
-# Dependency
+class QueryTimingHistogram:
+    """SQL 문 실행 시간 히스토그램 (ms 버킷)"""
+    
+    BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+    
+    def observe(self, elapsed_ms: float, slow: bool):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+        self.total += 1
+        self.sum_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if slow:
+            self.slow += 1
+    
+    def stats(self) -> Dict:
+        labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "slow_queries": self.slow,
+            "slow_threshold_ms": settings.DB_SLOW_QUERY_MS,
+            "buckets": dict(zip(labels, self.counts)),
+            "pool": engine.pool.status()
+        }
+
+query_histogram = QueryTimingHistogram()
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    slow = elapsed_ms >= settings.DB_SLOW_QUERY_MS
+    query_histogram.observe(elapsed_ms, slow)
+    if slow:
+        print(f"Slow query ({elapsed_ms:.1f}ms): {' '.join(statement.split())[:500]}")
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def release_connection(session: AsyncSession):
+    """읽기가 끝난 세션의 커넥션을 풀에 반환
+    
+    GitHub/GCP/Claude 호출처럼 오래 걸리는 작업 전에 호출한다.
+    로드한 객체는 그대로 읽을 수 있고, 세션은 다음 쿼리에서 커넥션을 다시 얻는다.
+    수정할 객체는 session.add()로 다시 연결해야 한다.
+    """
+    await session.close()
+
+@asynccontextmanager
+async def try_advisory_lock(key: int) -> AsyncIterator[bool]:
+    """Postgres 세션 advisory lock 시도 (여러 워커 중 하나만 작업하도록)
+
+    잠금을 얻으면 True를 주고 블록이 끝날 때 해제한다. 커넥션이 끊기면 자동 해제된다.
+    """
+    async with engine.connect() as conn:
+        acquired = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})).scalar()
+        await conn.commit()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                await conn.commit()
+
+def _get_current_revision(connection):
+    from alembic.runtime.migration import MigrationContext
+    return MigrationContext.configure(connection).get_current_revision()
+
+async def check_schema_version() -> bool:
+    """DB 스키마가 최신 마이그레이션(head)인지 확인 (스키마 변경은 alembic upgrade head로만 수행)"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    from pathlib import Path
+
+    base_dir = Path(__file__).resolve().parents[2]
+    config = Config(str(base_dir / "alembic.ini"))
+    config.set_main_option("script_location", str(base_dir / "alembic"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_get_current_revision)
+
+    if current != head:
+        print(f"⚠️ Database schema is at {current}, expected {head}. Run `alembic upgrade head`.")
+        return False
+    print(f"Database schema is up to date ({head})")
+    return True
@@ -0,0 +1,22 @@
+import httpx
+from typing import Optional
+
+# 프로세스 전역 HTTP 클라이언트 (연결 재사용)
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 httpx.AsyncClient 반환 (최초 호출 시 생성)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _client
+
+async def close_http_client():
+    """종료 시 공유 클라이언트 정리"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
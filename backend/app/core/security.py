@@ -0,0 +1,44 @@
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+import asyncio
+import jwt
+
+# Password hashing (bcrypt cost는 설정으로 조절)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt는 CPU를 수백 ms 점유하므로 이벤트 루프가 아닌 전용 스레드 풀에서 실행
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
+async def hash_password(password: str) -> str:
+    """비밀번호 해시 (전용 스레드 풀)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """비밀번호 검증 (전용 스레드 풀)"""
+    if not hashed_password:
+        return False
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.verify, password, hashed_password)
+
+def shutdown_password_executor():
+    _password_executor.shutdown(wait=False)
+
+def decode_access_token(token: str) -> int:
+    """JWT 검증 후 사용자 ID 반환 (DB 조회 없음)"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return int(payload.get("sub"))
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except (jwt.InvalidTokenError, ValueError, TypeError):
+        raise HTTPException(status_code=401, detail="Invalid token")
@@ -1,4 +1,8 @@
 from .user import User
 from .project import Project
+from .service_account import ServiceAccountCredential
+from .deployment_history import DeploymentHistory
+from .deployment import Deployment
+from .failure_signature import FailureSignature
 
-__all__ = ["User", "Project"]
\ No newline at end of file
+__all__ = ["User", "Project", "ServiceAccountCredential", "DeploymentHistory", "Deployment", "FailureSignature"]
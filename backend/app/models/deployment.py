@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Deployment(Base):
+    __tablename__ = "deployments"
+    __table_args__ = (
+        UniqueConstraint("project_id", "run_id", name="uq_deployments_project_run"),
+        Index("ix_deployments_project_started", "project_id", "started_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    
+    # GitHub Actions 실행 정보
+    run_id = Column(BigInteger, nullable=False)
+    run_number = Column(Integer)
+    workflow_name = Column(String)
+    commit_sha = Column(String)
+    branch = Column(String)
+    status = Column(String)  # queued, in_progress, completed
+    conclusion = Column(String)  # success, failure, cancelled, removed(GitHub에서 삭제됨) 등 (완료 전 NULL)
+    html_url = Column(String)
+    
+    # Cloud Run 배포 결과 (이미지 태그의 커밋 SHA로 매칭)
+    container_image = Column(String)
+    revision_name = Column(String)
+    
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True))
+    duration_seconds = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DeploymentHistory(Base):
+    __tablename__ = "deployment_history"
+    __table_args__ = (
+        UniqueConstraint("project_id", "revision_name", name="uq_deployment_history_project_revision"),
+        Index("ix_deployment_history_project_healthy_served", "project_id", "is_healthy", "last_served_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    revision_name = Column(String, nullable=False)
+    container_image = Column(String)
+    is_healthy = Column(Boolean, nullable=False, default=True)
+    last_served_at = Column(DateTime(timezone=True), server_default=func.now())  # 마지막으로 트래픽을 받은 시각
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
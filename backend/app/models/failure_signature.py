@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class FailureSignature(Base):
+    __tablename__ = "failure_signatures"
+    __table_args__ = (
+        UniqueConstraint("user_id", "fingerprint", name="uq_failure_signatures_user_fingerprint"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # 진단을 받은 사용자 (다른 사용자에게 재사용하지 않음)
+    fingerprint = Column(String(64), nullable=False)  # 정규화한 실패 단계 + 오류 줄들의 sha256
+    step = Column(String)  # 정규화한 실패 단계 이름
+    error_line = Column(Text)  # 정규화한 구체적인 오류 줄 (최대 3줄)
+    diagnosis = Column(Text, nullable=False)  # AI 진단 결과 JSON
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # 마지막으로 학습(검증)한 시각
+    last_hit_at = Column(DateTime(timezone=True))
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        UniqueConstraint("user_id", "github_repo", "service_name", name="uq_projects_user_repo_service"),
+        Index("ix_projects_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_projects_user_repo_gcp", "user_id", "github_repo", "gcp_project_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -14,6 +19,7 @@ class Project(Base):
     region = Column(String, nullable=False)
     deployment_url = Column(String)
     workflow_path = Column(String)
+    last_webhook_at = Column(DateTime(timezone=True))  # 마지막 workflow_run 웹훅 수신 시각 (워커 간 폴링 생략 판단)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ServiceAccountCredential(Base):
+    __tablename__ = "service_account_credentials"
+    __table_args__ = (
+        UniqueConstraint("user_id", "gcp_project_id", "github_repo", name="uq_service_account_user_project_repo"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # 키를 발급받은 사용자 (다른 사용자와 공유하지 않음)
+    gcp_project_id = Column(String, nullable=False)
+    github_repo = Column(String, nullable=False)  # owner/repo 형식
+    service_account_email = Column(String, nullable=False)
+    key_name = Column(String)  # projects/{project}/serviceAccounts/{email}/keys/{key_id}
+    encrypted_key = Column(Text)  # 암호화해서 저장 (서비스 계정 키 JSON)
+    key_created_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
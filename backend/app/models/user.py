@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -11,6 +11,7 @@ class User(Base):
     hashed_password = Column(String, nullable=True)  # OAuth 사용자는 비밀번호 없음
     
     # GitHub 정보
+    github_id = Column(BigInteger, index=True)  # GitHub 계정 ID (로그인 이름과 달리 바뀌지 않음)
     github_username = Column(String, index=True)  # unique 제거 - 한 GitHub 계정이 여러 사용자에 연결될 수 있음
     github_access_token = Column(Text)  # 암호화해서 저장
     github_connected_at = Column(DateTime(timezone=True))
@@ -19,6 +20,7 @@ class User(Base):
     google_email = Column(String)
     google_access_token = Column(Text)  # 암호화해서 저장
     google_refresh_token = Column(Text)  # 암호화해서 저장
+    google_token_expires_at = Column(DateTime(timezone=True))  # 액세스 토큰 만료 시각
     google_connected_at = Column(DateTime(timezone=True))
     
     # 기본 정보
@@ -0,0 +1,39 @@
+from app.core.config import settings
+from typing import List, Optional
+
+# registry 캐시를 저장할 이미지 태그
+BUILD_CACHE_TAG = "buildcache"
+
+def build_cache_lines(image_repository: str, scope: str, backend: Optional[str] = None) -> List[str]:
+    """docker/build-push-action의 cache-from / cache-to 입력 (서비스별 키)
+
+    registry: 이미지 저장소의 buildcache 태그에 전체 레이어 캐시(mode=max) 저장
+    gha: GitHub Actions 캐시에 서비스 이름 scope로 저장
+    none: 캐시 없음
+    """
+    backend = backend or settings.WORKFLOW_BUILD_CACHE
+    if backend == "gha":
+        return [
+            f"cache-from: type=gha,scope={scope}",
+            f"cache-to: type=gha,mode=max,scope={scope}"
+        ]
+    if backend == "registry":
+        ref = f"{image_repository}:{BUILD_CACHE_TAG}"
+        return [
+            f"cache-from: type=registry,ref={ref}",
+            f"cache-to: type=registry,ref={ref},mode=max,image-manifest=true,oci-mediatypes=true"
+        ]
+    return []
+
+def build_cache_prompt(image_repository: str, scope: str) -> str:
+    """AI 워크플로우 생성 프롬프트용 빌드 지침"""
+    instruction = (
+        "Build and push with docker/setup-buildx-action@v3 and docker/build-push-action@v6 (push: true) "
+        "instead of plain `docker build` / `docker push`"
+    )
+    lines = build_cache_lines(image_repository, scope)
+    if not lines:
+        return instruction + "."
+    return instruction + ", with BuildKit layer caching keyed per service:\n" + "\n".join(
+        f"       {line}" for line in lines
+    )
@@ -3,6 +3,12 @@ import os
 import httpx
 import json
 import base64
+import time
+from app.core.config import settings
+from app.services.log_distiller import distill_log
+from app.services.failure_signatures import failure_signatures
+from app.services.side_effects import side_effects
+from app.services.build_cache import build_cache_prompt
 
 class ClaudeAIService:
     def __init__(self):
@@ -76,6 +82,12 @@ class ClaudeAIService:
                 max_chars = 3000 if 'package.json' in path or 'requirements.txt' in path else 2000
                 files_info.append(f"=== {path} ===\n{content[:max_chars]}\n")
         
+        # 빌드/푸시는 BuildKit 캐시를 쓰도록 지시 (SERVICE_NAME은 서비스별로 치환)
+        build_instructions = build_cache_prompt(
+            "${{ secrets.GCP_REGION }}-docker.pkg.dev/${{ secrets.GCP_PROJECT_ID }}/cicdai-repo/SERVICE_NAME",
+            "SERVICE_NAME"
+        )
+        
         system_prompt = """You are a DevOps expert specializing in containerization and CI/CD pipelines. 
         You analyze code repositories and generate optimized Dockerfiles and GitHub Actions workflows."""
         
@@ -113,6 +125,7 @@ The workflow MUST:
 5. For each service:
    - Build using the Dockerfile path you created
    - Push to: ${{{{ secrets.GCP_REGION }}}}-docker.pkg.dev/${{{{ secrets.GCP_PROJECT_ID }}}}/cicdai-repo/SERVICE_NAME:${{{{ github.sha }}}}
+   - {build_instructions}
    - Deploy to Cloud Run with appropriate settings:
      - Service name based on folder/service type
      - Port based on what you found in the code
@@ -200,18 +213,35 @@ Return only the Dockerfile content, no additional explanation."""
         
         return await self._call_claude(prompt, system_prompt)
     
-    async def troubleshoot_deployment_error(self, error_log: str, context: Dict) -> Dict:
-        """배포 오류 분석 및 해결책 제시"""
+    async def troubleshoot_deployment_error(self, error_log: str, context: Dict, user_id: Optional[int] = None) -> Dict:
+        """배포 오류 분석 및 해결책 제시 (원본 로그 대신 실패 지점 주변 발췌를 전송)
+        
+        user_id가 있으면 그 사용자가 전에 받은 같은 실패의 진단을 재사용한다.
+        """
         system_prompt = "You are a DevOps troubleshooting expert."
         
+        started = time.perf_counter()
+        distilled = distill_log(error_log, settings.TROUBLESHOOT_LOG_TOKEN_BUDGET)
+        print(
+            f"Distilled error log: {distilled['original_tokens']} -> {distilled['distilled_tokens']} tokens "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        
+        # 알려진 실패면 모델 호출 없이 저장된 진단 반환
+        known = await failure_signatures.lookup(distilled, user_id)
+        if known is not None:
+            print(f"Failure signature hit: {known['signature']} (hit rate {failure_signatures.stats()['hit_rate']})")
+            return known
+        
         prompt = f"""Analyze this deployment error and provide solutions:
 
-Error log:
+Error log (excerpt around the first error; timestamps, ANSI codes and progress lines removed, repeated lines collapsed):
 ```
-{error_log}
+{distilled['text']}
 ```
 
 Context:
+- Failing step: {distilled['failing_step'] or 'unknown'}
 - Project type: {context.get('project_type')}
 - Deployment platform: Google Cloud Run
 - Recent changes: {context.get('recent_changes')}
@@ -236,12 +266,17 @@ Please provide a JSON response with:
             json_start = response.find('{')
             json_end = response.rfind('}') + 1
             json_str = response[json_start:json_end]
-            return json.loads(json_str)
+            diagnosis = json.loads(json_str)
         except:
             return {
                 "error_diagnosis": "Failed to parse AI response",
                 "raw_response": response
             }
+        
+        # 같은 사용자에게 같은 실패가 다시 오면 재사용하도록 지문과 함께 저장
+        if user_id is not None:
+            side_effects.dispatch("remember failure signature", failure_signatures.remember, distilled, diagnosis, user_id)
+        return diagnosis
     
     async def generate_deployment_readme(self, project_analysis: Dict) -> str:
         """프로젝트를 위한 배포 가이드 생성"""
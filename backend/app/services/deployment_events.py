@@ -0,0 +1,90 @@
+from app.core.config import settings
+from typing import Dict, Optional, Set
+import asyncio
+import json
+
+# 느린 클라이언트 큐가 가득 차면 이벤트를 버림 (다음 이벤트나 재조회로 복구)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+class DeploymentEventBroker:
+    """저장소별 배포 이벤트를 SSE 구독자에게 전달
+
+    Redis를 쓰면 publish는 채널로만 보내고, 각 워커의 리스너가 받아 자기 구독자에게 전달한다.
+    Redis가 없거나 장애 시에는 현재 워커의 구독자에게만 전달한다.
+    """
+
+    def __init__(self, channel: str, redis_url: Optional[str] = None):
+        self.channel = channel
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+
+    def start(self):
+        if self._redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def subscribe(self, repo: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(repo.lower(), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, repo: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(repo.lower())
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                self._subscribers.pop(repo.lower(), None)
+
+    async def publish(self, repo: str, event: Dict):
+        message = {"repo": repo.lower(), "event": event}
+        if self._redis is not None:
+            try:
+                await self._redis.publish(self.channel, json.dumps(message, default=str))
+                return
+            except Exception as e:
+                print(f"Deployment event redis publish failed: {e}")
+        self._fan_out(message)
+
+    def _fan_out(self, message: Dict):
+        for queue in list(self._subscribers.get(message["repo"], ())):
+            try:
+                queue.put_nowait(message["event"])
+            except asyncio.QueueFull:
+                pass
+
+    async def _listen(self):
+        """Redis 채널 구독 (연결이 끊기면 재시도)"""
+        warned = False
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                warned = False
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._fan_out(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not warned:
+                    # 다른 워커의 SSE 구독자는 이 워커가 받은 웹훅 이벤트를 받지 못함
+                    print(f"⚠️ Deployment event redis unavailable ({e}); events only reach clients on the receiving worker")
+                    warned = True
+                await asyncio.sleep(1)
+
+deployment_events = DeploymentEventBroker(
+    settings.DEPLOYMENT_EVENTS_CHANNEL,
+    settings.REDIS_URL if settings.DEPLOYMENT_EVENTS_USE_REDIS else None
+)
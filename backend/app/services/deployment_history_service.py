@@ -0,0 +1,78 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.models.deployment_history import DeploymentHistory
+from datetime import datetime
+from typing import Optional, Set
+
+class DeploymentHistoryService:
+    """프로젝트별로 트래픽을 받은 리비전과 정상 여부를 기록"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_revision(
+        self,
+        project_id: int,
+        revision_name: str,
+        is_healthy: bool,
+        container_image: Optional[str] = None,
+        commit: bool = True
+    ) -> DeploymentHistory:
+        """서빙 중인 리비전 기록 (이미 있으면 상태만 갱신)"""
+        result = await self.db.execute(
+            select(DeploymentHistory).where(
+                DeploymentHistory.project_id == project_id,
+                DeploymentHistory.revision_name == revision_name
+            )
+        )
+        entry = result.scalar_one_or_none()
+
+        if entry is None:
+            entry = DeploymentHistory(
+                project_id=project_id,
+                revision_name=revision_name,
+                container_image=container_image,
+                is_healthy=is_healthy,
+                last_served_at=datetime.utcnow()
+            )
+            self.db.add(entry)
+        else:
+            entry.is_healthy = is_healthy
+            entry.last_served_at = datetime.utcnow()
+            if container_image:
+                entry.container_image = container_image
+
+        if commit:
+            await self.db.commit()
+        return entry
+
+    async def mark_unhealthy(self, project_id: int, revision_name: str, commit: bool = True):
+        """롤백 대상이 된 리비전을 비정상으로 표시"""
+        await self.record_revision(project_id, revision_name, is_healthy=False, commit=commit)
+
+    async def get_last_known_good(self, project_id: int, exclude_revision: Optional[str] = None) -> Optional[DeploymentHistory]:
+        """가장 최근에 정상적으로 서빙된 리비전"""
+        query = (
+            select(DeploymentHistory)
+            .where(
+                DeploymentHistory.project_id == project_id,
+                DeploymentHistory.is_healthy.is_(True)
+            )
+            .order_by(DeploymentHistory.last_served_at.desc())
+            .limit(1)
+        )
+        if exclude_revision:
+            query = query.where(DeploymentHistory.revision_name != exclude_revision)
+
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_unhealthy_revisions(self, project_id: int) -> Set[str]:
+        """롤백으로 비정상 표시된 리비전 이름들 (다시 롤백 대상이 되지 않도록)"""
+        result = await self.db.execute(
+            select(DeploymentHistory.revision_name).where(
+                DeploymentHistory.project_id == project_id,
+                DeploymentHistory.is_healthy.is_(False)
+            )
+        )
+        return set(result.scalars().all())
@@ -0,0 +1,380 @@
+from sqlalchemy import select, update, func, case, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, release_connection, try_advisory_lock
+from app.core.http_client import get_http_client
+from app.models.deployment import Deployment
+from app.models.project import Project
+from app.services.deployment_history_service import DeploymentHistoryService
+from app.services.gcp_service import GCPService
+from app.services.revision_index import revision_index
+from app.services.side_effects import side_effects
+from app.services.user_service import UserService
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import httpx
+import time
+
+GITHUB_RUNS_PER_PAGE = 100
+
+# 여러 워커 중 한 곳에서만 주기 동기화를 하도록 잡는 pg_advisory_lock 키
+SYNC_LOCK_KEY = 7_305_114_203
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def _revision_image(revision: Dict) -> Optional[str]:
+    containers = revision.get("spec", {}).get("containers", [])
+    return containers[0].get("image") if containers else None
+
+def deployment_values(project_id: int, run: Dict, revisions: Optional[Dict[str, Dict]] = None) -> Dict:
+    """GitHub workflow run → deployments 행 값"""
+    started_at = _parse_time(run.get("run_started_at") or run.get("created_at"))
+    completed_at = _parse_time(run.get("updated_at")) if run.get("status") == "completed" else None
+    duration = int((completed_at - started_at).total_seconds()) if started_at and completed_at else None
+    revision = (revisions or {}).get(run.get("head_sha"), {})
+    return {
+        "project_id": project_id,
+        "run_id": run["id"],
+        "run_number": run.get("run_number"),
+        "workflow_name": run.get("name"),
+        "commit_sha": run.get("head_sha"),
+        "branch": run.get("head_branch"),
+        "status": run.get("status"),
+        "conclusion": run.get("conclusion"),
+        "html_url": run.get("html_url"),
+        "container_image": revision.get("image"),
+        "revision_name": revision.get("revision_name"),
+        "started_at": started_at,
+        "completed_at": completed_at,
+        "duration_seconds": duration
+    }
+
+async def upsert_deployments(db, rows: List[Dict]):
+    """(project_id, run_id) 기준 upsert 후 커밋
+    
+    웹훅은 순서가 보장되지 않으므로, 완료된 행은 그 뒤에 시작된 재실행이 아니면 되돌리지 않는다.
+    """
+    stmt = insert(Deployment).values(rows)
+    excluded = stmt.excluded
+    # 이미 완료된 실행에 대한 늦게 도착한 이전 상태 (같은 시도의 in_progress 또는 더 이른 완료)
+    stale = and_(
+        Deployment.status == "completed",
+        func.coalesce(excluded.started_at, Deployment.started_at) <= Deployment.completed_at,
+        or_(excluded.completed_at.is_(None), excluded.completed_at < Deployment.completed_at)
+    )
+    
+    def keep_if_stale(column):
+        return case((stale, column), else_=getattr(excluded, column.key))
+    
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_deployments_project_run",
+        set_={
+            "status": keep_if_stale(Deployment.status),
+            "conclusion": keep_if_stale(Deployment.conclusion),
+            "started_at": keep_if_stale(Deployment.started_at),
+            "completed_at": keep_if_stale(Deployment.completed_at),
+            "duration_seconds": keep_if_stale(Deployment.duration_seconds),
+            # 리비전은 오래되면 목록에서 빠지므로 이미 매칭된 값은 유지
+            "container_image": func.coalesce(stmt.excluded.container_image, Deployment.container_image),
+            "revision_name": func.coalesce(stmt.excluded.revision_name, Deployment.revision_name),
+            "updated_at": func.now()
+        }
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+class DeploymentSyncer:
+    """GitHub Actions 실행과 Cloud Run 리비전을 주기적으로 deployments 테이블에 반영
+
+    실행은 마지막으로 기록된 시점 이후 것만 가져오고(run_id 기준 upsert),
+    리비전은 이미지 태그의 커밋 SHA로 실행과 매칭한다.
+    조회 API는 DB를 읽고, 오래된 프로젝트만 백그라운드로 다시 동기화한다.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int,
+        freshness_seconds: int,
+        max_concurrency: int,
+        max_pages: int,
+        webhook_trust_seconds: int
+    ):
+        self.interval_seconds = interval_seconds
+        self.freshness_seconds = freshness_seconds
+        self.webhook_trust_seconds = webhook_trust_seconds
+        self.max_concurrency = max_concurrency
+        self.max_pages = max_pages
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self._last_synced: Dict[int, float] = {}
+        # projects.last_webhook_at의 로컬 사본 (다른 워커가 받은 웹훅은 DB에서 다시 읽음)
+        self._last_pushed: Dict[int, datetime] = {}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with try_advisory_lock(SYNC_LOCK_KEY) as acquired:
+                    if acquired:
+                        await self.sync_all()
+            except Exception as e:
+                print(f"Deployment syncer error: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def is_fresh(self, project_id: int) -> bool:
+        """최근에 동기화했거나 웹훅으로 갱신되고 있는 프로젝트"""
+        if self._webhook_trusted(self._last_pushed.get(project_id)):
+            return True
+        synced_at = self._last_synced.get(project_id)
+        return synced_at is not None and time.monotonic() - synced_at < self.freshness_seconds
+
+    def _webhook_trusted(self, pushed_at: Optional[datetime]) -> bool:
+        if pushed_at is None:
+            return False
+        return datetime.now(timezone.utc) - pushed_at < timedelta(seconds=self.webhook_trust_seconds)
+
+    def mark_pushed(self, project_id: int, pushed_at: Optional[datetime]):
+        """웹훅으로 상태를 받은 프로젝트 (폴링 동기화 생략)"""
+        if pushed_at is not None:
+            self._last_pushed[project_id] = pushed_at
+
+    def refresh_if_stale(self, project_id: int):
+        """조회 응답은 DB에서 바로 주고, 오래된 프로젝트만 백그라운드로 동기화"""
+        if not self.is_fresh(project_id) and project_id not in self._inflight:
+            side_effects.dispatch(f"deployment sync {project_id}", self._sync_unless_pushed, project_id)
+
+    async def _sync_unless_pushed(self, project_id: int) -> int:
+        """다른 워커가 받은 웹훅도 반영되도록 DB의 마지막 웹훅 시각을 확인한 뒤 동기화"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Project.last_webhook_at).where(Project.id == project_id))
+            self.mark_pushed(project_id, result.scalar())
+        if self.is_fresh(project_id):
+            return 0
+        return await self.sync_project(project_id)
+
+    async def sync_all(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Project.id, Project.last_webhook_at))
+            project_ids = []
+            for project_id, last_webhook_at in result:
+                self.mark_pushed(project_id, last_webhook_at)
+                project_ids.append(project_id)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def sync(project_id: int) -> int:
+            async with semaphore:
+                return await self.sync_project(project_id)
+
+        # 웹훅을 받고 있거나 방금 동기화한 프로젝트는 건너뜀
+        project_ids = [pid for pid in project_ids if not self.is_fresh(pid)]
+        results = await asyncio.gather(*[sync(pid) for pid in project_ids], return_exceptions=True)
+        for project_id, result in zip(project_ids, results):
+            if isinstance(result, Exception):
+                print(f"Deployment sync failed for project {project_id}: {result}")
+        return sum(r for r in results if isinstance(r, int))
+
+    async def sync_project(self, project_id: int) -> int:
+        """프로젝트 하나 동기화 (같은 프로젝트의 동시 요청은 하나로 합침)"""
+        task = self._inflight.get(project_id)
+        if task is None:
+            task = asyncio.create_task(self._sync_project(project_id))
+            self._inflight[project_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(project_id, None))
+        return await asyncio.shield(task)
+
+    async def _sync_project(self, project_id: int) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Project).where(Project.id == project_id))
+            project = result.scalar_one_or_none()
+            if not project:
+                return 0
+
+            tokens = await UserService(db).get_user_tokens(project.user_id)
+            since, pending_run_ids = await self._sync_state(db, project_id)
+            # 업스트림 호출 동안 DB 커넥션을 잡고 있지 않도록 반환
+            await release_connection(db)
+
+            github_token = tokens.get("github_token")
+            google_token = tokens.get("google_token")
+            runs = []
+            if github_token:
+                runs = await self._fetch_runs(project.github_repo, github_token, since)
+                # 재실행 등으로 since 이전에 생성된 미완료 실행은 개별 조회
+                fetched = {run["id"] for run in runs}
+                runs.extend(await self._fetch_pending_runs(
+                    db, project_id, project.github_repo, github_token,
+                    [run_id for run_id in pending_run_ids if run_id not in fetched]
+                ))
+            revisions = await self._fetch_revisions_by_sha(project, google_token) if google_token else {}
+
+            # 페이지 사이에 새 실행이 끼면 같은 실행이 두 번 올 수 있으므로 run_id로 중복 제거
+            rows = list({
+                run["id"]: deployment_values(project_id, run, revisions) for run in runs
+            }.values())
+            deployed = await self._newly_deployed(db, project_id, rows)
+            if rows:
+                await upsert_deployments(db, rows)
+
+            # 성공한 실행이 처음 리비전과 연결되면 배포로 보고 기록 (롤백 대상 결정용)
+            if deployed:
+                history_service = DeploymentHistoryService(db)
+                for row in deployed:
+                    await history_service.record_revision(
+                        project_id,
+                        row["revision_name"],
+                        is_healthy=True,
+                        container_image=row["container_image"],
+                        commit=False
+                    )
+                await db.commit()
+
+        self._last_synced[project_id] = time.monotonic()
+        return len(rows)
+
+    async def _newly_deployed(self, db, project_id: int, rows: List[Dict]) -> List[Dict]:
+        """성공했고 이번 동기화에서 처음 리비전과 연결된 실행"""
+        candidates = [row for row in rows if row["conclusion"] == "success" and row["revision_name"]]
+        if not candidates:
+            return []
+        result = await db.execute(
+            select(Deployment.run_id).where(
+                Deployment.project_id == project_id,
+                Deployment.run_id.in_([row["run_id"] for row in candidates]),
+                Deployment.revision_name.isnot(None)
+            )
+        )
+        linked = set(result.scalars().all())
+        return [row for row in candidates if row["run_id"] not in linked]
+
+    async def _sync_state(self, db, project_id: int) -> Tuple[Optional[datetime], List[int]]:
+        """마지막으로 기록된 실행 시각(처음이면 None)과 아직 끝나지 않은 실행 ID"""
+        result = await db.execute(
+            select(func.max(Deployment.started_at)).where(Deployment.project_id == project_id)
+        )
+        since = result.scalar()
+        result = await db.execute(
+            select(Deployment.run_id).where(
+                Deployment.project_id == project_id,
+                Deployment.completed_at.is_(None)
+            )
+        )
+        return since, result.scalars().all()
+
+    async def _fetch_runs(self, github_repo: str, github_token: str, since: Optional[datetime]) -> List[Dict]:
+        """since 이후 생성된 실행 조회 (처음 동기화는 최근 한 페이지만)"""
+        client = get_http_client()
+        params = {"per_page": GITHUB_RUNS_PER_PAGE}
+        if since:
+            # 경계의 실행도 다시 받아 상태 갱신
+            params["created"] = f">={(since - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+        runs = []
+        for page in range(1, self.max_pages + 1):
+            response = await client.get(
+                f"https://api.github.com/repos/{github_repo}/actions/runs",
+                headers={
+                    "Authorization": f"token {github_token}",
+                    "Accept": "application/vnd.github.v3+json"
+                },
+                params={**params, "page": page}
+            )
+            response.raise_for_status()
+            page_runs = response.json().get("workflow_runs", [])
+            runs.extend(page_runs)
+            if since is None or len(page_runs) < GITHUB_RUNS_PER_PAGE:
+                break
+        return runs
+
+    async def _fetch_run(self, github_repo: str, github_token: str, run_id: int) -> Dict:
+        client = get_http_client()
+        response = await client.get(
+            f"https://api.github.com/repos/{github_repo}/actions/runs/{run_id}",
+            headers={
+                "Authorization": f"token {github_token}",
+                "Accept": "application/vnd.github.v3+json"
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_pending_runs(
+        self,
+        db,
+        project_id: int,
+        github_repo: str,
+        github_token: str,
+        run_ids: List[int]
+    ) -> List[Dict]:
+        """미완료 실행 개별 조회 (실패한 실행만 건너뛰고, 삭제된 실행은 removed로 종료 처리)"""
+        results = await asyncio.gather(
+            *[self._fetch_run(github_repo, github_token, run_id) for run_id in run_ids],
+            return_exceptions=True
+        )
+        runs, removed = [], []
+        for run_id, result in zip(run_ids, results):
+            if isinstance(result, httpx.HTTPStatusError) and result.response.status_code in (404, 410):
+                removed.append(run_id)
+            elif isinstance(result, Exception):
+                # 일시적인 오류는 미완료로 남겨 다음 주기에 다시 조회
+                print(f"Deployment sync could not fetch run {run_id} of project {project_id}: {result}")
+            else:
+                runs.append(result)
+
+        if removed:
+            await db.execute(
+                update(Deployment)
+                .where(Deployment.project_id == project_id, Deployment.run_id.in_(removed))
+                .values(status="completed", conclusion="removed", completed_at=func.now(), updated_at=func.now())
+            )
+            await db.commit()
+        return runs
+
+    async def _fetch_revisions_by_sha(self, project: Project, google_token: str) -> Dict[str, Dict]:
+        """최근 리비전을 이미지 태그(커밋 SHA)별로 색인"""
+        gcp_service = GCPService(google_token)
+        try:
+            page = await asyncio.to_thread(
+                revision_index.get_page,
+                gcp_service,
+                project.gcp_project_id,
+                project.region,
+                project.service_name.lower(),
+                settings.REVISION_PAGE_SIZE
+            )
+        except Exception as e:
+            print(f"Deployment sync could not list revisions for project {project.id}: {e}")
+            return {}
+
+        revisions = {}
+        for rev in page["revisions"]:
+            image = _revision_image(rev)
+            if image and ":" in image:
+                sha = image.rsplit(":", 1)[1]
+                # 같은 이미지로 여러 리비전이 생기면 최신(목록 앞쪽) 유지
+                revisions.setdefault(sha, {"image": image, "revision_name": rev["name"]})
+        return revisions
+
+deployment_syncer = DeploymentSyncer(
+    settings.DEPLOYMENT_SYNC_INTERVAL_SECONDS,
+    settings.DEPLOYMENT_SYNC_FRESHNESS_SECONDS,
+    settings.DEPLOYMENT_SYNC_MAX_CONCURRENCY,
+    settings.DEPLOYMENT_SYNC_MAX_PAGES,
+    settings.DEPLOYMENT_WEBHOOK_TRUST_SECONDS
+)
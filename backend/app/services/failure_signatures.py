@@ -0,0 +1,330 @@
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.failure_signature import FailureSignature
+from app.services.log_distiller import ERROR_PATTERNS
+from app.services.side_effects import side_effects
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import re
+
+# 지문에 쓸 오류 줄 개수 (발췌 안에서 처음 나오는 구체적인 오류 줄)
+FINGERPRINT_ERROR_LINES = 3
+
+# 어떤 실패에서나 나오는 마무리 줄 (이것만으로는 원인을 구분할 수 없음)
+GENERIC_ERROR_LINE = re.compile(
+    r"Process completed with exit code \d+|^npm ERR! (?:code|errno|syscall|path|command|A complete log)|"
+    r"^npm ERR!\s*$|npm ERR! Failed at the|error Command failed with exit code|"
+    r"^ERROR: failed to solve: process .* did not complete successfully|"
+    r"^(?:make|Error): \*\*\* .*Error \d+|^Error: exit status \d+$",
+    re.IGNORECASE
+)
+
+# 레지스트리 거부 응답 (docker push 출력은 ERROR 접두어 없이 나옴)
+REGISTRY_DENIAL_LINE = re.compile(r"^(?:denied|unauthorized):", re.IGNORECASE)
+
+# 실패 원인이 아닌 줄 (빌드 캐시 가져오기 실패 같은 경고는 빌드를 멈추지 않음)
+NON_FATAL_LINE = re.compile(r"importing cache manifest|registry cache importer|\bWARN(?:ING)?\b", re.IGNORECASE)
+
+# 모델 답변 중 프로젝트마다 다른 필드 (다른 프로젝트에 재사용하지 않음)
+PROJECT_SPECIFIC_FIELDS = ("code_changes",)
+
+# 자주 반복되는 배포 실패 (모델 호출 없이 바로 답변)
+KNOWN_FAILURES: List[Tuple[str, re.Pattern, Dict]] = [
+    (
+        "missing-gcp-sa-key",
+        re.compile(
+            r"must specify exactly one of \"?workload_identity_provider\"? or \"?credentials_json|"
+            r"GCP_SA_KEY.*(?:empty|not set|missing)|credentials_json.*(?:empty|required)",
+            re.IGNORECASE
+        ),
+        {
+            "error_diagnosis": "The Google Cloud auth step received no credentials.",
+            "root_cause": "The GCP_SA_KEY repository secret is missing or empty, so google-github-actions/auth has nothing to authenticate with.",
+            "solutions": [
+                {
+                    "description": "Recreate the GCP_SA_KEY secret",
+                    "steps": [
+                        "Run the CI/CD setup again or rotate the service account key from the dashboard",
+                        "Check that GCP_SA_KEY exists under Settings → Secrets and variables → Actions",
+                        "Re-run the failed workflow"
+                    ],
+                    "code_changes": ""
+                }
+            ],
+            "prevention": "Rotate keys through the dashboard so the repository secret is updated together with the key."
+        }
+    ),
+    (
+        "artifact-registry-permission-denied",
+        re.compile(
+            r"artifactregistry\.repositories\.(?:uploadArtifacts|downloadArtifacts).*denied|"
+            r"(?:docker\.pkg\.dev|gcr\.io)\S*.*(?:denied|permission|unauthorized)|"
+            r"denied: Permission .* (?:artifactregistry|storage)",
+            re.IGNORECASE
+        ),
+        {
+            "error_diagnosis": "Pushing the container image was rejected by the registry.",
+            "root_cause": "The deploy service account lacks write access to Artifact Registry / Container Registry, or docker was not configured for the registry host.",
+            "solutions": [
+                {
+                    "description": "Grant registry write access and configure docker auth",
+                    "steps": [
+                        "Grant roles/artifactregistry.writer (and roles/storage.admin for gcr.io) to the service account",
+                        "Make sure the workflow runs `gcloud auth configure-docker <region>-docker.pkg.dev` before pushing",
+                        "Re-run the failed workflow"
+                    ],
+                    "code_changes": "- run: gcloud auth configure-docker ${{ env.REGION }}-docker.pkg.dev --quiet"
+                }
+            ],
+            "prevention": "Keep the registry roles in the service account's required role list."
+        }
+    ),
+    (
+        "wrong-port",
+        re.compile(
+            r"failed to start and listen on the port defined by the PORT|"
+            r"container failed to start.*PORT",
+            re.IGNORECASE
+        ),
+        {
+            "error_diagnosis": "Cloud Run started the container but nothing listened on the expected port.",
+            "root_cause": "The application listens on a hard-coded port (or localhost) instead of 0.0.0.0:$PORT.",
+            "solutions": [
+                {
+                    "description": "Listen on the PORT environment variable",
+                    "steps": [
+                        "Read the port from the PORT environment variable (Cloud Run sets 8080 by default)",
+                        "Bind to 0.0.0.0, not 127.0.0.1",
+                        "Rebuild and redeploy"
+                    ],
+                    "code_changes": "CMD exec gunicorn --bind 0.0.0.0:$PORT app:app"
+                }
+            ],
+            "prevention": "Never hard-code the listening port in Dockerfiles deployed to Cloud Run."
+        }
+    ),
+    (
+        "npm-ci-lockfile-mismatch",
+        re.compile(
+            r"`?npm ci`? can only install packages when your package\.json and package-lock\.json|"
+            r"package-lock\.json.*(?:not in sync|out of sync)|Missing: \S+ from lock file",
+            re.IGNORECASE
+        ),
+        {
+            "error_diagnosis": "`npm ci` refused to install because the lockfile does not match package.json.",
+            "root_cause": "package.json was changed without regenerating package-lock.json.",
+            "solutions": [
+                {
+                    "description": "Regenerate and commit the lockfile",
+                    "steps": [
+                        "Run `npm install` locally with the same Node major version as the build image",
+                        "Commit the updated package-lock.json",
+                        "Push to trigger a new build"
+                    ],
+                    "code_changes": ""
+                }
+            ],
+            "prevention": "Commit package.json and package-lock.json together; add an `npm ci` check to pull requests."
+        }
+    ),
+]
+
+def normalize_error_line(line: str) -> str:
+    """실행마다 달라지는 값(URL, 해시, 경로, 따옴표 문자열, 숫자)을 자리표시자로 바꿈"""
+    line = line.lower()
+    line = re.sub(r"https?://\S+", "<url>", line)
+    line = re.sub(r"\b[0-9a-f]{7,64}\b", "<hex>", line)
+    line = re.sub(r"(['\"`]).*?\1", "<str>", line)
+    line = re.sub(r"(?:/[\w.@-]+)+", "<path>", line)
+    line = re.sub(r"\d+", "<n>", line)
+    return re.sub(r"\s+", " ", line).strip()
+
+def error_lines(distilled: Dict) -> List[str]:
+    """발췌에서 실패 원인일 수 있는 오류 줄 (종료 코드 줄과 경고 제외, 원문 그대로)"""
+    lines: List[str] = []
+    for line in distilled.get("text", "").splitlines():
+        stripped = line.strip()
+        if not (ERROR_PATTERNS.search(line) or REGISTRY_DENIAL_LINE.search(stripped)):
+            continue
+        if GENERIC_ERROR_LINE.search(stripped) or NON_FATAL_LINE.search(line):
+            continue
+        lines.append(line)
+    return lines
+
+def specific_error_lines(distilled: Dict) -> List[str]:
+    """구체적인 오류 줄 (정규화, 중복 제거, 앞에서부터)"""
+    lines: List[str] = []
+    for line in error_lines(distilled):
+        normalized = normalize_error_line(line)
+        if normalized and normalized not in lines:
+            lines.append(normalized)
+            if len(lines) == FINGERPRINT_ERROR_LINES:
+                break
+    return lines
+
+def match_known_failure(distilled: Dict) -> Optional[Tuple[str, Dict]]:
+    """내장 규칙과 일치하는 실패 (발췌 전체가 아닌 오류 줄에서만 찾음)"""
+    lines = error_lines(distilled)
+    for name, pattern, diagnosis in KNOWN_FAILURES:
+        if any(pattern.search(line) for line in lines):
+            return name, diagnosis
+    return None
+
+def fingerprint(distilled: Dict) -> Optional[Tuple[str, str, str]]:
+    """(fingerprint, 정규화한 단계, 정규화한 오류 줄들)
+
+    구체적인 오류 줄이 없으면(종료 코드 줄뿐이면) 원인을 구분할 수 없으므로 None
+    """
+    error_lines = specific_error_lines(distilled)
+    if not error_lines:
+        return None
+    normalized_step = normalize_error_line(distilled.get("failing_step") or "")
+    joined = "\n".join(error_lines)
+    digest = hashlib.sha256(f"{normalized_step}|{joined}".encode()).hexdigest()
+    return digest, normalized_step, joined
+
+def strip_project_specific(diagnosis: Dict) -> Dict:
+    """다른 프로젝트에 재사용할 수 있도록 프로젝트별 코드 변경 제거"""
+    return {
+        **diagnosis,
+        "solutions": [
+            {**solution, **{field: "" for field in PROJECT_SPECIFIC_FIELDS if field in solution}}
+            for solution in diagnosis.get("solutions", [])
+            if isinstance(solution, dict)
+        ]
+    }
+
+class FailureSignatureIndex:
+    """정규화한 오류 지문 → 진단 결과 인덱스 (모델 호출 전에 조회)
+
+    알려진 실패는 내장 규칙으로(모든 사용자 공통), 나머지는 이전 AI 답변을 사용자별로 DB에 저장해 두고
+    같은 사용자의 같은 지문이면 재사용한다. 학습한 답변에는 그 사용자의 파일/서비스 이름이 들어 있을 수 있으므로
+    다른 사용자에게는 주지 않는다. max_age가 지나면 모델로 다시 검증한다.
+    """
+
+    def __init__(self, max_age: timedelta):
+        self.max_age = max_age
+        self._entries: Dict[Tuple[int, str], Tuple[Dict, Optional[datetime]]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.builtin_hits = 0
+        self.misses = 0
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        FailureSignature.user_id,
+                        FailureSignature.fingerprint,
+                        FailureSignature.diagnosis,
+                        FailureSignature.created_at
+                    )
+                )
+                for row in result:
+                    self._entries[(row.user_id, row.fingerprint)] = (
+                        strip_project_specific(json.loads(row.diagnosis)),
+                        row.created_at
+                    )
+            self._loaded = True
+            print(f"Loaded {len(self._entries)} failure signatures")
+
+    async def lookup(self, distilled: Dict, user_id: Optional[int] = None) -> Optional[Dict]:
+        """축약된 로그(distill_log 결과)에 맞는 진단 반환 (없으면 None)
+
+        user_id가 없으면 내장 규칙만 사용한다.
+        """
+        known = match_known_failure(distilled)
+        if known is not None:
+            name, diagnosis = known
+            self.hits += 1
+            self.builtin_hits += 1
+            return {**diagnosis, "source": "signature_index", "signature": name}
+
+        signature = fingerprint(distilled) if user_id is not None else None
+        if signature is not None:
+            try:
+                await self._ensure_loaded()
+            except Exception as e:
+                # 인덱스를 못 읽어도 분석은 모델 호출로 계속 (다음 요청에서 다시 로드)
+                print(f"Failure signature index load failed: {e}")
+                self.misses += 1
+                return None
+            key = signature[0]
+            entry = self._entries.get((user_id, key))
+            if entry is not None and not self._expired(entry[1]):
+                self.hits += 1
+                side_effects.dispatch("failure signature hit", self._record_hit, user_id, key)
+                return {**entry[0], "source": "signature_index", "signature": key}
+
+        self.misses += 1
+        return None
+
+    def _expired(self, learned_at: Optional[datetime]) -> bool:
+        return learned_at is not None and datetime.now(timezone.utc) - learned_at > self.max_age
+
+    async def remember(self, distilled: Dict, diagnosis: Dict, user_id: int):
+        """모델 답변을 사용자별 지문과 함께 저장 (같은 지문이면 최신 답변으로 갱신)
+
+        종료 코드 줄처럼 원인을 구분할 수 없는 실패는 학습하지 않는다.
+        """
+        signature = fingerprint(distilled)
+        if signature is None:
+            return
+        key, step, error_lines = signature
+        diagnosis = strip_project_specific(diagnosis)
+        diagnosis_json = json.dumps(diagnosis)
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                insert(FailureSignature)
+                .values(
+                    user_id=user_id,
+                    fingerprint=key,
+                    step=step,
+                    error_line=error_lines,
+                    diagnosis=diagnosis_json,
+                    hit_count=0
+                )
+                .on_conflict_do_update(
+                    constraint="uq_failure_signatures_user_fingerprint",
+                    # 다시 검증한 시점부터 max_age를 새로 셈
+                    set_={"diagnosis": diagnosis_json, "created_at": func.now()}
+                )
+            )
+            await db.commit()
+        self._entries[(user_id, key)] = (diagnosis, datetime.now(timezone.utc))
+
+    async def _record_hit(self, user_id: int, key: str):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(FailureSignature)
+                .where(FailureSignature.user_id == user_id, FailureSignature.fingerprint == key)
+                .values(hit_count=FailureSignature.hit_count + 1, last_hit_at=func.now())
+            )
+            await db.commit()
+
+    def stats(self) -> dict:
+        """인덱스 적중률 (적중 시 모델 호출 생략)"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "builtin_signatures": len(KNOWN_FAILURES),
+            "hits": self.hits,
+            "builtin_hits": self.builtin_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+failure_signatures = FailureSignatureIndex(timedelta(days=settings.FAILURE_SIGNATURE_MAX_AGE_DAYS))
@@ -5,6 +5,23 @@ from google.oauth2 import service_account
 import json
 import time
 from typing import Dict, List
+from googleapiclient.errors import HttpError
+from app.core.config import settings
+from app.services.revision_index import revision_index
+
+# GitHub Actions 서비스 계정에 필요한 역할들
+REQUIRED_ROLES = [
+    'roles/run.admin',           # Cloud Run 관리
+    'roles/storage.admin',       # Cloud Storage (이미지 저장)
+    'roles/cloudbuild.builds.builder',  # Cloud Build
+    'roles/artifactregistry.admin',     # Artifact Registry
+    'roles/iam.serviceAccountUser',     # 서비스 계정 사용
+    'roles/serviceusage.serviceUsageConsumer'  # API 사용 권한
+]
+
+# setIamPolicy etag 충돌(409) 시 재시도 설정
+IAM_POLICY_MAX_RETRIES = 5
+IAM_POLICY_RETRY_DELAY = 0.5
 
 class GCPService:
     def __init__(self, access_token: str):
@@ -58,52 +75,45 @@ class GCPService:
     
     def grant_permissions(self, project_id: str, service_account_email: str) -> bool:
         """서비스 계정에 필요한 권한 부여"""
-        resource_manager = build('cloudresourcemanager', 'v1', credentials=self.credentials)
+        return self.grant_permissions_batch(project_id, [service_account_email])
+    
+    def grant_permissions_batch(self, project_id: str, service_account_emails: List[str]) -> bool:
+        """여러 서비스 계정의 권한을 한 번의 정책 쓰기로 부여
         
-        # 필요한 역할들
-        roles = [
-            'roles/run.admin',           # Cloud Run 관리
-            'roles/storage.admin',       # Cloud Storage (이미지 저장)
-            'roles/cloudbuild.builds.builder',  # Cloud Build
-            'roles/artifactregistry.admin',     # Artifact Registry
-            'roles/iam.serviceAccountUser',     # 서비스 계정 사용
-            'roles/serviceusage.serviceUsageConsumer'  # API 사용 권한
-        ]
+        필요한 바인딩이 모두 있으면 setIamPolicy를 생략하고,
+        쓰기에는 etag를 포함해 동시 수정 시 409를 받으면 읽기-수정-쓰기를 재시도한다.
+        """
+        resource_manager = build('cloudresourcemanager', 'v1', credentials=self.credentials)
+        members = [f"serviceAccount:{email}" for email in service_account_emails]
         
         try:
-            # 현재 IAM 정책 가져오기
-            policy = resource_manager.projects().getIamPolicy(
-                resource=project_id
-            ).execute()
-            
-            # 각 역할에 서비스 계정 추가
-            for role in roles:
-                binding = None
-                for b in policy.get('bindings', []):
-                    if b['role'] == role:
-                        binding = b
-                        break
+            for attempt in range(IAM_POLICY_MAX_RETRIES):
+                # 현재 IAM 정책 가져오기
+                policy = resource_manager.projects().getIamPolicy(
+                    resource=project_id
+                ).execute()
                 
-                if binding is None:
-                    binding = {
-                        'role': role,
-                        'members': []
-                    }
-                    policy['bindings'].append(binding)
+                if not self._add_role_bindings(policy, members):
+                    print(f"Permissions already granted to {', '.join(service_account_emails)}")
+                    return True
                 
-                member = f"serviceAccount:{service_account_email}"
-                if member not in binding['members']:
-                    binding['members'].append(member)
-            
-            # 업데이트된 정책 설정
-            request = resource_manager.projects().setIamPolicy(
-                resource=project_id,
-                body={'policy': policy}
-            )
-            request.execute()
+                try:
+                    # etag가 포함된 정책으로 업데이트 (다른 쓰기가 먼저 반영되면 409)
+                    resource_manager.projects().setIamPolicy(
+                        resource=project_id,
+                        body={'policy': policy}
+                    ).execute()
+                except HttpError as e:
+                    if e.resp.status == 409 and attempt < IAM_POLICY_MAX_RETRIES - 1:
+                        print(f"IAM policy etag conflict on {project_id}, retrying ({attempt + 1})")
+                        time.sleep(IAM_POLICY_RETRY_DELAY * (2 ** attempt))
+                        continue
+                    raise
+                
+                print(f"Granted permissions to {', '.join(service_account_emails)}")
+                return True
             
-            print(f"Granted permissions to {service_account_email}")
-            return True
+            raise Exception(f"IAM policy update conflicted {IAM_POLICY_MAX_RETRIES} times")
             
         except Exception as e:
             print(f"Error granting permissions: {str(e)}")
@@ -114,8 +124,33 @@ class GCPService:
                 return True
             raise Exception(f"Failed to grant permissions: {e}")
     
+    @staticmethod
+    def _add_role_bindings(policy: Dict, members: List[str]) -> bool:
+        """정책에 누락된 역할 바인딩 추가, 변경이 있었는지 반환"""
+        bindings = policy.setdefault('bindings', [])
+        changed = False
+        
+        for role in REQUIRED_ROLES:
+            binding = next((b for b in bindings if b['role'] == role and 'condition' not in b), None)
+            if binding is None:
+                binding = {'role': role, 'members': []}
+                bindings.append(binding)
+            
+            binding_members = binding.setdefault('members', [])
+            for member in members:
+                if member not in binding_members:
+                    binding_members.append(member)
+                    changed = True
+        
+        return changed
+    
     def create_service_account_key(self, project_id: str, service_account_email: str) -> str:
         """서비스 계정 키 생성"""
+        # Base64 인코딩된 상태로 반환
+        return self.create_service_account_key_entry(project_id, service_account_email)['privateKeyData']
+    
+    def create_service_account_key_entry(self, project_id: str, service_account_email: str) -> Dict:
+        """서비스 계정 키 생성 (키 리소스 이름 포함)"""
         iam_service = build('iam', 'v1', credentials=self.credentials)
         
         try:
@@ -125,21 +160,49 @@ class GCPService:
                 body={}
             ).execute()
             
-            # Base64로 인코딩된 키 반환
-            private_key_data = key['privateKeyData']
-            
-            # Base64 디코딩하여 JSON 확인 (디버깅용)
-            import base64
-            key_json = base64.b64decode(private_key_data).decode('utf-8')
             print(f"Created key for: {service_account_email}")
             
-            return private_key_data  # Base64 인코딩된 상태로 반환
+            return {
+                'name': key['name'],
+                'privateKeyData': key['privateKeyData']
+            }
             
         except Exception as e:
             print(f"Error creating service account key: {str(e)}")
             print(f"Error type: {type(e)}")
             raise Exception(f"Failed to create service account key: {e}")
     
+    def list_service_account_keys(self, project_id: str, service_account_email: str) -> List[str]:
+        """사용자 관리 서비스 계정 키 이름 목록"""
+        iam_service = build('iam', 'v1', credentials=self.credentials)
+        
+        try:
+            response = iam_service.projects().serviceAccounts().keys().list(
+                name=f'projects/{project_id}/serviceAccounts/{service_account_email}',
+                keyTypes='USER_MANAGED'
+            ).execute()
+            return [key['name'] for key in response.get('keys', [])]
+            
+        except Exception as e:
+            print(f"Failed to list service account keys: {e}")
+            raise Exception(f"Failed to list service account keys: {str(e)}")
+    
+    def delete_service_account_key(self, key_name: str) -> bool:
+        """서비스 계정 키 삭제"""
+        iam_service = build('iam', 'v1', credentials=self.credentials)
+        
+        try:
+            iam_service.projects().serviceAccounts().keys().delete(name=key_name).execute()
+            print(f"Deleted key: {key_name}")
+            return True
+            
+        except HttpError as e:
+            # 이미 삭제된 키
+            if e.resp.status == 404:
+                return True
+            print(f"Failed to delete key {key_name}: {e}")
+            return False
+    
     def enable_apis(self, project_id: str) -> Dict[str, bool]:
         """필요한 GCP API 활성화"""
         service_usage = build('serviceusage', 'v1', credentials=self.credentials)
@@ -180,8 +243,40 @@ class GCPService:
         
         return results
     
-    def get_service_revisions(self, project_id: str, region: str, service_name: str):
-        """Cloud Run 서비스의 리비전 목록 가져오기"""
+    def get_service_revisions(self, project_id: str, region: str, service_name: str, limit: int = None):
+        """Cloud Run 서비스의 리비전 목록 가져오기 (생성 시각 기준 최신 순)
+        
+        revisions.list는 생성 순서를 보장하지 않으므로 limit이 있어도 모든 페이지를 모아
+        정렬한 뒤 최신 limit개를 반환한다. 페이지는 revision_index에 TTL 캐시된다.
+        """
+        revisions = []
+        continue_token = None
+        while True:
+            page = revision_index.get_page(
+                self, project_id, region, service_name,
+                settings.REVISION_PAGE_SIZE, continue_token
+            )
+            revisions.extend(page['revisions'])
+            continue_token = page['continue']
+            if not continue_token:
+                break
+        
+        # 페이지 경계를 넘어서도 최신 순 유지
+        revisions.sort(
+            key=lambda x: x['metadata'].get('creationTimestamp', ''),
+            reverse=True
+        )
+        return revisions[:limit] if limit else revisions
+    
+    def list_service_revisions_page(
+        self,
+        project_id: str,
+        region: str,
+        service_name: str,
+        limit: int,
+        continue_token: str = None
+    ) -> Dict:
+        """Cloud Run 리비전 한 페이지 조회 (서버 측 limit/continue 페이징)"""
         try:
             run_service = build('run', 'v1', credentials=self.credentials)
             
@@ -194,26 +289,35 @@ class GCPService:
             ).execute()
             
             # 리비전 목록 가져오기
+            list_params = {
+                'parent': parent,
+                'labelSelector': f"serving.knative.dev/service={service_name}",
+                'limit': limit
+            }
+            if continue_token:
+                list_params['continue'] = continue_token
+            
             revisions_response = run_service.projects().locations().revisions().list(
-                parent=parent,
-                labelSelector=f"serving.knative.dev/service={service_name}"
+                **list_params
             ).execute()
             
             revisions = revisions_response.get('items', [])
             
             # 현재 트래픽 정보
             traffic = service.get('status', {}).get('traffic', [])
-            traffic_map = {t['revisionName']: t.get('percent', 0) for t in traffic}
+            traffic_map = {t['revisionName']: t.get('percent', 0) for t in traffic if 'revisionName' in t}
             
             # 리비전 정보 포맷팅
             formatted_revisions = []
             for rev in revisions:
                 rev_name = rev['metadata']['name']
+                conditions = rev.get('status', {}).get('conditions', [])
                 formatted_revisions.append({
                     'name': rev_name,
                     'metadata': rev.get('metadata', {}),
                     'spec': rev.get('spec', {}),
                     'is_active': rev_name in traffic_map,
+                    'is_ready': any(c.get('type') == 'Ready' and c.get('status') == 'True' for c in conditions),
                     'traffic_percent': traffic_map.get(rev_name, 0)
                 })
             
@@ -223,14 +327,45 @@ class GCPService:
                 reverse=True
             )
             
-            return formatted_revisions
+            return {
+                'revisions': formatted_revisions,
+                'continue': revisions_response.get('metadata', {}).get('continue')
+            }
             
         except Exception as e:
             print(f"Failed to get revisions: {e}")
             raise Exception(f"Failed to get revisions: {str(e)}")
     
-    def update_traffic(self, project_id: str, region: str, service_name: str, traffic_allocation: dict):
-        """Cloud Run 서비스의 트래픽 분배 업데이트"""
+    def get_service(self, project_id: str, region: str, service_name: str) -> Dict:
+        """Cloud Run 서비스 정보 조회"""
+        try:
+            run_service = build('run', 'v1', credentials=self.credentials)
+            
+            service_path = f"projects/{project_id}/locations/{region}/services/{service_name}"
+            return run_service.projects().locations().services().get(
+                name=service_path
+            ).execute()
+            
+        except Exception as e:
+            print(f"Failed to get service: {e}")
+            raise Exception(f"Failed to get service: {str(e)}")
+    
+    @staticmethod
+    def get_serving_revision(service: Dict):
+        """트래픽을 가장 많이 받고 있는 리비전 이름"""
+        traffic = [
+            t for t in service.get('status', {}).get('traffic', [])
+            if t.get('revisionName') and t.get('percent', 0) > 0
+        ]
+        if not traffic:
+            return None
+        return max(traffic, key=lambda t: t['percent'])['revisionName']
+    
+    def update_traffic(self, project_id: str, region: str, service_name: str, traffic_allocation: dict, service: Dict = None):
+        """Cloud Run 서비스의 트래픽 분배 업데이트
+        
+        이미 조회한 service를 넘기면 추가 조회 없이 replaceService 한 번만 호출한다.
+        """
         try:
             run_service = build('run', 'v1', credentials=self.credentials)
             
@@ -238,9 +373,10 @@ class GCPService:
             service_path = f"{parent}/services/{service_name}"
             
             # 현재 서비스 정보 가져오기
-            service = run_service.projects().locations().services().get(
-                name=service_path
-            ).execute()
+            if service is None:
+                service = run_service.projects().locations().services().get(
+                    name=service_path
+                ).execute()
             
             # 트래픽 설정 업데이트
             traffic = []
@@ -250,20 +386,40 @@ class GCPService:
                     'percent': percent
                 })
             
-            service['spec']['traffic'] = traffic
+            return self._replace_traffic(run_service, service_path, service, traffic, project_id, region, service_name)
             
-            # 서비스 업데이트
-            response = run_service.projects().locations().services().replaceService(
-                name=service_path,
-                body=service
+        except Exception as e:
+            print(f"Failed to update traffic: {e}")
+            raise Exception(f"Failed to update traffic: {str(e)}")
+    
+    def restore_traffic(self, project_id: str, region: str, service_name: str, traffic_targets: List[Dict]):
+        """이전에 저장해 둔 spec.traffic을 그대로 복원 (latestRevision, tag 포함)"""
+        try:
+            run_service = build('run', 'v1', credentials=self.credentials)
+            service_path = f"projects/{project_id}/locations/{region}/services/{service_name}"
+            service = run_service.projects().locations().services().get(
+                name=service_path
             ).execute()
-            
-            return {
-                'success': True,
-                'url': response.get('status', {}).get('url'),
-                'traffic': traffic
-            }
+            return self._replace_traffic(run_service, service_path, service, traffic_targets, project_id, region, service_name)
             
         except Exception as e:
-            print(f"Failed to update traffic: {e}")
-            raise Exception(f"Failed to update traffic: {str(e)}")
\ No newline at end of file
+            print(f"Failed to restore traffic: {e}")
+            raise Exception(f"Failed to restore traffic: {str(e)}")
+    
+    def _replace_traffic(self, run_service, service_path: str, service: Dict, traffic: List[Dict], project_id: str, region: str, service_name: str) -> Dict:
+        service['spec']['traffic'] = traffic
+        
+        # 서비스 업데이트
+        response = run_service.projects().locations().services().replaceService(
+            name=service_path,
+            body=service
+        ).execute()
+        
+        # 트래픽 정보가 바뀌었으므로 리비전 캐시 무효화
+        revision_index.invalidate(project_id, region, service_name)
+        
+        return {
+            'success': True,
+            'url': response.get('status', {}).get('url'),
+            'traffic': traffic
+        }
\ No newline at end of file
@@ -0,0 +1,169 @@
+from app.core.config import settings
+from app.core.http_client import get_http_client
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import asyncio
+import re
+import time
+
+GITHUB_REPOS_URL = "https://api.github.com/user/repos"
+GITHUB_REPOS_PER_PAGE = 100
+
+def _simplify_repo(repo: Dict) -> Dict:
+    """필요한 정보만 추출"""
+    return {
+        "id": repo["id"],
+        "name": repo["name"],
+        "full_name": repo["full_name"],
+        "private": repo["private"],
+        "default_branch": repo["default_branch"],
+        "updated_at": repo["updated_at"],
+        "language": repo["language"],
+        "description": repo["description"]
+    }
+
+def _last_page(link_header: Optional[str]) -> int:
+    """Link 헤더의 rel="last"에서 전체 페이지 수 추출"""
+    if not link_header:
+        return 1
+    match = re.search(r'[?&]page=(\d+)[^>]*>;\s*rel="last"', link_header)
+    return int(match.group(1)) if match else 1
+
+class RepoSearchIndex:
+    """저장소 이름 타입어헤드 검색용 인덱스 (단어 접두사 + 부분 문자열)"""
+
+    def __init__(self, repos: List[Dict]):
+        # 최근 업데이트 순
+        self.repos = sorted(repos, key=lambda r: r["updated_at"] or "", reverse=True)
+        self._keys = [r["full_name"].lower() for r in self.repos]
+        # owner, repo 이름, -_. 로 나뉜 단어들
+        self._words = [[w for w in re.split(r"[/\-_.]", key) if w] for key in self._keys]
+        self._prefixes: Dict[str, List[int]] = {}
+        for i, words in enumerate(self._words):
+            # 단어의 첫 글자로 접두사 버킷 구성
+            for first_char in {w[0] for w in words}:
+                self._prefixes.setdefault(first_char, []).append(i)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """단어 접두사 일치를 먼저, 그 외 부분 문자열 일치를 뒤에 반환"""
+        query = query.strip().lower()
+        if not query:
+            return self.repos[:limit]
+
+        results = [
+            i for i in self._prefixes.get(query[0], [])
+            if self._keys[i].startswith(query) or any(w.startswith(query) for w in self._words[i])
+        ][:limit]
+        if len(results) < limit:
+            matched = set(results)
+            for i, key in enumerate(self._keys):
+                if i not in matched and query in key:
+                    results.append(i)
+                    if len(results) >= limit:
+                        break
+
+        return [self.repos[i] for i in results]
+
+class GitHubRepoCache:
+    """사용자별 GitHub 저장소 목록 캐시
+
+    최초에는 첫 페이지의 Link 헤더로 전체 페이지 수를 알아낸 뒤 나머지 페이지를 동시에 가져오고,
+    TTL이 지나면 since + sort=updated로 변경된 저장소만 가져와 병합한다.
+    증분 조회로는 삭제/이전/권한 회수된 저장소를 알 수 없으므로 full_sync_seconds마다 전체를 다시 받아 교체한다.
+    """
+
+    def __init__(self, ttl_seconds: int, full_sync_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.full_sync_seconds = full_sync_seconds
+        self._entries: Dict[int, Dict] = {}
+        self._inflight: Dict[int, asyncio.Task] = {}
+
+    async def get_index(self, user_id: int, github_token: str, refresh: bool = False) -> RepoSearchIndex:
+        """캐시된 인덱스 반환 (만료 시 증분 갱신, refresh거나 전체 동기화 주기가 지나면 전체 재조회)"""
+        entry = self._entries.get(user_id)
+        if entry and not refresh and entry["expires_at"] > time.monotonic():
+            return entry["index"]
+
+        task = self._inflight.get(user_id)
+        if task is None:
+            full = refresh or entry is None or entry["full_sync_due"] <= time.monotonic()
+            task = asyncio.create_task(self._sync(user_id, github_token, full))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+
+        return await asyncio.shield(task)
+
+    def invalidate(self, user_id: int):
+        """사용자의 캐시 제거 (GitHub 재연결 등)"""
+        self._entries.pop(user_id, None)
+
+    async def _sync(self, user_id: int, github_token: str, full: bool) -> RepoSearchIndex:
+        synced_at = datetime.now(timezone.utc)
+        entry = self._entries.get(user_id)
+
+        if full or entry is None:
+            repos = {r["id"]: r for r in await self._fetch_all(github_token)}
+            full_sync_due = time.monotonic() + self.full_sync_seconds
+        else:
+            repos = dict(entry["repos"])
+            full_sync_due = entry["full_sync_due"]
+            for repo in await self._fetch_updated_since(github_token, entry["synced_at"]):
+                repos[repo["id"]] = repo
+
+        index = RepoSearchIndex(list(repos.values()))
+        self._entries[user_id] = {
+            "repos": repos,
+            "index": index,
+            "synced_at": synced_at,
+            "full_sync_due": full_sync_due,
+            "expires_at": time.monotonic() + self.ttl_seconds
+        }
+        return index
+
+    async def _fetch_page(self, github_token: str, page: int, since: Optional[datetime] = None):
+        client = get_http_client()
+        params = {
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": GITHUB_REPOS_PER_PAGE,
+            "page": page
+        }
+        if since:
+            params["since"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        response = await client.get(
+            GITHUB_REPOS_URL,
+            headers={
+                "Authorization": f"token {github_token}",
+                "Accept": "application/vnd.github.v3+json"
+            },
+            params=params
+        )
+        if response.status_code != 200:
+            raise Exception(f"GitHub API error: {response.status_code}")
+        return response
+
+    async def _fetch_all(self, github_token: str, since: Optional[datetime] = None) -> List[Dict]:
+        """첫 페이지로 전체 페이지 수를 확인한 뒤 나머지를 동시에 조회"""
+        first = await self._fetch_page(github_token, 1, since)
+        repos = [_simplify_repo(r) for r in first.json()]
+
+        last_page = _last_page(first.headers.get("link"))
+        if last_page > 1:
+            responses = await asyncio.gather(*[
+                self._fetch_page(github_token, page, since)
+                for page in range(2, last_page + 1)
+            ])
+            for response in responses:
+                repos.extend(_simplify_repo(r) for r in response.json())
+
+        return repos
+
+    async def _fetch_updated_since(self, github_token: str, since: datetime) -> List[Dict]:
+        """마지막 동기화 이후 변경된 저장소만 조회"""
+        return await self._fetch_all(github_token, since)
+
+github_repo_cache = GitHubRepoCache(
+    settings.GITHUB_REPOS_CACHE_TTL_SECONDS,
+    settings.GITHUB_REPOS_FULL_SYNC_SECONDS
+)
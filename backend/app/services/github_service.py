@@ -6,6 +6,9 @@ from typing import Dict, Any, Optional
 import requests
 import httpx
 
+# 중복 이슈 확인 시 살펴볼 최근 열린 이슈 수
+ISSUE_DEDUPE_SCAN = 30
+
 class GitHubService:
     def __init__(self, access_token: str):
         self.github = Github(access_token)
@@ -256,6 +259,32 @@ class GitHubService:
             print(f"Failed to create issue: {e}")
             raise Exception(f"Failed to create issue: {str(e)}")
     
+    def ensure_issue(self, repo: str, title: str, body: str, labels: list = None):
+        """같은 제목의 열린 이슈가 없을 때만 생성 (재시도해도 중복 이슈를 만들지 않음)
+        
+        이슈 생성 요청이 타임아웃돼도 GitHub에는 이미 만들어졌을 수 있으므로, 재시도 전에 먼저 찾는다.
+        """
+        repository = self.get_repo(repo)
+        filters = {"labels": labels} if labels else {}
+        open_issues = repository.get_issues(state="open", sort="created", direction="desc", **filters)
+        for issue in open_issues[:ISSUE_DEDUPE_SCAN]:
+            if issue.title == title:
+                return {'number': issue.number, 'url': issue.html_url, 'created': False}
+        return self.create_issue(repo, title=title, body=body, labels=labels)
+    
+    def ensure_webhook(self, repo_full_name: str, url: str, secret: str, events: list):
+        """저장소 웹훅 등록 (같은 URL이 있으면 설정만 갱신)"""
+        repository = self.get_repo(repo_full_name)
+        config = {"url": url, "content_type": "json", "secret": secret, "insecure_ssl": "0"}
+        
+        for hook in repository.get_hooks():
+            if hook.config.get("url") == url:
+                hook.edit("web", config, events=events, active=True)
+                return {'id': hook.id, 'created': False}
+        
+        hook = repository.create_hook("web", config, events=events, active=True)
+        return {'id': hook.id, 'created': True}
+    
     async def create_or_update_file(self, repo_full_name: str, path: str, content: str, message: str) -> Dict[str, Any]:
         """파일 생성 또는 업데이트 (비동기)"""
         repo = self.get_repo(repo_full_name)
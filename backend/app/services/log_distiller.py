@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional
+import re
+
+# 대략적인 토큰 수 (영문 로그 기준 4자 ≈ 1토큰)
+CHARS_PER_TOKEN = 4
+
+# 첫 오류 앞쪽에 최소한으로 포함할 줄 수 (나머지 예산은 오류 뒤쪽에 우선 사용)
+CONTEXT_LINES_BEFORE = 20
+
+# 실패 단계 / 생략 표시 / 구분 줄에 남겨 두는 예산
+HEADER_RESERVE_TOKENS = 40
+MAX_STEP_HEADER_TOKENS = 20
+# 오류 줄이 아닌 앞뒤 문맥 줄 하나의 최대 토큰 (minified 번들 한 줄이 예산을 다 쓰지 않도록)
+MAX_CONTEXT_LINE_TOKENS = 200
+TRUNCATED_MARKER = " ...[truncated]"
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|\x1b\][^\x07]*\x07")
+TIMESTAMP_PREFIX = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z ?")
+STEP_START = re.compile(r"^##\[group\](?:Run )?(.+)$")
+
+# 다운로드/업로드 진행률 등 원인 분석에 쓸모없는 줄
+NOISE_PATTERNS = [
+    re.compile(r"^##\[(?:endgroup|debug)\]"),
+    re.compile(r"^[0-9a-f]{12}: (?:Pulling fs layer|Waiting|Verifying Checksum|Download complete|"
+               r"Pull complete|Already exists|Preparing|Pushed|Layer already exists|Pushing|Downloading|Extracting)"),
+    re.compile(r"^#\d+ (?:sha256:[0-9a-f]+ )?[\d.]+[kMG]?B / [\d.]+[kMG]?B"),
+    re.compile(r"^\s*[━─=#>.\s]*\s*\d{1,3}(?:\.\d+)?%"),
+    re.compile(r"(?:Downloading|Downloaded|Receiving objects|Resolving deltas|Counting objects|Compressing objects)"
+               r".*\d+%"),
+    re.compile(r"^\s*$"),
+]
+
+# 오류 시그니처 (처음 일치하는 줄 주변을 추출)
+ERROR_PATTERNS = re.compile(
+    r"##\[error\]|Traceback \(most recent call last\)|\bERROR\b|\bError:|\berror:|"
+    r"\bFAILED\b|\bfatal:|npm ERR!|\bexit code [1-9]\d*|Permission denied|PERMISSION_DENIED|"
+    r"\bException\b|\bpanic:",
+)
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def _clean_lines(raw_log: str) -> List[Dict]:
+    """ANSI 코드와 타임스탬프를 지우고, 잡음 줄을 버리고, 연속 중복 줄을 합침"""
+    lines: List[Dict] = []
+    step = None
+    for raw_line in raw_log.splitlines():
+        line = TIMESTAMP_PREFIX.sub("", ANSI_ESCAPE.sub("", raw_line)).rstrip()
+
+        step_match = STEP_START.match(line)
+        if step_match:
+            step = step_match.group(1).strip()
+            lines.append({"text": f"[step] {step}", "step": step, "count": 1})
+            continue
+        if any(pattern.search(line) for pattern in NOISE_PATTERNS):
+            continue
+
+        if lines and lines[-1]["text"] == line:
+            lines[-1]["count"] += 1
+        else:
+            lines.append({"text": line, "step": step, "count": 1})
+    return lines
+
+def _render(line: Dict) -> str:
+    return line["text"] if line["count"] == 1 else f"{line['text']} (repeated {line['count']}x)"
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """한 줄이 max_tokens를 넘으면 앞부분만 남김 (minified 번들, 긴 JSON 등)"""
+    max_chars = max(max_tokens, 1) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - len(TRUNCATED_MARKER), 0)] + TRUNCATED_MARKER
+
+def distill_log(raw_log: str, token_budget: int) -> Dict:
+    """실패 원인 분석용으로 로그를 축약
+
+    첫 오류 시그니처가 있는 줄을 기준으로 앞쪽 일부와 뒤쪽을 토큰 예산 안에서 잘라내고,
+    예산 밖에 있는 마지막 ##[error] 줄은 끝에 덧붙인다. 오류가 없으면 끝부분을 사용한다.
+    예산보다 긴 줄은 잘라내므로 결과는 token_budget을 넘지 않는다 (예산이 HEADER_RESERVE_TOKENS 이상일 때).
+    """
+    lines = _clean_lines(raw_log or "")
+    window_budget = max(token_budget - HEADER_RESERVE_TOKENS, 1)
+    full_lines = [_render(line) for line in lines]
+    first_error: Optional[int] = next(
+        (i for i, text in enumerate(full_lines) if ERROR_PATTERNS.search(text)), None
+    )
+    anchor = first_error if first_error is not None else len(full_lines) - 1
+    # 기준 줄은 창 예산까지, 나머지 줄은 MAX_CONTEXT_LINE_TOKENS까지만 남김 (+1은 줄바꿈)
+    rendered = [
+        _truncate(text, window_budget - 1 if i == anchor else MAX_CONTEXT_LINE_TOKENS)
+        for i, text in enumerate(full_lines)
+    ]
+    costs = [estimate_tokens(text) + 1 for text in rendered]
+
+    # 기준 줄 뒤의 마지막 ##[error] (보통 최종 실패 메시지)는 창에 안 들어오면 끝에 붙이므로 예산을 미리 떼어 둠
+    last_error = next(
+        (i for i in range(len(rendered) - 1, anchor, -1) if rendered[i].startswith("##[error]")), None
+    )
+    trailing_reserve = costs[last_error] + 2 if last_error is not None else 0
+    if trailing_reserve and costs[max(anchor, 0)] + trailing_reserve <= window_budget:
+        window_budget -= trailing_reserve
+    else:
+        trailing_reserve = 0
+
+    # 오류 줄에서 시작해 앞쪽 CONTEXT_LINES_BEFORE줄, 이후 뒤쪽, 남으면 다시 앞쪽으로 확장
+    start = end = max(anchor, 0)
+    used = costs[start] if rendered else 0
+    while start > 0 and anchor - start < CONTEXT_LINES_BEFORE and used + costs[start - 1] <= window_budget:
+        start -= 1
+        used += costs[start]
+    while end + 1 < len(rendered) and used + costs[end + 1] <= window_budget:
+        end += 1
+        used += costs[end]
+    while start > 0 and used + costs[start - 1] <= window_budget:
+        start -= 1
+        used += costs[start]
+
+    excerpt = rendered[start:end + 1]
+    if trailing_reserve and last_error > end:
+        excerpt += ["...", rendered[last_error]]
+    failing_step = lines[anchor]["step"] if lines else None
+    step_header = _truncate(f"[step] {failing_step}", MAX_STEP_HEADER_TOKENS) if failing_step else None
+    if step_header and step_header not in excerpt:
+        excerpt.insert(0, step_header)
+    if start > 0:
+        excerpt.insert(0, f"... ({start} lines omitted)")
+
+    text = "\n".join(excerpt)
+    return {
+        "text": text,
+        "failing_step": failing_step,
+        "first_error_line": rendered[first_error] if first_error is not None else None,
+        "original_tokens": estimate_tokens(raw_log or ""),
+        "distilled_tokens": estimate_tokens(text)
+    }
@@ -0,0 +1,122 @@
+from app.core.config import settings
+from pathlib import Path
+from typing import AsyncIterator, Optional
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+import uuid
+
+# 쓰다 중단된 임시 파일은 이 시간이 지나면 정리 (초)
+STALE_TMP_SECONDS = 3600
+
+class CachedLogWriter:
+    """임시 gzip 파일에 기록하고, 끝까지 받은 경우에만 commit으로 캐시에 반영"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        self.size = 0
+        self._file = gzip.open(self.tmp_path, "wb")
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+        self.path.with_suffix(".json").write_text(json.dumps({"size": self.size}))
+
+    def discard(self):
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+class WorkflowLogStore:
+    """완료된 GitHub Actions 잡 로그를 로컬 디스크에 gzip으로 보관 (완료된 잡 로그는 불변)
+
+    전체 크기는 max_bytes로 제한하고, 넘으면 가장 오래 읽지 않은 로그부터 지운다 (읽을 때 mtime 갱신).
+    """
+
+    def __init__(self, cache_dir: str, chunk_size: int, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+
+    def _path(self, repo: str, job_id: int) -> Path:
+        repo_dir = hashlib.sha1(repo.lower().encode()).hexdigest()[:16]
+        return self.cache_dir / repo_dir / f"{job_id}.log.gz"
+
+    def cached_size(self, repo: str, job_id: int) -> Optional[int]:
+        """캐시된 로그의 원본 크기 (없으면 None)"""
+        meta_path = self._path(repo, job_id).with_suffix(".json")
+        try:
+            return json.loads(meta_path.read_text())["size"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def open_writer(self, repo: str, job_id: int) -> CachedLogWriter:
+        path = self._path(repo, job_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return CachedLogWriter(path)
+
+    async def iter_cached(self, repo: str, job_id: int, start: int = 0) -> AsyncIterator[bytes]:
+        """캐시된 로그를 start 바이트부터 청크 단위로 읽음 (파일 IO는 스레드에서)"""
+        path = self._path(repo, job_id)
+        file = await asyncio.to_thread(gzip.open, path, "rb")
+        # 최근에 읽은 로그는 정리 대상에서 뒤로 밀림
+        await asyncio.to_thread(_touch, path)
+        try:
+            if start:
+                # gzip은 앞으로 seek 시 압축을 풀며 건너뜀 (메모리는 청크 크기만 사용)
+                await asyncio.to_thread(file.seek, start)
+            while True:
+                chunk = await asyncio.to_thread(file.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            file.close()
+
+    def sweep(self) -> int:
+        """캐시 전체 크기가 max_bytes를 넘으면 오래 읽지 않은 로그부터 삭제, 삭제한 개수 반환"""
+        now = time.time()
+        logs = []
+        total = 0
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.name.endswith(".tmp"):
+                if now - stat.st_mtime > STALE_TMP_SECONDS:
+                    path.unlink(missing_ok=True)
+            elif path.name.endswith(".log.gz"):
+                logs.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(logs):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        if removed:
+            print(f"Workflow log cache: evicted {removed} logs ({total} bytes kept)")
+        return removed
+
+def _touch(path: Path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+log_store = WorkflowLogStore(
+    settings.WORKFLOW_LOG_CACHE_DIR,
+    settings.WORKFLOW_LOG_CHUNK_SIZE,
+    settings.WORKFLOW_LOG_CACHE_MAX_BYTES
+)
@@ -0,0 +1,97 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.config import settings
+from app.models.user import User
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, Optional
+import time
+
+class Principal(BaseModel):
+    """인증된 사용자 스냅샷 (요청 간 공유 가능한 읽기 전용 값)"""
+    id: int
+    email: str
+    github_username: Optional[str] = None
+    google_email: Optional[str] = None
+    is_active: Optional[bool] = True
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            github_username=user.github_username,
+            google_email=user.google_email,
+            is_active=user.is_active,
+            created_at=user.created_at
+        )
+
+class PrincipalCache:
+    """사용자 행 캐시: 프로세스 메모리 → (선택) Redis → DB 순으로 조회"""
+
+    def __init__(self, ttl_seconds: int, redis_url: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, tuple] = {}
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        entry = self._entries.get(user_id)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        principal = await self._get_from_redis(user_id)
+        if principal is None:
+            result = await db.execute(select(User).where(User.id == user_id))
+            user = result.scalar_one_or_none()
+            if not user:
+                return None
+            principal = Principal.from_user(user)
+            await self._set_in_redis(principal)
+
+        self._entries[user_id] = (principal, time.monotonic() + self.ttl_seconds)
+        return principal
+
+    async def invalidate(self, user_id: int):
+        """사용자 정보 변경 시 호출"""
+        self._entries.pop(user_id, None)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(self._redis_key(user_id))
+            except Exception as e:
+                print(f"Principal cache redis delete failed: {e}")
+
+    async def _get_from_redis(self, user_id: int) -> Optional[Principal]:
+        if self._redis is None:
+            return None
+        try:
+            data = await self._redis.get(self._redis_key(user_id))
+            return Principal.model_validate_json(data) if data else None
+        except Exception as e:
+            # Redis 장애 시 DB로 폴백
+            print(f"Principal cache redis get failed: {e}")
+            return None
+
+    async def _set_in_redis(self, principal: Principal):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                self._redis_key(principal.id),
+                principal.model_dump_json(),
+                ex=self.ttl_seconds
+            )
+        except Exception as e:
+            print(f"Principal cache redis set failed: {e}")
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    settings.REDIS_URL if settings.PRINCIPAL_CACHE_USE_REDIS else None
+)
@@ -0,0 +1,43 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql import func
+from app.models.project import Project
+from typing import Optional
+
+class ProjectService:
+    """프로젝트 레코드 저장 (같은 사용자/저장소/서비스는 한 행만 유지)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def upsert_project(
+        self,
+        user_id: int,
+        github_repo: str,
+        gcp_project_id: str,
+        service_name: str,
+        region: str,
+        deployment_url: Optional[str] = None,
+        workflow_path: Optional[str] = None
+    ) -> Project:
+        """INSERT … ON CONFLICT DO UPDATE 한 번으로 생성 또는 갱신"""
+        values = {
+            "gcp_project_id": gcp_project_id,
+            "region": region,
+            "deployment_url": deployment_url,
+            "workflow_path": workflow_path
+        }
+        stmt = (
+            insert(Project)
+            .values(user_id=user_id, github_repo=github_repo, service_name=service_name, **values)
+            .on_conflict_do_update(
+                constraint="uq_projects_user_repo_service",
+                set_={**values, "updated_at": func.now()}
+            )
+            .returning(Project)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db.execute(stmt)
+        project = result.scalar_one()
+        await self.db.commit()
+        return project
@@ -0,0 +1,72 @@
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+
+def _caller_key(gcp_service) -> str:
+    """호출자 자격 증명(액세스 토큰) 식별자 - 토큰 자체는 보관하지 않음"""
+    return hashlib.sha256((gcp_service.credentials.token or "").encode()).hexdigest()[:16]
+
+class RevisionIndex:
+    """Cloud Run 리비전 페이지를 서비스별로 TTL 캐시
+
+    캐시 키는 (project, region, service) 이고, 그 아래에 (호출자, limit, continue) 페이지를 보관한다.
+    페이지는 그 페이지를 조회한 자격 증명으로만 다시 제공되며(다른 사용자는 자기 토큰으로 새로 조회),
+    서비스 수는 max_services로 제한해 가장 오래 쓰지 않은 서비스부터 버린다.
+    트래픽이 바뀌면 update_traffic에서 서비스 단위로 무효화한다.
+    """
+
+    def __init__(self, ttl_seconds: int, max_services: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_services = max_services
+        self._pages: "OrderedDict[Tuple[str, str, str], Dict]" = OrderedDict()
+        # get_page는 asyncio.to_thread로 여러 스레드에서 호출됨 (업스트림 호출 중에는 잠그지 않음)
+        self._lock = threading.Lock()
+
+    def get_page(
+        self,
+        gcp_service,
+        project_id: str,
+        region: str,
+        service_name: str,
+        limit: int,
+        continue_token: Optional[str] = None
+    ) -> Dict:
+        """리비전 한 페이지 조회 (캐시 우선)"""
+        service_key = (project_id, region, service_name)
+        page_key = (_caller_key(gcp_service), limit, continue_token)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._pages.get(service_key, {}).get(page_key)
+            if cached and cached['expires_at'] > now:
+                self._pages.move_to_end(service_key)
+                return cached['page']
+
+        page = gcp_service.list_service_revisions_page(
+            project_id, region, service_name, limit, continue_token
+        )
+        with self._lock:
+            # 만료된 페이지는 새 페이지를 넣을 때 함께 정리
+            pages = {
+                key: entry for key, entry in self._pages.get(service_key, {}).items()
+                if entry['expires_at'] > now
+            }
+            pages[page_key] = {
+                'page': page,
+                'expires_at': now + self.ttl_seconds
+            }
+            self._pages[service_key] = pages
+            self._pages.move_to_end(service_key)
+            while len(self._pages) > self.max_services:
+                self._pages.popitem(last=False)
+        return page
+
+    def invalidate(self, project_id: str, region: str, service_name: str):
+        """서비스의 캐시된 페이지 모두 제거"""
+        with self._lock:
+            self._pages.pop((project_id, region, service_name), None)
+
+revision_index = RevisionIndex(settings.REVISION_CACHE_TTL_SECONDS, settings.REVISION_CACHE_MAX_SERVICES)
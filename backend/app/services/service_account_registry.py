@@ -0,0 +1,141 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.database import release_connection
+from app.models.service_account import ServiceAccountCredential
+from app.services.gcp_service import GCPService
+from app.services.user_service import UserService
+from datetime import datetime
+from typing import Dict
+import base64
+import asyncio
+import hashlib
+
+# 새 서비스 계정 생성 후 IAM 전파 대기 시간 (초)
+IAM_SYNC_WAIT_SECONDS = 5
+
+class ServiceAccountRegistry:
+    """(사용자, GCP 프로젝트, 저장소) 별 서비스 계정과 현재 키를 DB에 암호화해 보관하고 재사용
+
+    같은 프로젝트와 저장소를 다른 사용자가 등록해도 키를 공유하거나 교체하지 않도록
+    사용자마다 별도의 서비스 계정을 만든다.
+    """
+
+    def __init__(self, db: AsyncSession, gcp_service: GCPService, user_id: int):
+        self.db = db
+        self.gcp_service = gcp_service
+        self.user_id = user_id
+        self.user_service = UserService(db)
+
+    @staticmethod
+    def account_id_for_repo(user_id: int, github_repo: str) -> str:
+        """사용자·저장소별 고정 서비스 계정 ID (6~30자, 소문자로 시작)"""
+        return f"gha-{hashlib.md5(f'{user_id}:{github_repo.lower()}'.encode()).hexdigest()[:20]}"
+
+    async def get_entry(self, gcp_project_id: str, github_repo: str):
+        """이 사용자가 등록한 서비스 계정 조회"""
+        result = await self.db.execute(
+            select(ServiceAccountCredential).where(
+                ServiceAccountCredential.user_id == self.user_id,
+                ServiceAccountCredential.gcp_project_id == gcp_project_id,
+                ServiceAccountCredential.github_repo == github_repo
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_or_create(self, gcp_project_id: str, github_repo: str) -> Dict:
+        """서비스 계정과 키를 재사용하고, 없을 때만 새로 생성"""
+        entry = await self.get_entry(gcp_project_id, github_repo)
+        # IAM 호출 동안 커넥션을 잡고 있지 않도록 반환
+        await release_connection(self.db)
+
+        if entry and entry.encrypted_key:
+            print(f"Reusing service account: {entry.service_account_email}")
+            # 바인딩이 이미 있으면 setIamPolicy 쓰기는 생략됨
+            await asyncio.to_thread(self.gcp_service.grant_permissions, gcp_project_id, entry.service_account_email)
+            return {
+                "email": entry.service_account_email,
+                "key_json": self.user_service.decrypt_token(entry.encrypted_key),
+                "created": False
+            }
+
+        if entry:
+            service_account_email = entry.service_account_email
+            self.db.add(entry)
+        else:
+            service_account = await asyncio.to_thread(
+                self.gcp_service.create_service_account,
+                gcp_project_id,
+                self.account_id_for_repo(self.user_id, github_repo)
+            )
+            service_account_email = service_account['email']
+
+            # IAM API 동기화를 위해 잠시 대기
+            print("Waiting for IAM API to sync...")
+            await asyncio.sleep(IAM_SYNC_WAIT_SECONDS)
+
+            entry = ServiceAccountCredential(
+                user_id=self.user_id,
+                gcp_project_id=gcp_project_id,
+                github_repo=github_repo,
+                service_account_email=service_account_email
+            )
+            self.db.add(entry)
+
+        # 권한 부여 (실패해도 계속 진행)
+        try:
+            await asyncio.to_thread(self.gcp_service.grant_permissions, gcp_project_id, service_account_email)
+        except Exception as e:
+            print(f"Permission grant failed (continuing anyway): {e}")
+
+        key_json = await self._store_new_key(entry)
+        await self.db.commit()
+
+        return {
+            "email": service_account_email,
+            "key_json": key_json,
+            "created": True
+        }
+
+    async def rotate(self, gcp_project_id: str, github_repo: str) -> Dict:
+        """새 키를 발급하고 이전 키들을 삭제"""
+        entry = await self.get_entry(gcp_project_id, github_repo)
+        if not entry:
+            raise ValueError("Service account not registered")
+        await release_connection(self.db)
+
+        key_json = await self._store_new_key(entry)
+        self.db.add(entry)
+        await self.db.commit()
+
+        # 새 키 저장 후 나머지 사용자 관리 키 삭제
+        deleted_keys = []
+        key_names = await asyncio.to_thread(
+            self.gcp_service.list_service_account_keys,
+            gcp_project_id,
+            entry.service_account_email
+        )
+        for key_name in key_names:
+            if key_name == entry.key_name:
+                continue
+            if await asyncio.to_thread(self.gcp_service.delete_service_account_key, key_name):
+                deleted_keys.append(key_name)
+
+        return {
+            "email": entry.service_account_email,
+            "key_json": key_json,
+            "deleted_keys": deleted_keys
+        }
+
+    async def _store_new_key(self, entry: ServiceAccountCredential) -> str:
+        """키 생성 후 암호화하여 entry에 기록, JSON 문자열 반환 (IAM 호출은 스레드에서)"""
+        key = await asyncio.to_thread(
+            self.gcp_service.create_service_account_key_entry,
+            entry.gcp_project_id,
+            entry.service_account_email
+        )
+        key_json = base64.b64decode(key['privateKeyData']).decode('utf-8')
+
+        entry.key_name = key['name']
+        entry.encrypted_key = self.user_service.encrypt_token(key_json)
+        entry.key_created_at = datetime.utcnow()
+        return key_json
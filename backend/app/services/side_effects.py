@@ -0,0 +1,40 @@
+from app.core.config import settings
+from typing import Callable, Set
+import asyncio
+import inspect
+
+class SideEffectDispatcher:
+    """응답 이후에 실행해도 되는 부수 작업(이슈 생성, 알림 등)을 백그라운드에서 재시도하며 실행"""
+
+    def __init__(self, max_retries: int, retry_delay: float):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._tasks: Set[asyncio.Task] = set()
+
+    def dispatch(self, name: str, func: Callable, *args, **kwargs) -> asyncio.Task:
+        """작업을 예약하고 바로 반환 (동기 함수는 스레드에서 실행)"""
+        task = asyncio.create_task(self._run(name, func, *args, **kwargs))
+        # 실행 중인 태스크가 GC되지 않도록 참조 보관
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, name: str, func: Callable, *args, **kwargs):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+                return await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Side effect '{name}' failed after {attempt} attempts: {e}")
+                    return None
+                print(f"Side effect '{name}' failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(self.retry_delay * (2 ** (attempt - 1)))
+
+    async def drain(self, timeout: float = 10.0):
+        """종료 시 남은 작업 완료 대기"""
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=timeout)
+
+side_effects = SideEffectDispatcher(settings.SIDE_EFFECT_MAX_RETRIES, settings.SIDE_EFFECT_RETRY_DELAY)
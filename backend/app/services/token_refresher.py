@@ -0,0 +1,105 @@
+from sqlalchemy import select, or_
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, try_advisory_lock
+from app.models.user import User
+from app.services.user_service import refresh_google_token_single_flight
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+import asyncio
+import time
+
+# 여러 워커 중 한 곳에서만 갱신하도록 잡는 pg_advisory_lock 키
+REFRESH_LOCK_KEY = 7_305_114_202
+
+class GoogleTokenRefresher:
+    """만료가 임박한 Google 액세스 토큰을 주기적으로 미리 갱신
+
+    주기마다 advisory lock을 얻은 워커 하나만 갱신하고, 실패한 사용자는 지수 백오프로 재시도한다.
+    철회된 refresh token은 갱신 시 지워지므로 다음 주기부터 대상에서 빠진다.
+    """
+
+    def __init__(self, interval_seconds: int, margin_seconds: int, max_backoff_seconds: int, max_concurrency: int):
+        self.interval_seconds = interval_seconds
+        self.margin_seconds = margin_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_concurrency = max_concurrency
+        self._task: Optional[asyncio.Task] = None
+        self._failures: Dict[int, int] = {}
+        self._retry_at: Dict[int, float] = {}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                async with try_advisory_lock(REFRESH_LOCK_KEY) as acquired:
+                    if acquired:
+                        await self.refresh_expiring()
+            except Exception as e:
+                print(f"Google token refresher error: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def refresh_expiring(self) -> int:
+        """갱신 여유 시간 안에 만료되거나 만료 시각을 모르는 토큰 갱신"""
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=self.margin_seconds)
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(User.id).where(
+                    User.google_refresh_token.isnot(None),
+                    or_(
+                        User.google_token_expires_at.is_(None),
+                        User.google_token_expires_at <= deadline
+                    )
+                )
+            )
+            user_ids = result.scalars().all()
+
+        # 최근에 실패한 사용자는 백오프가 끝날 때까지 건너뜀
+        now = time.monotonic()
+        user_ids = [user_id for user_id in user_ids if self._retry_at.get(user_id, 0) <= now]
+
+        # 갱신마다 커넥션을 잠시 쓰므로 요청 처리용 풀이 고갈되지 않도록 동시 갱신 수 제한
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def refresh(user_id: int) -> Optional[str]:
+            async with semaphore:
+                # 요청 경로와 같은 single-flight를 사용하므로 중복 갱신 없음
+                return await refresh_google_token_single_flight(user_id)
+
+        results = await asyncio.gather(*[refresh(user_id) for user_id in user_ids], return_exceptions=True)
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, str):
+                self._failures.pop(user_id, None)
+                self._retry_at.pop(user_id, None)
+            else:
+                self._record_failure(user_id, now)
+
+        refreshed = sum(1 for r in results if isinstance(r, str))
+        if user_ids:
+            print(f"Refreshed {refreshed}/{len(user_ids)} expiring Google tokens")
+        return refreshed
+
+    def _record_failure(self, user_id: int, now: float):
+        failures = self._failures.get(user_id, 0) + 1
+        self._failures[user_id] = failures
+        backoff = min(self.interval_seconds * 2 ** failures, self.max_backoff_seconds)
+        self._retry_at[user_id] = now + backoff
+
+google_token_refresher = GoogleTokenRefresher(
+    settings.GOOGLE_TOKEN_REFRESH_INTERVAL_SECONDS,
+    settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS,
+    settings.GOOGLE_TOKEN_REFRESH_MAX_BACKOFF_SECONDS,
+    settings.GOOGLE_TOKEN_REFRESH_MAX_CONCURRENCY
+)
@@ -1,18 +1,84 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from app.models.user import User
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from collections import OrderedDict
 import json
+import time
 from cryptography.fernet import Fernet
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal, release_connection
+from app.services.principal_cache import principal_cache
+import asyncio
 import httpx
 
+# 프로세스 전역 암호화 객체 (요청마다 Fernet을 새로 만들지 않음)
+_cipher = Fernet(settings.ENCRYPTION_KEY.encode()) if settings.ENCRYPTION_KEY else None
+
+class TokenCache:
+    """사용자별 복호화된 토큰 TTL 캐시 (적중률과 절약 시간 계측)
+    
+    만료된 항목은 조회 시 지우고, max_entries를 넘으면 가장 오래 쓰지 않은 사용자부터 제거한다.
+    """
+    
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._miss_seconds = 0.0
+        self._hit_seconds = 0.0
+    
+    def get(self, user_id: int) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[0]
+    
+    def set(self, user_id: int, tokens: dict):
+        self._entries[user_id] = (tokens, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+    
+    def record(self, hit: bool, elapsed: float):
+        if hit:
+            self.hits += 1
+            self._hit_seconds += elapsed
+        else:
+            self.misses += 1
+            self._miss_seconds += elapsed
+    
+    def stats(self) -> dict:
+        """적중률과 적중 시 요청당 절약 시간"""
+        total = self.hits + self.misses
+        avg_miss_ms = self._miss_seconds / self.misses * 1000 if self.misses else 0.0
+        avg_hit_ms = self._hit_seconds / self.hits * 1000 if self.hits else 0.0
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "avg_miss_ms": round(avg_miss_ms, 3),
+            "avg_hit_ms": round(avg_hit_ms, 3),
+            "saved_ms_per_hit": round(max(avg_miss_ms - avg_hit_ms, 0.0), 3) if self.misses else None
+        }
+
+token_cache = TokenCache(settings.TOKEN_CACHE_TTL_SECONDS, settings.TOKEN_CACHE_MAX_ENTRIES)
+
 class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        # 암호화 키 (실제로는 환경변수에서 가져와야 함)
-        self.cipher = Fernet(settings.ENCRYPTION_KEY.encode()) if settings.ENCRYPTION_KEY else None
+        self.cipher = _cipher
     
     def encrypt_token(self, token: str) -> str:
         """토큰 암호화"""
@@ -26,37 +92,36 @@ class UserService:
             return self.cipher.decrypt(encrypted_token.encode()).decode()
         return encrypted_token
     
-    async def get_or_create_user_by_github(
-        self, 
-        github_username: str, 
-        github_email: str,
+    async def connect_github(
+        self,
+        user_id: int,
+        github_id: int,
+        github_username: str,
         access_token: str
-    ) -> User:
-        """GitHub 사용자 조회 또는 생성"""
-        # 기존 사용자 조회
-        result = await self.db.execute(
-            select(User).where(User.github_username == github_username)
-        )
-        user = result.scalar_one_or_none()
+    ) -> Optional[User]:
+        """로그인한 사용자에 GitHub 계정 연결 (UPDATE … RETURNING 한 번, 사용자가 없으면 None)
         
-        if user:
-            # 기존 사용자 - 토큰 업데이트
-            user.github_access_token = self.encrypt_token(access_token)
-            user.github_connected_at = datetime.utcnow()
-            if github_email and not user.email:
-                user.email = github_email
-        else:
-            # 새 사용자 생성
-            user = User(
-                email=github_email or f"{github_username}@github.local",
+        OAuth state의 사용자 행만 갱신하고 email로 다른 계정을 찾아 합치지 않는다.
+        같은 GitHub 계정은 여러 사용자에 연결될 수 있으므로 github_id는 unique가 아니다.
+        """
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                github_id=github_id,
                 github_username=github_username,
                 github_access_token=self.encrypt_token(access_token),
                 github_connected_at=datetime.utcnow()
             )
-            self.db.add(user)
-        
+            .returning(User)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        user = result.scalar_one_or_none()
         await self.db.commit()
-        await self.db.refresh(user)
+        
+        if user is not None:
+            token_cache.invalidate(user.id)
+            await principal_cache.invalidate(user.id)
         return user
     
     async def update_google_connection(
@@ -64,7 +129,8 @@ class UserService:
         user_id: int,
         google_email: str,
         access_token: str,
-        refresh_token: str
+        refresh_token: str,
+        expires_in: Optional[int] = None
     ) -> User:
         """Google 연결 정보 업데이트"""
         result = await self.db.execute(
@@ -78,10 +144,13 @@ class UserService:
         user.google_email = google_email
         user.google_access_token = self.encrypt_token(access_token)
         user.google_refresh_token = self.encrypt_token(refresh_token)
+        user.google_token_expires_at = google_token_expiry(expires_in)
         user.google_connected_at = datetime.utcnow()
         
         await self.db.commit()
         await self.db.refresh(user)
+        token_cache.invalidate(user.id)
+        await principal_cache.invalidate(user.id)
         return user
     
     async def get_user_by_email(self, email: str) -> Optional[User]:
@@ -92,7 +161,14 @@ class UserService:
         return result.scalar_one_or_none()
     
     async def get_user_tokens(self, user_id: int) -> dict:
-        """사용자의 복호화된 토큰 반환"""
+        """사용자의 복호화된 토큰 반환 (프로세스 캐시 우선)"""
+        started_at = time.perf_counter()
+        
+        cached = token_cache.get(user_id)
+        if cached is not None:
+            token_cache.record(True, time.perf_counter() - started_at)
+            return await self._ensure_fresh_google_token(user_id, dict(cached))
+        
         result = await self.db.execute(
             select(User).where(User.id == user_id)
         )
@@ -101,23 +177,43 @@ class UserService:
         if not user:
             return {}
         
-        return {
+        tokens = {
             "github_token": self.decrypt_token(user.github_access_token) if user.github_access_token else None,
             "google_token": self.decrypt_token(user.google_access_token) if user.google_access_token else None,
-            "google_refresh_token": self.decrypt_token(user.google_refresh_token) if user.google_refresh_token else None
+            "google_refresh_token": self.decrypt_token(user.google_refresh_token) if user.google_refresh_token else None,
+            "google_token_expires_at": user.google_token_expires_at
         }
+        token_cache.set(user_id, tokens)
+        token_cache.record(False, time.perf_counter() - started_at)
+        return await self._ensure_fresh_google_token(user_id, dict(tokens))
+    
+    async def _ensure_fresh_google_token(self, user_id: int, tokens: dict) -> dict:
+        """만료가 임박한 Google 토큰은 반환 전에 갱신 (401 후 재시도 왕복 방지)"""
+        if tokens.get("google_refresh_token") and google_token_expiring(tokens.get("google_token_expires_at")):
+            new_access_token = await refresh_google_token_single_flight(user_id)
+            if new_access_token:
+                tokens["google_token"] = new_access_token
+        return tokens
     
     async def refresh_google_token(self, user_id: int) -> Optional[str]:
-        """Google 액세스 토큰 갱신"""
+        """Google 액세스 토큰 갱신 (같은 사용자에 대한 동시 요청은 한 번만 갱신)"""
+        return await refresh_google_token_single_flight(user_id)
+    
+    async def _refresh_google_token(self, user_id: int) -> Optional[str]:
+        """Google 액세스 토큰 갱신 및 만료 시각 저장
+        
+        Google 응답을 기다리는 동안 커넥션을 잡고 있지 않도록 refresh token만 읽고 반환한다.
+        """
         result = await self.db.execute(
-            select(User).where(User.id == user_id)
+            select(User.google_refresh_token).where(User.id == user_id)
         )
-        user = result.scalar_one_or_none()
+        encrypted_refresh_token = result.scalar_one_or_none()
+        await release_connection(self.db)
         
-        if not user or not user.google_refresh_token:
+        if not encrypted_refresh_token:
             return None
         
-        refresh_token = self.decrypt_token(user.google_refresh_token)
+        refresh_token = self.decrypt_token(encrypted_refresh_token)
         
         try:
             # Google OAuth2 토큰 갱신 요청
@@ -136,15 +232,74 @@ class UserService:
                 token_data = response.json()
                 new_access_token = token_data.get("access_token")
                 
-                # 새 액세스 토큰 저장
-                user.google_access_token = self.encrypt_token(new_access_token)
+                # 새 액세스 토큰과 만료 시각 저장
+                await self.db.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(
+                        google_access_token=self.encrypt_token(new_access_token),
+                        google_token_expires_at=google_token_expiry(token_data.get("expires_in"))
+                    )
+                )
                 await self.db.commit()
+                token_cache.invalidate(user_id)
                 
                 return new_access_token
+            elif response.status_code == 400 and _oauth_error(response) == "invalid_grant":
+                # 철회되거나 만료된 refresh token은 다시 시도해도 실패하므로 지우고 재연결을 기다림
+                # 그 사이 사용자가 다시 연결했으면 새 refresh token은 유지
+                print(f"Google refresh token revoked for user {user_id}, clearing it")
+                await self.db.execute(
+                    update(User)
+                    .where(
+                        User.id == user_id,
+                        User.google_refresh_token == encrypted_refresh_token
+                    )
+                    .values(google_refresh_token=None)
+                )
+                await self.db.commit()
+                token_cache.invalidate(user_id)
+                return None
             else:
                 print(f"Failed to refresh Google token: {response.status_code} - {response.text}")
                 return None
                 
         except Exception as e:
             print(f"Error refreshing Google token: {e}")
-            return None
\ No newline at end of file
+            return None
+
+def _oauth_error(response: httpx.Response) -> Optional[str]:
+    try:
+        return response.json().get("error")
+    except ValueError:
+        return None
+
+def google_token_expiry(expires_in: Optional[int]) -> Optional[datetime]:
+    """expires_in(초)으로 만료 시각 계산"""
+    if not expires_in:
+        return None
+    return datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
+
+def google_token_expiring(expires_at: Optional[datetime]) -> bool:
+    """만료 시각이 갱신 여유 시간 안으로 들어왔는지"""
+    if expires_at is None:
+        return False
+    margin = timedelta(seconds=settings.GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS)
+    return expires_at <= datetime.now(timezone.utc) + margin
+
+# 사용자별 진행 중인 Google 토큰 갱신
+_google_refresh_inflight: Dict[int, asyncio.Task] = {}
+
+async def _refresh_google_token_in_new_session(user_id: int) -> Optional[str]:
+    # 요청 세션과 무관하게 완료되도록 별도 세션 사용
+    async with AsyncSessionLocal() as db:
+        return await UserService(db)._refresh_google_token(user_id)
+
+async def refresh_google_token_single_flight(user_id: int) -> Optional[str]:
+    """사용자별로 하나의 갱신만 실행하고, 동시에 들어온 요청은 그 결과를 공유"""
+    task = _google_refresh_inflight.get(user_id)
+    if task is None:
+        task = asyncio.create_task(_refresh_google_token_in_new_session(user_id))
+        _google_refresh_inflight[user_id] = task
+        task.add_done_callback(lambda _: _google_refresh_inflight.pop(user_id, None))
+    return await asyncio.shield(task)
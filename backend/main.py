@@ -1,9 +1,19 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
-from app.api import auth, github, gcp, cicd, deployment, projects, rollback, analyze, github_actions, gcp_setup
+from app.api.auth import get_current_user
+from app.api import auth, github, gcp, cicd, deployment, projects, rollback, analyze, github_actions, gcp_setup, webhooks
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import check_schema_version, query_histogram
+from app.core.http_client import close_http_client
+from app.core.security import shutdown_password_executor
+from app.api.projects import shutdown_dashboard_executor
+from app.services.side_effects import side_effects
+from app.services.user_service import token_cache
+from app.services.token_refresher import google_token_refresher
+from app.services.deployment_syncer import deployment_syncer
+from app.services.deployment_events import deployment_events
+from app.services.failure_signatures import failure_signatures
 import os
 import uvicorn
 
@@ -33,13 +43,25 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Startup event to create tables
+# Startup event to verify schema version
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("Database tables created/verified")
+    """스키마 버전 확인 (테이블 생성/변경은 alembic 마이그레이션에서만)"""
+    await check_schema_version()
+    google_token_refresher.start()
+    deployment_syncer.start()
+    deployment_events.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """남은 백그라운드 부수 작업 완료 대기 및 공유 클라이언트 정리"""
+    await google_token_refresher.stop()
+    await deployment_syncer.stop()
+    await deployment_events.stop()
+    await side_effects.drain()
+    await close_http_client()
+    shutdown_password_executor()
+    shutdown_dashboard_executor()
 
 # 라우터 등록
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -52,6 +74,7 @@ app.include_router(rollback.router, prefix="/api/rollback", tags=["rollback"])
 app.include_router(analyze.router, prefix="/api/analyze", tags=["analyze"])
 app.include_router(github_actions.router, prefix="/api/github-actions", tags=["github-actions"])
 app.include_router(gcp_setup.router, prefix="/api/gcp-setup", tags=["gcp-setup"])
+app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
 
 @app.get("/")
 async def root():
@@ -77,6 +100,25 @@ async def debug_cors():
         }
     }
 
+def require_debug_stats():
+    """통계 엔드포인트는 설정으로 켠 경우에만 노출"""
+    if not settings.DEBUG_STATS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+debug_stats_dependencies = [Depends(require_debug_stats), Depends(get_current_user)]
+
+@app.get("/debug/db-stats", dependencies=debug_stats_dependencies)
+async def debug_db_stats():
+    return query_histogram.stats()
+
+@app.get("/debug/token-cache", dependencies=debug_stats_dependencies)
+async def debug_token_cache():
+    return token_cache.stats()
+
+@app.get("/debug/failure-signatures", dependencies=debug_stats_dependencies)
+async def debug_failure_signatures():
+    return failure_signatures.stats()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
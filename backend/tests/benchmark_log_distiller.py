@@ -0,0 +1,33 @@
+"""로그 축약 벤치마크: 토큰 감소량과 지연 시간 보고
+
+    python -m tests.benchmark_log_distiller [로그 파일 ...]
+"""
+from app.services.log_distiller import distill_log
+from pathlib import Path
+import statistics
+import sys
+import time
+
+FIXTURE = Path(__file__).parent / "fixtures" / "failed_build.log"
+TOKEN_BUDGET = 2000
+ROUNDS = 50
+
+def benchmark(path: Path, token_budget: int = TOKEN_BUDGET, rounds: int = ROUNDS) -> dict:
+    raw_log = path.read_text()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = distill_log(raw_log, token_budget)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "file": path.name,
+        "original_tokens": result["original_tokens"],
+        "distilled_tokens": result["distilled_tokens"],
+        "reduction": round(1 - result["distilled_tokens"] / result["original_tokens"], 4),
+        "median_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2)
+    }
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or [str(FIXTURE)]:
+        print(benchmark(Path(arg)))
@@ -0,0 +1,53 @@
+"""저장소 검색 인덱스 벤치마크: 합성 저장소 목록에서 질의당 지연 시간 보고
+
+    python -m tests.benchmark_repo_search [저장소 수]
+"""
+from app.services.github_repo_cache import RepoSearchIndex
+import random
+import statistics
+import sys
+import time
+
+REPO_COUNT = 5000
+SEARCH_LIMIT = 30
+ROUNDS = 20
+# 접두사 일치, 부분 문자열 일치, 일치 없음(전체 순회) 경우를 모두 포함
+QUERIES = ["a", "api", "acme/", "serv", "ice-", "web-app", "zzzz-missing"]
+
+_OWNERS = ["acme", "globex", "initech", "umbrella", "hooli", "wayne-ent"]
+_WORDS = ["api", "web", "app", "service", "worker", "infra", "deploy", "auth", "billing", "frontend", "backend", "docs"]
+
+def synthetic_repos(count: int = REPO_COUNT, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    repos = []
+    for i in range(count):
+        owner = rng.choice(_OWNERS)
+        name = "-".join(rng.sample(_WORDS, rng.randint(1, 3))) + f"-{i}"
+        repos.append({
+            "id": i,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "updated_at": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00Z"
+        })
+    return repos
+
+def benchmark(count: int = REPO_COUNT, rounds: int = ROUNDS) -> dict:
+    started = time.perf_counter()
+    index = RepoSearchIndex(synthetic_repos(count))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    timings = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            started = time.perf_counter()
+            index.search(query, SEARCH_LIMIT)
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "repos": count,
+        "build_ms": round(build_ms, 2),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3)
+    }
+
+if __name__ == "__main__":
+    print(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else REPO_COUNT))
@@ -0,0 +1,39 @@
+import asyncio
+import time
+from app.api import projects
+from app.core.config import settings
+
+def test_timeout_includes_semaphore_wait(monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_UPSTREAM_TIMEOUT", 0.2)
+    
+    async def slow():
+        await asyncio.sleep(1)
+    
+    async def run():
+        # 동시 1개만 허용해도 대기 중인 호출까지 타임아웃 안에 끝나야 함
+        semaphore = asyncio.Semaphore(1)
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            projects._fetch_with_fallback("cloud_run", project_id, semaphore, slow)
+            for project_id in range(4)
+        ])
+        return time.perf_counter() - start, results
+    
+    elapsed, results = asyncio.run(run())
+    assert elapsed < 0.5
+    assert all(r["stale"] and r["error"] == "cloud_run timed out" for r in results)
+
+def test_last_results_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_LAST_RESULTS_MAX", 3)
+    monkeypatch.setattr(projects, "_dashboard_last_results", projects.OrderedDict())
+    
+    async def ok():
+        return "data"
+    
+    async def run():
+        semaphore = asyncio.Semaphore(2)
+        for project_id in range(5):
+            await projects._fetch_with_fallback("github_actions", project_id, semaphore, ok)
+    
+    asyncio.run(run())
+    assert list(projects._dashboard_last_results) == [("github_actions", i) for i in (2, 3, 4)]
@@ -0,0 +1,63 @@
+import asyncio
+from datetime import timedelta
+from app.services import failure_signatures as failure_signatures_module
+from app.services.failure_signatures import FailureSignatureIndex, fingerprint, match_known_failure, strip_project_specific
+from app.services.log_distiller import distill_log
+
+def _npm_build_log(error: str) -> str:
+    return "\n".join([
+        "##[group]Run npm run build",
+        "> app@1.0.0 build",
+        "> vite build",
+        error,
+        "npm ERR! code 1",
+        "npm ERR! path /home/runner/work/app/app",
+        "##[error]Process completed with exit code 1.",
+    ])
+
+def test_unrelated_failures_get_different_fingerprints():
+    syntax = distill_log(_npm_build_log("src/main.js:12:4: ERROR: Unexpected \"}\""), 2000)
+    missing = distill_log(_npm_build_log("Error: Cannot find module 'lodash'"), 2000)
+    assert fingerprint(syntax)[0] != fingerprint(missing)[0]
+
+def test_same_failure_in_another_run_matches():
+    first = distill_log(_npm_build_log("Error: Cannot find module 'lodash' from /home/runner/work/a/a/src"), 2000)
+    second = distill_log(_npm_build_log("Error: Cannot find module 'react' from /home/runner/work/b/b/src"), 2000)
+    assert fingerprint(first)[0] == fingerprint(second)[0]
+
+def test_generic_exit_code_only_is_not_fingerprinted():
+    distilled = distill_log("##[group]Run npm run build\n##[error]Process completed with exit code 1.", 2000)
+    assert fingerprint(distilled) is None
+
+def test_project_specific_code_changes_are_stripped():
+    diagnosis = {"root_cause": "x", "solutions": [{"description": "d", "steps": [], "code_changes": "secret diff"}]}
+    assert strip_project_specific(diagnosis)["solutions"][0]["code_changes"] == ""
+
+def _docker_build_log(error: str) -> str:
+    return "\n".join([
+        "##[group]Run docker buildx build --push",
+        "#5 importing cache manifest from gcr.io/acme/api:buildcache",
+        "#5 ERROR: failed to configure registry cache importer: gcr.io/acme/api:buildcache: unauthorized",
+        "#9 [build 4/6] RUN npm ci",
+        error,
+        "##[error]Process completed with exit code 1.",
+    ])
+
+def test_builtin_rules_ignore_non_fatal_cache_warnings():
+    distilled = distill_log(_docker_build_log("#9 npm ERR! Missing: lodash@4.17.21 from lock file"), 2000)
+    assert match_known_failure(distilled)[0] == "npm-ci-lockfile-mismatch"
+
+def test_cache_warning_alone_does_not_match_registry_rule():
+    distilled = distill_log(_docker_build_log("#9 ERROR: failed to solve: exit code: 137"), 2000)
+    assert match_known_failure(distilled) is None
+
+def test_learned_diagnoses_are_not_shared_between_users(monkeypatch):
+    monkeypatch.setattr(failure_signatures_module.side_effects, "dispatch", lambda *args, **kwargs: None)
+    index = FailureSignatureIndex(timedelta(days=30))
+    index._loaded = True
+    distilled = distill_log(_npm_build_log("Error: Cannot find module 'lodash'"), 2000)
+    index._entries[(1, fingerprint(distilled)[0])] = ({"root_cause": "acme-internal/billing.js"}, None)
+    
+    assert asyncio.run(index.lookup(distilled, 1))["root_cause"] == "acme-internal/billing.js"
+    assert asyncio.run(index.lookup(distilled, 2)) is None
+    assert asyncio.run(index.lookup(distilled)) is None
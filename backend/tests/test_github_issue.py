@@ -0,0 +1,32 @@
+from app.services.github_service import GitHubService
+
+class _Issue:
+    def __init__(self, number, title):
+        self.number = number
+        self.title = title
+        self.html_url = f"https://github.com/acme/api/issues/{number}"
+
+class _Repo:
+    def __init__(self):
+        self.issues = []
+    
+    def get_issues(self, state, sort, direction, labels=None):
+        return list(reversed(self.issues))
+    
+    def create_issue(self, title, body, labels):
+        issue = _Issue(len(self.issues) + 1, title)
+        self.issues.append(issue)
+        return issue
+
+def test_retried_issue_creation_does_not_duplicate(monkeypatch):
+    repo = _Repo()
+    service = GitHubService("token")
+    monkeypatch.setattr(service, "get_repo", lambda name: repo)
+    
+    first = service.ensure_issue("acme/api", "[Rollback] api rolled back to api-0002", "body", ["rollback"])
+    # 첫 요청이 타임아웃된 뒤 재시도한 경우
+    retry = service.ensure_issue("acme/api", "[Rollback] api rolled back to api-0002", "body", ["rollback"])
+    
+    assert first["created"] and not retry["created"]
+    assert retry["number"] == first["number"]
+    assert len(repo.issues) == 1
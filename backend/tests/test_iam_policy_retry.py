@@ -0,0 +1,66 @@
+import httplib2
+from googleapiclient.errors import HttpError
+from app.services import gcp_service
+from app.services.gcp_service import GCPService, REQUIRED_ROLES
+
+class _Call:
+    def __init__(self, fn):
+        self.execute = fn
+
+class _FakeResourceManager:
+    """getIamPolicy / setIamPolicy만 흉내내는 가짜 클라이언트"""
+    def __init__(self, conflicts: int, bindings=None):
+        self.conflicts = conflicts
+        self.bindings = bindings or []
+        self.etag = 0
+        self.reads = 0
+        self.writes = []
+    
+    def projects(self):
+        return self
+    
+    def getIamPolicy(self, resource):
+        def execute():
+            self.reads += 1
+            return {"etag": str(self.etag), "bindings": [dict(b, members=list(b["members"])) for b in self.bindings]}
+        return _Call(execute)
+    
+    def setIamPolicy(self, resource, body):
+        def execute():
+            self.writes.append(body["policy"])
+            if self.conflicts > 0:
+                # 다른 쓰기가 먼저 반영된 상황
+                self.conflicts -= 1
+                self.etag += 1
+                raise HttpError(httplib2.Response({"status": 409}), b"etag conflict")
+            self.bindings = body["policy"]["bindings"]
+            return body["policy"]
+        return _Call(execute)
+
+def _service(monkeypatch, manager):
+    monkeypatch.setattr(gcp_service, "build", lambda *args, **kwargs: manager)
+    monkeypatch.setattr(gcp_service.time, "sleep", lambda seconds: None)
+    return GCPService("token")
+
+def test_etag_conflict_rereads_policy_and_retries(monkeypatch):
+    manager = _FakeResourceManager(conflicts=2)
+    assert _service(monkeypatch, manager).grant_permissions_batch("proj", ["sa@proj.iam.gserviceaccount.com"])
+    assert manager.reads == 3
+    assert [w["etag"] for w in manager.writes] == ["0", "1", "2"]
+    assert {b["role"] for b in manager.bindings} == set(REQUIRED_ROLES)
+
+def test_gives_up_after_max_retries(monkeypatch):
+    manager = _FakeResourceManager(conflicts=gcp_service.IAM_POLICY_MAX_RETRIES)
+    try:
+        _service(monkeypatch, manager).grant_permissions_batch("proj", ["sa@proj.iam.gserviceaccount.com"])
+    except Exception as e:
+        assert "Failed to grant permissions" in str(e)
+    else:
+        raise AssertionError("409이 계속되면 실패해야 함")
+    assert len(manager.writes) == gcp_service.IAM_POLICY_MAX_RETRIES
+
+def test_existing_bindings_skip_write(monkeypatch):
+    member = "serviceAccount:sa@proj.iam.gserviceaccount.com"
+    manager = _FakeResourceManager(conflicts=0, bindings=[{"role": role, "members": [member]} for role in REQUIRED_ROLES])
+    assert _service(monkeypatch, manager).grant_permissions_batch("proj", ["sa@proj.iam.gserviceaccount.com"])
+    assert manager.writes == []
@@ -0,0 +1,26 @@
+from app.services.log_distiller import distill_log, estimate_tokens
+from tests.benchmark_log_distiller import FIXTURE, benchmark
+
+def test_fixture_is_reduced_within_budget():
+    report = benchmark(FIXTURE, rounds=5)
+    assert report["distilled_tokens"] <= 2000
+    assert report["reduction"] > 0.9
+    assert report["median_ms"] < 500
+
+def test_fixture_keeps_first_error_and_final_failure():
+    result = distill_log(FIXTURE.read_text(), 2000)
+    assert "Checkout.vue:142:18: ERROR" in result["text"]
+    assert "##[error]Process completed with exit code 1." in result["text"]
+    assert result["failing_step"] == "docker/build-push-action@v6"
+
+def test_long_anchor_line_is_truncated_to_budget():
+    raw_log = "##[group]Run build\nError: " + "y" * 200_000 + "\n##[error]" + "z" * 50_000
+    result = distill_log(raw_log, 2000)
+    assert result["distilled_tokens"] <= 2000
+    assert result["text"].count("...[truncated]") >= 1
+
+def test_error_past_truncation_point_is_still_found():
+    raw_log = "##[group]Run build\nok\n" + "a" * 50_000 + " Error: late failure\n"
+    result = distill_log(raw_log, 500)
+    assert result["first_error_line"] is not None
+    assert estimate_tokens(result["text"]) <= 500
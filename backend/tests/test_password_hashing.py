@@ -0,0 +1,47 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Tuple
+from app.core.security import hash_password, pwd_context, verify_password
+
+async def _max_loop_lag(work: Callable[[], Awaitable[Any]], interval: float = 0.01) -> Tuple[float, Any]:
+    """work() 실행 중 이벤트 루프 지연의 최댓값과 work 결과"""
+    lag = 0.0
+    done = asyncio.Event()
+    
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = max(lag, time.perf_counter() - start - interval)
+    
+    task = asyncio.create_task(ticker())
+    # 측정 태스크가 먼저 첫 sleep에 들어간 뒤 작업 시작
+    await asyncio.sleep(0)
+    try:
+        result = await work()
+    finally:
+        done.set()
+        await task
+    return lag, result
+
+def test_hash_and_verify_roundtrip():
+    async def run():
+        hashed = await hash_password("correct horse")
+        assert await verify_password("correct horse", hashed)
+        assert not await verify_password("wrong", hashed)
+        assert not await verify_password("correct horse", None)
+    asyncio.run(run())
+
+def test_hashing_does_not_block_event_loop():
+    async def hash_on_loop(password: str) -> str:
+        # 전용 스레드 풀 도입 전 방식 (이벤트 루프에서 바로 해시)
+        return pwd_context.hash(password)
+    
+    async def run():
+        before, _ = await _max_loop_lag(lambda: asyncio.gather(*(hash_on_loop(f"pw{i}") for i in range(4))))
+        after, _ = await _max_loop_lag(lambda: asyncio.gather(*(hash_password(f"pw{i}") for i in range(4))))
+        print(f"bcrypt x4 max loop lag: on loop {before * 1000:.1f} ms, executor {after * 1000:.1f} ms")
+        # 루프에서 해시하면 해시 하나 이상 동안 멈추고, 전용 스레드 풀이면 거의 멈추지 않음
+        assert after < before / 5
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.database import release_connection
+
+pytest.importorskip("aiosqlite")
+
+Base = declarative_base()
+
+class Item(Base):
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+def test_release_connection_returns_connection_to_pool(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=AsyncAdaptedQueuePool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add(Item(id=1, name="api"))
+            await session.commit()
+            
+            item = (await session.execute(select(Item))).scalar_one()
+            assert engine.pool.checkedout() == 1
+            
+            # 업스트림 호출 전에 반환하면 풀에 커넥션이 남지 않음
+            await release_connection(session)
+            assert engine.pool.checkedout() == 0
+            # 이미 로드한 객체는 그대로 읽을 수 있음
+            assert item.name == "api"
+            
+            # 다음 쿼리에서 커넥션을 다시 얻음
+            assert (await session.execute(select(Item.name))).scalar_one() == "api"
+            assert engine.pool.checkedout() == 1
+        
+        assert engine.pool.checkedout() == 0
+        await engine.dispose()
+    asyncio.run(run())
+
+def test_concurrent_analyses_share_a_small_pool(tmp_path):
+    """풀(5개)보다 많은 50개 요청이 업스트림 대기 전에 커넥션을 반환하면 풀 타임아웃 없이 끝남"""
+    async def run():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=5,
+            max_overflow=0,
+            pool_timeout=1
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        peak = 0
+        
+        async def analyze(i: int):
+            nonlocal peak
+            async with AsyncSession(engine) as session:
+                await session.execute(select(Item))
+                peak = max(peak, engine.pool.checkedout())
+                await release_connection(session)
+                # 로그 다운로드 / 모델 호출 대기 (풀 타임아웃보다 김)
+                await asyncio.sleep(1.5)
+                await session.execute(select(Item))
+        
+        await asyncio.gather(*[analyze(i) for i in range(50)])
+        await engine.dispose()
+        return peak
+    
+    assert asyncio.run(run()) <= 5
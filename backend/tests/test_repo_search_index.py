@@ -0,0 +1,20 @@
+from app.services.github_repo_cache import RepoSearchIndex
+from tests.benchmark_repo_search import benchmark, synthetic_repos
+
+def test_word_prefix_matches_come_before_substring_matches():
+    index = RepoSearchIndex([
+        {"id": 1, "full_name": "acme/my-service", "updated_at": "2026-01-02T00:00:00Z"},
+        {"id": 2, "full_name": "acme/service-api", "updated_at": "2026-01-01T00:00:00Z"},
+        {"id": 3, "full_name": "acme/microservices", "updated_at": "2026-01-03T00:00:00Z"}
+    ])
+    assert [r["id"] for r in index.search("serv", 10)] == [1, 2, 3]
+
+def test_missing_query_scans_all_repos_and_returns_nothing():
+    index = RepoSearchIndex(synthetic_repos(500))
+    assert index.search("zzzz-missing", 30) == []
+    assert len(index.search("", 30)) == 30
+
+def test_search_over_thousands_of_repos_stays_under_50ms():
+    report = benchmark(count=5000, rounds=5)
+    print(report)
+    assert report["max_ms"] < 50
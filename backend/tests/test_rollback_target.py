@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api.rollback import resolve_rollback_target
+from app.models.project import Project
+
+def _revision(name: str, created_at: str):
+    return {"name": name, "metadata": {"creationTimestamp": created_at}}
+
+class _FakeSession:
+    async def close(self):
+        pass
+
+class _FakeHistory:
+    """deployment_history 테이블 대신 {리비전: 정상 여부} 사용"""
+    def __init__(self, health):
+        self.db = _FakeSession()
+        self.health = health
+    
+    async def get_last_known_good(self, project_id, exclude_revision=None):
+        for name, healthy in self.health.items():
+            if healthy and name != exclude_revision:
+                return type("Entry", (), {"revision_name": name})
+        return None
+    
+    async def get_unhealthy_revisions(self, project_id):
+        return {name for name, healthy in self.health.items() if not healthy}
+
+class _FakeGCP:
+    def __init__(self, revisions):
+        self.revisions = revisions
+    
+    def get_service_revisions(self, project_id, region, service_name, limit=None):
+        return self.revisions
+
+def _resolve(revisions, health, current):
+    project = Project(id=1, gcp_project_id="proj", region="asia-northeast3", service_name="api")
+    return asyncio.run(resolve_rollback_target(_FakeGCP(revisions), _FakeHistory(health), project, current))
+
+def test_second_rollback_skips_revision_marked_unhealthy():
+    # 첫 롤백: A(최신)를 비정상으로 표시하고 B로 전환 → 두 번째 롤백에서 A로 돌아가면 안 됨
+    revisions = [
+        _revision("api-a", "2026-01-03T00:00:00Z"),
+        _revision("api-b", "2026-01-02T00:00:00Z"),
+        _revision("api-c", "2026-01-01T00:00:00Z"),
+    ]
+    assert _resolve(revisions, {"api-a": False, "api-b": True}, "api-b") == "api-c"
+
+def test_no_older_revision_is_rejected():
+    revisions = [
+        _revision("api-a", "2026-01-03T00:00:00Z"),
+        _revision("api-b", "2026-01-02T00:00:00Z"),
+    ]
+    with pytest.raises(HTTPException) as exc:
+        _resolve(revisions, {"api-a": False, "api-b": True}, "api-b")
+    assert exc.value.status_code == 400
+
+def test_never_picks_revision_newer_than_current():
+    revisions = [
+        _revision("api-c", "2026-01-01T00:00:00Z"),
+        _revision("api-a", "2026-01-03T00:00:00Z"),
+        _revision("api-b", "2026-01-02T00:00:00Z"),
+    ]
+    assert _resolve(revisions, {}, "api-b") == "api-c"
+
+def test_partial_revert_is_reported():
+    from app.api.rollback import ServiceRollbackResult, _project_rollback_message
+    results = [
+        ServiceRollbackResult(project_id=1, service_name="web", success=False, error="boom"),
+        ServiceRollbackResult(project_id=2, service_name="api", success=True, reverted=True),
+        ServiceRollbackResult(project_id=3, service_name="worker", success=True, error="Revert failed: 503"),
+    ]
+    message = _project_rollback_message(results, all_succeeded=False)
+    assert "failed for web" in message
+    assert "could not revert worker" in message
+    assert "reverted api" in message
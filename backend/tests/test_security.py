@@ -0,0 +1,32 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.api.auth import create_jwt_token
+from app.core.config import settings
+from app.core.security import decode_access_token
+from main import app
+import pytest
+
+client = TestClient(app)
+
+def test_decode_valid_token():
+    assert decode_access_token(create_jwt_token(42)) == 42
+
+@pytest.mark.parametrize("token", ["garbage", "a.b.c", create_jwt_token(42)[:-2] + "xx"])
+def test_decode_invalid_token_raises_401(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(token)
+    assert exc.value.status_code == 401
+
+def test_garbage_bearer_token_returns_401():
+    response = client.get("/api/auth/me", headers={"Authorization": "Bearer garbage"})
+    assert response.status_code == 401
+
+def test_garbage_header_token_returns_401():
+    response = client.get("/api/github/repos", headers={"Authorization": "Bearer garbage"})
+    assert response.status_code == 401
+
+def test_debug_stats_hidden_unless_enabled(monkeypatch):
+    assert client.get("/debug/token-cache").status_code == 404
+    monkeypatch.setattr(settings, "DEBUG_STATS_ENABLED", True)
+    assert client.get("/debug/token-cache").status_code == 401
+    assert client.get("/debug/db-stats", headers={"Authorization": "Bearer garbage"}).status_code == 401
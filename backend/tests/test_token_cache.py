@@ -0,0 +1,20 @@
+from app.services import user_service
+from app.services.user_service import TokenCache
+
+def test_expired_entries_are_dropped_on_read(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(user_service.time, "monotonic", lambda: now[0])
+    cache = TokenCache(ttl_seconds=60, max_entries=10)
+    cache.set(1, {"github_token": "a"})
+    now[0] += 61
+    assert cache.get(1) is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_user_is_evicted():
+    cache = TokenCache(ttl_seconds=60, max_entries=2)
+    cache.set(1, {})
+    cache.set(2, {})
+    cache.get(1)
+    cache.set(3, {})
+    assert cache.get(2) is None
+    assert cache.get(1) == {} and cache.get(3) == {}
@@ -2,15 +2,20 @@ import axios from 'axios'
 import { API_BASE_URL } from '../config/api'
 
 export const projectsAPI = {
-  // 내 프로젝트 목록 가져오기
-  async getMyProjects() {
+  // 내 프로젝트 목록 한 페이지 가져오기 ({ projects, next_cursor })
+  async getMyProjectsPage(cursor = null, limit = null) {
     const token = localStorage.getItem('jwt_token')
     if (!token) throw new Error('No authentication token')
     
+    const params = {}
+    if (cursor) params.cursor = cursor
+    if (limit) params.limit = limit
+    
     const response = await axios.get(`${API_BASE_URL}/api/projects/me`, {
       headers: {
         'Authorization': `Bearer ${token}`
-      }
+      },
+      params
     })
     return response.data
   },